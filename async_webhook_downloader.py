@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Async Webhook Downloader - concurrent engine for WebhookDownloader.download_all_files
+Downloads run on one aiohttp session, at most `concurrency` at a time. Files are
+scheduled round-robin across folders, so one large folder cannot hold every slot while
+the others wait. Statistics have the same shape as the sync path and print_stats(),
+save_stats(), validation, indexing and delta export all work unchanged; indexing and
+delta export run in worker threads so they never stall the downloads in flight.
+Usage: python async_webhook_downloader.py [webhook_url] [download_dir] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import os
+from itertools import zip_longest
+
+try:
+    import aiohttp
+    AIOHTTP_AVAILABLE = True
+except ImportError:
+    AIOHTTP_AVAILABLE = False
+
+from webhook_downloader import WebhookDownloader, is_csv_content
+
+# Downloads in flight at once
+DEFAULT_CONCURRENCY = 16
+
+def interleave_folders(results):
+    """
+    Order (folder, file_id) pairs round-robin across folders
+
+    Args:
+        results (dict): Folder name -> file IDs
+
+    Returns:
+        list[tuple[str, str]]: First file of every folder, then the second of every folder, ...
+    """
+    columns = [[(folder, file_id) for file_id in file_ids] for folder, file_ids in results.items()]
+    return [pair for row in zip_longest(*columns) for pair in row if pair is not None]
+
+class AsyncWebhookDownloader(WebhookDownloader):
+    def __init__(self, webhook_url, download_dir="downloaded_files", concurrency=DEFAULT_CONCURRENCY, **kwargs):
+        """
+        Initialize the downloader
+
+        Args:
+            webhook_url (str): Base URL of the webhook API
+            download_dir (str): Directory to save downloaded files
+            concurrency (int): Downloads in flight at once
+            **kwargs: index_places, delta_format and download_base_url, as for WebhookDownloader
+        """
+        if not AIOHTTP_AVAILABLE:
+            raise ImportError("aiohttp is required for AsyncWebhookDownloader (pip install aiohttp)")
+        super().__init__(webhook_url, download_dir, **kwargs)
+        self.concurrency = max(1, concurrency)
+
+    async def download_file_async(self, http, folder_name, file_id, retries=3):
+        """
+        Download a single CSV file
+
+        Args:
+            http (aiohttp.ClientSession): Shared session
+            folder_name (str): Folder name
+            file_id (str): File ID
+            retries (int): Number of retry attempts
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        download_url = self.build_download_url(folder_name, file_id)
+        filename = f"{folder_name}_{file_id}_result.csv"
+        filepath = os.path.join(self.download_dir, filename)
+
+        for attempt in range(retries):
+            try:
+                async with http.get(download_url) as response:
+                    response.raise_for_status()
+                    content = await response.read()
+                    content_type = response.headers.get('content-type', '')
+
+                # Check if we got actual CSV content
+                if not is_csv_content(content_type, content):
+                    print(f"  ✗ Invalid content type for {filename}")
+                    return False
+
+                with open(filepath, 'wb') as f:
+                    f.write(content)
+                print(f"  ✓ Downloaded {filename} ({len(content)} bytes)")
+                # SQLite ingest blocks: keep it off the event loop
+                await asyncio.to_thread(self.index_file, filepath)
+                return True
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"  ✗ Download failed for {filename} (attempt {attempt + 1}/{retries}): {e or 'timeout'}")
+                # Same policy as the sync client: a 404/403/401 will not change on retry
+                if isinstance(e, aiohttp.ClientResponseError) and e.status not in self.http.retry_statuses:
+                    break
+                # Same jittered backoff and per-host retry budget as the sync client
+                delay = self.http.retry_delay(download_url, attempt) if attempt < retries - 1 else None
+                if delay is None:
+                    break
+                await asyncio.sleep(delay)
+
+        return False
+
+    async def _download_all(self, results, stats):
+        """Download every missing file, updating stats; returns the paths downloaded"""
+        downloaded_paths = []
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # A folder's delta state is read and rewritten per file: one export per folder at a time
+        delta_locks = {folder_name: asyncio.Lock() for folder_name in results}
+
+        async def download(folder_name, file_id):
+            filepath = os.path.join(self.download_dir, f"{folder_name}_{file_id}_result.csv")
+            # Semaphore waiters are woken first-in first-out, so the interleaved order is kept
+            async with semaphore:
+                ok = await self.download_file_async(http, folder_name, file_id)
+            folder_stats = stats['folder_stats'][folder_name]
+            if ok:
+                stats['successful_downloads'] += 1
+                folder_stats['successful'] += 1
+                downloaded_paths.append(filepath)
+                async with delta_locks[folder_name]:
+                    delta = await asyncio.to_thread(self.export_delta, filepath)
+                if delta:
+                    stats['deltas'].append(delta)
+            else:
+                stats['failed_downloads'] += 1
+                folder_stats['failed'] += 1
+
+        pending = {}
+        for folder_name, file_ids in results.items():
+            stats['total_files'] += len(file_ids)
+            stats['folder_stats'][folder_name] = {'total': len(file_ids), 'successful': 0, 'failed': 0}
+            missing = []
+            for file_id in file_ids:
+                if os.path.exists(os.path.join(self.download_dir, f"{folder_name}_{file_id}_result.csv")):
+                    stats['skipped_files'] += 1
+                else:
+                    missing.append(file_id)
+            pending[folder_name] = missing
+            print(f"  {folder_name}: {len(missing)} to download, {len(file_ids) - len(missing)} already exist")
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=30)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={'User-Agent': 'WebhookDownloader/1.0'}) as http:
+            await asyncio.gather(*(download(folder_name, file_id)
+                                   for folder_name, file_id in interleave_folders(pending)))
+
+        return downloaded_paths
+
+    def download_all_files(self, results_data=None):
+        """
+        Download all files from the webhook results concurrently
+
+        Args:
+            results_data (dict, optional): Results data. If None, will fetch from webhook.
+
+        Returns:
+            dict: Download statistics (same structure as WebhookDownloader.download_all_files)
+        """
+        if results_data is None:
+            results_data = self.fetch_results()
+            if not results_data:
+                return None
+
+        results = results_data.get('results', {})
+        if not results:
+            print("✗ No results found to download")
+            return None
+
+        print(f"\nStarting download of {len(results)} folders ({self.concurrency} at a time)...")
+
+        stats = self.new_stats(results)
+        downloaded_paths = asyncio.run(self._download_all(results, stats))
+        return self.finish_stats(stats, downloaded_paths)
+
+def main():
+    parser = argparse.ArgumentParser(description='Download result CSVs from the webhook concurrently')
+    parser.add_argument('webhook_url', nargs='?', default='http://localhost:5000', help='Webhook base URL')
+    parser.add_argument('download_dir', nargs='?', default='downloaded_files', help='Download directory')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Downloads in flight at once (default: {DEFAULT_CONCURRENCY})')
+    args = parser.parse_args()
+
+    downloader = AsyncWebhookDownloader(args.webhook_url, args.download_dir, args.concurrency)
+    stats = downloader.download_all_files()
+    if stats:
+        downloader.print_stats(stats)
+        downloader.save_stats(stats)
+
+if __name__ == "__main__":
+    main()
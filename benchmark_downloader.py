@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Downloader Benchmark - sync WebhookDownloader vs AsyncWebhookDownloader
+Starts a local fixture server that serves result CSVs with a fixed per-request latency,
+downloads the same result set with both engines into temporary directories and reports
+files/sec and the speed-up. Both engines run with their default settings, so every file
+is also ingested into a (temporary) places index, as in a real run.
+Usage: python benchmark_downloader.py [--folders 10] [--files 20] [--latency-ms 50] [--concurrency 16]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import places_index
+from async_webhook_downloader import DEFAULT_CONCURRENCY, AsyncWebhookDownloader
+from webhook_downloader import WebhookDownloader
+
+def start_fixture_server(latency, size):
+    """
+    Serve /<folder>/<file_id>/result.csv on a free local port
+
+    Args:
+        latency (float): Seconds to wait before answering each request
+        size (int): Approximate body size in bytes
+
+    Returns:
+        ThreadingHTTPServer: Running server (call shutdown() when done)
+    """
+    # Shaped like a real result file, so indexing it costs what it does in a run
+    header = b"placeUrl,query,title,rating,reviewCount,category,address,phoneNumber,timestamp\n"
+    rows = []
+    while len(header) + sum(len(row) for row in rows) < size:
+        rows.append(f"https://www.google.com/maps/place/?cid={len(rows)},coffee near me,Example Place {len(rows)},"
+                    f"4.{len(rows) % 10},{len(rows) * 7},Cafe,\"1 Main St, Plano, TX 75022, United States\","
+                    f"555-0100,2024-01-01T00:00:00\n".encode())
+    body = header + b''.join(rows)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def time_download(downloader, results_data):
+    """Run download_all_files quietly; returns (seconds, stats)"""
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = downloader.download_all_files(results_data)
+    return time.perf_counter() - started, stats
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the sync and async webhook downloaders')
+    parser.add_argument('--folders', type=int, default=10, help='Folders in the result set (default: 10)')
+    parser.add_argument('--files', type=int, default=20, help='Files per folder (default: 20)')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Fixture server latency per request (default: 50)')
+    parser.add_argument('--size', type=int, default=20000, help='CSV size in bytes (default: 20000)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                        help=f'Async downloads in flight (default: {DEFAULT_CONCURRENCY})')
+    args = parser.parse_args()
+
+    results = {f"folder{f:03d}": [f"{n:09d}" for n in range(args.files)] for f in range(args.folders)}
+    results_data = {'results': results, 'total_folders': args.folders, 'total_files': args.folders * args.files}
+    total = args.folders * args.files
+
+    server = start_fixture_server(args.latency_ms / 1000, args.size)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"🚀 {total} files ({args.folders} folders) from {base_url}, {args.latency_ms:g} ms latency")
+
+    timings = {}
+    try:
+        engines = [
+            ('sync', lambda d: WebhookDownloader(base_url, d, download_base_url=base_url)),
+            (f'async x{args.concurrency}', lambda d: AsyncWebhookDownloader(
+                base_url, d, args.concurrency, download_base_url=base_url))
+        ]
+        for name, make in engines:
+            download_dir = tempfile.mkdtemp(prefix='download_bench_')
+            # Index into the run's temporary directory, not the real places.db
+            places_index.DEFAULT_DB_PATH = os.path.join(download_dir, 'places.db')
+            try:
+                seconds, stats = time_download(make(download_dir), results_data)
+            finally:
+                shutil.rmtree(download_dir, ignore_errors=True)
+            timings[name] = seconds
+            print(f"  {name:<12} {seconds:7.2f}s  {total / seconds:8.1f} files/s  "
+                  f"({stats['successful_downloads']} ok, {stats['failed_downloads']} failed)")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    sync_seconds, async_seconds = timings.values()
+    print(f"✓ Async engine is {sync_seconds / async_seconds:.1f}x faster")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Completion Callbacks - POST a signed payload to a job's callback URLs when it finishes
+Triggers may pass callback_url; once the job (and the GitHub Actions run it follows) is
+done, the webhook sends the outcome, results commit SHA and file manifest there so the
+caller can block on an event instead of polling /api/status.
+The body is signed with HMAC-SHA256 over "<timestamp>.<body>" using CALLBACK_SECRET.
+Callbacks only go to public addresses (or hosts listed in CALLBACK_ALLOWED_HOSTS), so a
+trigger cannot make the webhook POST into its own network.
+"""
+
+import hashlib
+import hmac
+import ipaddress
+import json
+import os
+import socket
+import time
+from urllib.parse import urlparse
+
+import requests
+
+import job_store
+from http_client import HttpClient
+
+# Shared secret for the X-Callback-Signature header (unsigned if not set)
+CALLBACK_SECRET = os.environ.get('CALLBACK_SECRET')
+
+# Comma-separated hosts callbacks may go to even if they resolve to a private address
+CALLBACK_ALLOWED_HOSTS = {host.strip().lower() for host in os.environ.get('CALLBACK_ALLOWED_HOSTS', '').split(',')
+                          if host.strip()}
+
+# Delivery attempts per callback, with jittered exponential backoff in between
+MAX_ATTEMPTS = 4
+TIMEOUT_SECONDS = 10
+
+SIGNATURE_HEADER = 'X-Callback-Signature'
+TIMESTAMP_HEADER = 'X-Callback-Timestamp'
+
+def validate_callback_url(url):
+    """
+    Check a callback URL is an absolute http(s) URL on a public address
+
+    The host is resolved and every address it resolves to must be globally routable:
+    loopback, private, link-local (cloud metadata), reserved and multicast targets are
+    rejected unless the host is in CALLBACK_ALLOWED_HOSTS.
+
+    Returns:
+        str | None: Problem description, or None if the URL is usable
+    """
+    if not isinstance(url, str):
+        return "callback_url must be a string"
+    parsed = urlparse(url)
+    if parsed.scheme not in ('http', 'https') or not parsed.hostname:
+        return "callback_url must be an absolute http(s) URL"
+    host = parsed.hostname.lower()
+    if host in CALLBACK_ALLOWED_HOSTS:
+        return None
+
+    try:
+        port = parsed.port or (443 if parsed.scheme == 'https' else 80)
+        addresses = socket.getaddrinfo(host, port, proto=socket.IPPROTO_TCP)
+    except ValueError:
+        return "callback_url has an invalid port"
+    except OSError:
+        return f"callback_url host {host} does not resolve"
+    for address in addresses:
+        # Drop any IPv6 zone ("fe80::1%eth0")
+        ip = ipaddress.ip_address(address[4][0].split('%')[0])
+        if not ip.is_global or ip.is_multicast:
+            return f"callback_url host {host} is not a public address"
+    return None
+
+def sign(body, timestamp, secret):
+    """
+    Signature of a callback body
+
+    Args:
+        body (bytes): Exact request body
+        timestamp (str): Value of the timestamp header (signed too, so old bodies cannot be replayed)
+        secret (str): Shared secret
+
+    Returns:
+        str: 'sha256=<hex digest>'
+    """
+    digest = hmac.new(secret.encode('utf-8'), f"{timestamp}.".encode('utf-8') + body, hashlib.sha256)
+    return f"sha256={digest.hexdigest()}"
+
+def build_payload(job):
+    """
+    Completion payload for a finished job
+
+    Args:
+        job (dict): Job from job_store.get_job()
+
+    Returns:
+        dict: event, job_id, kind, status, error, finished_at, results, workflow_run, commit_sha,
+            files, bundle_url
+    """
+    results = job['results'] if isinstance(job['results'], dict) else {}
+    workflow_run = results.get('workflow_run')
+    return {
+        'event': 'job.finished',
+        'job_id': job['id'],
+        'kind': job['kind'],
+        'status': job['status'],
+        'error': job['error'],
+        'finished_at': job['finished_at'],
+        'results': job['results'],
+        'workflow_run': workflow_run,
+        'commit_sha': workflow_run.get('commit_sha') if workflow_run else None,
+        'files': results.get('files', []),
+        'bundle_url': results.get('bundle_url')
+    }
+
+def deliver(url, payload, secret=None, attempts=MAX_ATTEMPTS):
+    """
+    POST a payload, retrying connection errors and 5xx/429 answers
+
+    A 4xx answer means the receiver rejected it (bad signature, unknown job...) and is
+    not retried. The URL is checked again before sending, in case its host now resolves
+    somewhere private, and redirects are not followed.
+
+    Returns:
+        tuple[bool, str | None]: (delivered, last error)
+    """
+    problem = validate_callback_url(url)
+    if problem:
+        return False, problem
+
+    body = json.dumps(payload).encode('utf-8')
+    timestamp = str(int(time.time()))
+    headers = {'Content-Type': 'application/json', TIMESTAMP_HEADER: timestamp}
+    if secret:
+        headers[SIGNATURE_HEADER] = sign(body, timestamp, secret)
+    try:
+        response = HttpClient().post(url, data=body, headers=headers, timeout=TIMEOUT_SECONDS,
+                                     retries=attempts - 1, allow_redirects=False)
+    except requests.RequestException as e:
+        return False, str(e)
+    if response.status_code < 300:
+        return True, None
+    return False, f"HTTP {response.status_code}"
+
+def send_job_callbacks(job_id, secret=None):
+    """
+    Deliver the completion payload to every pending callback of a finished job
+
+    Returns:
+        int: Number of callbacks delivered
+    """
+    job = job_store.get_job(job_id)
+    if job is None or job['status'] not in job_store.FINISHED_STATUSES:
+        return 0
+
+    payload = build_payload(job)
+    delivered = 0
+    for callback in job_store.pending_callbacks(job_id):
+        ok, error = deliver(callback['url'], payload, secret or CALLBACK_SECRET)
+        job_store.record_callback_attempt(callback['id'], ok, error)
+        if ok:
+            delivered += 1
+            print(f"✓ Completion callback for job {job_id} delivered to {callback['url']}")
+        else:
+            print(f"⚠ Completion callback for job {job_id} to {callback['url']} failed: {error}")
+    return delivered
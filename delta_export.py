@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Delta Export - emit only the rows that changed since the previous result for a folder
+Consecutive result files of one folder overlap heavily. For every folder a compact
+fingerprint of the last exported file (place key -> row hash) is kept, and each new file
+is compared against it to produce a small delta of inserted, updated and removed rows.
+Usage: python delta_export.py [result_dir] [--format csv|jsonl] [--state-dir DIR]
+"""
+
+import argparse
+import csv
+import gzip
+import hashlib
+import json
+import os
+import sys
+from datetime import datetime
+
+from places_index import parse_result_filename
+
+DELTA_FORMATS = ('csv', 'jsonl')
+
+# Fingerprints live here (one file per folder) unless a state dir is given
+STATE_DIRNAME = ".delta_state"
+STATE_SUFFIX = ".json.gz"
+
+# Scrape-time columns that change on every run without the place changing
+IGNORED_COLUMNS = ('timestamp',)
+
+# Columns that identify a place within a folder's results
+KEY_COLUMNS = ('placeUrl', 'query')
+
+CHANGE_COLUMN = 'change'
+
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+def delta_path_for(path, fmt='csv'):
+    """Delta file written next to a result CSV: <folder>_<file_id>_delta.<fmt>"""
+    return path[:-len('_result.csv')] + f'_delta.{fmt}'
+
+def row_hash(values):
+    """
+    Short content hash of a row
+
+    Args:
+        values (tuple[str]): The row's hashed columns (see hash_columns())
+
+    Returns:
+        str: 16 hex characters
+    """
+    return hashlib.blake2b('\x1f'.join(values).encode('utf-8'), digest_size=8).hexdigest()
+
+def hash_columns(header):
+    """
+    Positions of the columns that feed row_hash(), ordered by column name so a reordered
+    export header does not show up as an update, with IGNORED_COLUMNS left out
+    """
+    names = sorted(column for column in header if column and column not in IGNORED_COLUMNS)
+    return [header.index(name) for name in names]
+
+def read_rows(path):
+    """
+    Read a result CSV keyed by place (placeUrl + query)
+
+    Returns:
+        tuple[list[str], dict]: (header, {key: fields}) - rows without a placeUrl are dropped
+    """
+    with open(path, newline='', encoding='utf-8', errors='replace') as f:
+        reader = csv.reader(f)
+        header = next(reader, None) or []
+        width = len(header)
+        if any(column not in header for column in KEY_COLUMNS):
+            return header, {}
+        url_index, query_index = (header.index(column) for column in KEY_COLUMNS)
+
+        rows = {}
+        for fields in reader:
+            if len(fields) != width or not fields[url_index]:
+                continue
+            rows[f"{fields[url_index]}\x1f{fields[query_index]}"] = fields
+        return header, rows
+
+def load_state(state_dir, folder):
+    """
+    Load a folder's fingerprint from the previous export
+
+    Returns:
+        dict | None: {'folder', 'file_id', 'updated_at', 'rows': {key: hash}} or None
+    """
+    try:
+        with gzip.open(os.path.join(state_dir, f"{folder}{STATE_SUFFIX}"), 'rt') as f:
+            return json.load(f)
+    except (OSError, EOFError, json.JSONDecodeError):
+        return None
+
+def save_state(state_dir, folder, file_id, hashes):
+    """Write a folder's fingerprint atomically (gzipped: the keys are long Maps URLs)"""
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, f"{folder}{STATE_SUFFIX}")
+    tmp_path = path + '.tmp'
+    state = json.dumps({
+        'folder': folder,
+        'file_id': file_id,
+        'updated_at': datetime.now().isoformat(),
+        'rows': hashes
+    }, separators=(',', ':'))
+    # Fastest level: the URL-heavy keys still shrink about 3x
+    with gzip.open(tmp_path, 'wb', compresslevel=1) as f:
+        f.write(state.encode('utf-8'))
+    os.replace(tmp_path, path)
+
+def diff_rows(previous, rows, hashes):
+    """
+    Compare a previous fingerprint with the current rows
+
+    Each launch only re-scrapes some of a folder's queries, so a place is reported as
+    removed only when its query appears in the current file but the place does not.
+
+    Args:
+        previous (dict): {key: hash} from the last export
+        rows (dict): {key: fields} of the current file
+        hashes (dict): {key: hash} of the current file
+
+    Returns:
+        list[tuple[str, str]]: (change, key) with change in inserted/updated/removed
+    """
+    changes = []
+    for key, value in hashes.items():
+        old = previous.get(key)
+        if old is None:
+            changes.append(('inserted', key))
+        elif old != value:
+            changes.append(('updated', key))
+
+    queries = {key.rsplit('\x1f', 1)[-1] for key in rows}
+    for key in previous:
+        if key not in rows and key.rsplit('\x1f', 1)[-1] in queries:
+            changes.append(('removed', key))
+    return changes
+
+def _removed_row(header, key):
+    """Stand-in row for a removed place: only the key columns are known"""
+    fields = [''] * len(header)
+    for column, value in zip(KEY_COLUMNS, key.rsplit('\x1f', 1)):
+        fields[header.index(column)] = value
+    return fields
+
+def write_delta(path, header, changes, rows, fmt='csv'):
+    """
+    Write a delta file atomically
+
+    CSV deltas use the result file's header plus a leading 'change' column; removed
+    rows only carry the key columns. JSONL deltas write one object per change.
+    """
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        if fmt == 'jsonl':
+            for change, key in changes:
+                fields = rows[key] if change != 'removed' else _removed_row(header, key)
+                record = {CHANGE_COLUMN: change}
+                record.update(zip(header, fields))
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        else:
+            writer = csv.writer(f)
+            writer.writerow([CHANGE_COLUMN] + header)
+            writer.writerows(
+                [change] + (rows[key] if change != 'removed' else _removed_row(header, key))
+                for change, key in changes
+            )
+    os.replace(tmp_path, path)
+
+def export_delta(path, fmt='csv', state_dir=None, force=False):
+    """
+    Emit the delta between a result file and its folder's previous export
+
+    Files older than (or equal to) the folder's last exported file ID are skipped
+    unless force is set, so re-running over a directory is a no-op.
+
+    Args:
+        path (str): Path to a <folder>_<file_id>_result.csv
+        fmt (str): 'csv' or 'jsonl'
+        state_dir (str, optional): Fingerprint directory. Defaults to <dir>/.delta_state
+        force (bool): Diff even if the file is not newer than the last export
+
+    Returns:
+        dict | None: {'file', 'delta_file', 'base_file_id', 'rows', 'inserted',
+            'updated', 'removed'} or None if the file was skipped (not newer, or
+            without a header or placeUrl/query columns)
+    """
+    if fmt not in DELTA_FORMATS:
+        raise ValueError(f"Unknown delta format '{fmt}' (expected one of {', '.join(DELTA_FORMATS)})")
+
+    folder, file_id = parse_result_filename(path)
+    if folder is None:
+        return None
+
+    state_dir = state_dir or os.path.join(os.path.dirname(os.path.abspath(path)), STATE_DIRNAME)
+    state = load_state(state_dir, folder)
+    if state and not force and file_id <= state.get('file_id', ''):
+        return None
+
+    header, rows = read_rows(path)
+    columns = hash_columns(header)
+    if not columns or any(column not in header for column in KEY_COLUMNS):
+        # Empty file, or not a result export: nothing to diff, and the state is left alone
+        return None
+    hashes = {key: row_hash(tuple(fields[i] for i in columns)) for key, fields in rows.items()}
+    previous = state['rows'] if state else {}
+    changes = diff_rows(previous, rows, hashes)
+
+    # Places from queries this launch did not touch carry over to the next fingerprint
+    removed = {key for change, key in changes if change == 'removed'}
+    fingerprint = {key: value for key, value in previous.items() if key not in removed}
+    fingerprint.update(hashes)
+
+    delta_file = delta_path_for(path, fmt)
+    write_delta(delta_file, header, changes, rows, fmt)
+    save_state(state_dir, folder, file_id, fingerprint)
+
+    summary = {
+        'file': os.path.basename(path),
+        'delta_file': os.path.basename(delta_file),
+        'base_file_id': state['file_id'] if state else None,
+        'rows': len(rows),
+        'inserted': 0,
+        'updated': 0,
+        'removed': 0
+    }
+    for change, _ in changes:
+        summary[change] += 1
+    return summary
+
+def export_directory(directory="result_files", fmt='csv', state_dir=None):
+    """
+    Export deltas for every result file in a directory, oldest file ID first per folder
+
+    Returns:
+        list[dict]: Summaries of the files that produced a delta
+    """
+    paths = []
+    for name in os.listdir(directory):
+        folder, file_id = parse_result_filename(name)
+        if folder is not None:
+            paths.append((folder, file_id, os.path.join(directory, name)))
+
+    summaries = []
+    for _, _, path in sorted(paths):
+        summary = export_delta(path, fmt, state_dir)
+        if summary:
+            summaries.append(summary)
+    return summaries
+
+def main():
+    parser = argparse.ArgumentParser(description='Write per-folder deltas of Phantombuster result CSVs')
+    parser.add_argument('directory', nargs='?', default='result_files',
+                       help='Directory of result CSVs (default: result_files)')
+    parser.add_argument('--format', '-f', choices=DELTA_FORMATS, default='csv',
+                       help='Delta file format (default: csv)')
+    parser.add_argument('--state-dir', default=None,
+                       help=f'Fingerprint directory (default: <directory>/{STATE_DIRNAME})')
+
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"❌ Directory not found: {args.directory}")
+        sys.exit(1)
+
+    summaries = export_directory(args.directory, args.format, args.state_dir)
+    for summary in summaries:
+        base = summary['base_file_id'] or 'none'
+        print(f"  {summary['delta_file']} (base {base}): +{summary['inserted']} "
+              f"~{summary['updated']} -{summary['removed']} of {summary['rows']} rows")
+
+    changed = sum(s['inserted'] + s['updated'] + s['removed'] for s in summaries)
+    total = sum(s['rows'] for s in summaries)
+    print(f"✅ Wrote {len(summaries)} delta files: {changed} changed rows out of {total}")
+
+if __name__ == "__main__":
+    main()
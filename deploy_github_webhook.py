@@ -13,7 +13,7 @@ from datetime import datetime
 def create_procfile():
     """Create Procfile for Heroku deployment"""
     with open("Procfile", "w") as f:
-        f.write("web: python github_webhook.py")
+        f.write("web: gunicorn -c gunicorn.conf.py github_webhook:app")
     print("✓ Created Procfile")
 
 def create_runtime():
@@ -28,7 +28,9 @@ def create_requirements():
         "flask==2.3.3",
         "requests==2.31.0",
         "selenium==4.15.2",
-        "chromedriver-autoinstaller==0.6.2"
+        "chromedriver-autoinstaller==0.6.2",
+        "gunicorn==21.2.0",
+        "gevent==23.9.1"
     ]
     
     with open("requirements.txt", "w") as f:
@@ -74,7 +76,7 @@ ENV PORT=5000
 ENV DEBUG=false
 
 # Run the application
-CMD ["python", "github_webhook.py"]
+CMD ["gunicorn", "-c", "gunicorn.conf.py", "github_webhook:app"]
 """
     
     with open("Dockerfile", "w") as f:
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Dir Sync - rsync-style one-way sync of a directory tree
+Files are compared by size and modification time (or by content hash) and only new or
+changed files are copied, or hardlinked when source and target share a filesystem.
+Files missing from the source are left alone unless delete is asked for. Copies keep
+the source mtime, so an unchanged file is skipped on the next run with a single stat.
+Usage: python dir_sync.py <source> <target> [--hash] [--hardlink] [--delete] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+
+# Ways of deciding that a target file is already up to date
+COMPARE_MTIME = 'mtime'
+COMPARE_HASH = 'hash'
+
+def _scan(root):
+    """Relative path -> os.stat_result for every file under root"""
+    files = {}
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                files[os.path.relpath(entry.path, root)] = entry.stat(follow_symlinks=False)
+    return files
+
+def file_hash(path, chunk_size=1024 * 1024):
+    """SHA-256 of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _unchanged(source_path, source_stat, target_path, target_stat, compare):
+    if source_stat.st_size != target_stat.st_size:
+        return False
+    if compare == COMPARE_HASH:
+        return file_hash(source_path) == file_hash(target_path)
+    # Whole seconds: some filesystems (FAT, SMB mounts) do not keep sub-second mtimes
+    return int(source_stat.st_mtime) == int(target_stat.st_mtime)
+
+def _place(source_path, target_path, link):
+    """Hardlink or copy source into place without ever leaving a half-written target"""
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    temp_path = target_path + '.sync-tmp'
+    if link:
+        try:
+            if os.path.lexists(temp_path):
+                os.remove(temp_path)
+            os.link(source_path, temp_path)
+            os.replace(temp_path, target_path)
+            return False
+        except OSError:
+            # Different filesystem, or links not supported: fall back to a copy
+            pass
+    shutil.copy2(source_path, temp_path)
+    os.replace(temp_path, target_path)
+    return True
+
+def _remove_empty_dirs(root):
+    for current, dirs, files in os.walk(root, topdown=False):
+        if current != root and not dirs and not files:
+            try:
+                os.rmdir(current)
+            except OSError:
+                pass
+
+def sync_tree(source, target, compare=COMPARE_MTIME, link=False, delete=False, dry_run=False):
+    """
+    Make target match source, touching only what differs
+
+    Args:
+        source (str): Directory to copy from
+        target (str): Directory to bring up to date (created if missing)
+        compare (str): COMPARE_MTIME (size + mtime) or COMPARE_HASH (size + SHA-256)
+        link (bool): Hardlink instead of copying where possible
+        delete (bool): Remove target files that are not in source
+        dry_run (bool): Only report what would change
+
+    Returns:
+        dict: added, updated, deleted (relative paths), unchanged (count),
+            bytes_copied, linked (count) and total (files in source)
+    """
+    source_files = _scan(source)
+    target_files = _scan(target) if os.path.isdir(target) else {}
+
+    summary = {'added': [], 'updated': [], 'deleted': [], 'unchanged': 0,
+               'bytes_copied': 0, 'linked': 0, 'total': len(source_files)}
+
+    for relpath, source_stat in sorted(source_files.items()):
+        source_path = os.path.join(source, relpath)
+        target_path = os.path.join(target, relpath)
+        target_stat = target_files.get(relpath)
+
+        if target_stat is not None and _unchanged(source_path, source_stat, target_path, target_stat, compare):
+            summary['unchanged'] += 1
+            continue
+
+        summary['updated' if target_stat is not None else 'added'].append(relpath)
+        if dry_run:
+            continue
+        if _place(source_path, target_path, link):
+            summary['bytes_copied'] += source_stat.st_size
+        else:
+            summary['linked'] += 1
+
+    if delete:
+        for relpath in sorted(set(target_files) - set(source_files)):
+            summary['deleted'].append(relpath)
+            if not dry_run:
+                os.remove(os.path.join(target, relpath))
+        if not dry_run and summary['deleted']:
+            _remove_empty_dirs(target)
+
+    return summary
+
+def format_summary(summary):
+    """One-line diff summary, e.g. '+3 added, ~1 updated, -0 deleted, 1200 unchanged (2.1 MB copied)'"""
+    text = (f"+{len(summary['added'])} added, ~{len(summary['updated'])} updated, "
+            f"-{len(summary['deleted'])} deleted, {summary['unchanged']} unchanged "
+            f"({summary['bytes_copied'] / (1024 * 1024):.1f} MB copied")
+    if summary['linked']:
+        text += f", {summary['linked']} hardlinked"
+    return text + ")"
+
+def main():
+    parser = argparse.ArgumentParser(description='One-way incremental directory sync')
+    parser.add_argument('source', help='Directory to copy from')
+    parser.add_argument('target', help='Directory to bring up to date')
+    parser.add_argument('--hash', action='store_true', help='Compare file contents instead of size + mtime')
+    parser.add_argument('--hardlink', action='store_true', help='Hardlink instead of copying where possible')
+    parser.add_argument('--delete', action='store_true', help='Remove target files that are not in source')
+    parser.add_argument('--dry-run', action='store_true', help='Only show what would change')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.source):
+        print(f"❌ {args.source} is not a directory")
+        sys.exit(1)
+
+    summary = sync_tree(args.source, args.target, COMPARE_HASH if args.hash else COMPARE_MTIME,
+                        link=args.hardlink, delete=args.delete, dry_run=args.dry_run)
+    for label, key in (('+', 'added'), ('~', 'updated'), ('-', 'deleted')):
+        for relpath in summary[key]:
+            print(f"  {label} {relpath}")
+    print(f"{'Would sync' if args.dry_run else '✓ Synced'}: {format_summary(summary)}")
+
+if __name__ == "__main__":
+    main()
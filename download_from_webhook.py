@@ -1,27 +1,131 @@
 #!/usr/bin/env python3
 """
 Simple script to download CSV files from webhook results
-Usage: python download_from_webhook.py [webhook_url] [download_dir]
+Files are fetched by a pool of worker threads sharing one keep-alive connection pool,
+so a full pull is limited by bandwidth rather than by per-file round trips.
+Usage: python download_from_webhook.py [webhook_url] [download_dir] [--workers N] [--folders GLOB] [--since ID]
 """
 
+import argparse
 import sys
 import requests
 import os
 import json
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from fnmatch import fnmatch
 
-def download_from_webhook(webhook_url="http://localhost:5000", download_dir="downloaded_files"):
+from requests.adapters import HTTPAdapter
+
+from http_client import HttpClient
+from resumable_download import download_resumable
+
+# Parallel downloads (each worker keeps its own connection in the shared pool)
+DEFAULT_WORKERS = 8
+
+# Where Phantombuster serves result CSVs
+DOWNLOAD_BASE_URL = "https://cache1.phantombooster.com/URYtknGfxvU"
+
+# Seconds between progress bar redraws
+PROGRESS_INTERVAL = 0.2
+
+def filter_results(results, folders=None, since=None):
+    """
+    Narrow the webhook results to the folders and files wanted
+
+    Args:
+        results (dict): Folder name -> file IDs
+        folders (str, optional): Glob the folder name must match, e.g. 'zb3*'
+        since (str, optional): Only keep file IDs newer than this one
+
+    Returns:
+        dict: Folder name -> file IDs (folders left without files are dropped)
+    """
+    selected = {}
+    for folder_name, file_ids in results.items():
+        if folders and not fnmatch(folder_name.rstrip('/'), folders):
+            continue
+        if since is not None:
+            file_ids = [file_id for file_id in file_ids if _newer_than(file_id, since)]
+        if file_ids:
+            selected[folder_name] = file_ids
+    return selected
+
+def _newer_than(file_id, since):
+    """File IDs are zero-padded counters; compare numerically when both are numbers"""
+    if file_id.isdigit() and since.isdigit():
+        return int(file_id) > int(since)
+    return file_id > since
+
+class ProgressBar:
+    def __init__(self, total, width=30):
+        """
+        Single-line progress bar with aggregate throughput
+
+        Args:
+            total (int): Files to download
+            width (int): Bar width in characters
+        """
+        self.total = total
+        self.width = width
+        self.done = 0
+        self.bytes = 0
+        self.started = time.time()
+        self._drawn = 0
+        self._lock = threading.Lock()
+
+    def update(self, nbytes):
+        """Count one finished file (nbytes is 0 for a failure)"""
+        with self._lock:
+            self.done += 1
+            self.bytes += nbytes
+            if time.time() - self._drawn >= PROGRESS_INTERVAL or self.done == self.total:
+                self._draw()
+
+    def mb_per_second(self):
+        elapsed = time.time() - self.started
+        return self.bytes / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+
+    def _draw(self):
+        self._drawn = time.time()
+        filled = int(self.width * self.done / self.total) if self.total else self.width
+        bar = '#' * filled + '-' * (self.width - filled)
+        sys.stdout.write(f"\r  [{bar}] {self.done}/{self.total} files  "
+                         f"{self.bytes / (1024 * 1024):.1f} MB  {self.mb_per_second():.2f} MB/s")
+        sys.stdout.flush()
+
+    def close(self):
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+
+def _pooled_client(workers):
+    """HttpClient whose connection pool holds one keep-alive connection per worker"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(workers, 1))
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return HttpClient(session)
+
+def download_from_webhook(webhook_url="http://localhost:5000", download_dir="downloaded_files",
+                          workers=DEFAULT_WORKERS, folders=None, since=None, download_base_url=None):
     """
     Download CSV files from webhook results
     
     Args:
         webhook_url (str): Base URL of the webhook API
         download_dir (str): Directory to save downloaded files
+        workers (int): Files downloaded in parallel
+        folders (str, optional): Only download folders whose name matches this glob
+        since (str, optional): Only download file IDs newer than this one
+        download_base_url (str, optional): Base URL of the result CSVs. Defaults to DOWNLOAD_BASE_URL.
     """
     
     # Clean up URL
     webhook_url = webhook_url.rstrip('/')
+    download_base_url = (download_base_url or DOWNLOAD_BASE_URL).rstrip('/')
+    workers = max(1, workers)
     
     # Create download directory
     os.makedirs(download_dir, exist_ok=True)
@@ -29,67 +133,69 @@ def download_from_webhook(webhook_url="http://localhost:5000", download_dir="dow
     print(f"Fetching results from {webhook_url}/results...")
     
     try:
+        http = _pooled_client(workers)
+        
         # Fetch results from webhook
-        response = requests.get(f"{webhook_url}/results", timeout=30)
+        response = http.get(f"{webhook_url}/results", timeout=30)
         response.raise_for_status()
         data = response.json()
         
         print(f"✓ Found {data['total_folders']} folders with {data['total_files']} files")
         
-        results = data.get('results', {})
+        results = filter_results(data.get('results', {}), folders, since)
         if not results:
             print("No results found to download")
-            return
+            return True
         
         # Download statistics
-        total_files = 0
+        total_files = sum(len(file_ids) for file_ids in results.values())
         successful_downloads = 0
         failed_downloads = 0
         skipped_files = 0
+        failures = []
         
         start_time = datetime.now()
         
-        # Process each folder
+        pending = []
         for folder_name, file_ids in results.items():
-            if not file_ids:
-                print(f"Skipping {folder_name} (no files)")
-                continue
-            
-            print(f"\nProcessing {folder_name} ({len(file_ids)} files)...")
-            
+            folder_name_clean = folder_name.rstrip('/')
             for file_id in file_ids:
-                total_files += 1
-                
                 # Check if file already exists
-                filename = f"{folder_name}_{file_id}_result.csv"
+                filename = f"{folder_name_clean}_{file_id}_result.csv"
                 filepath = os.path.join(download_dir, filename)
-                
                 if os.path.exists(filepath):
-                    print(f"  Skipping {filename} (already exists)")
                     skipped_files += 1
                     continue
-                
-                # Build download URL
-                folder_name_clean = folder_name.rstrip('/')
-                download_url = f"https://cache1.phantombooster.com/URYtknGfxvU/{folder_name_clean}/{file_id}/result.csv"
-                
-                # Download file
-                try:
-                    print(f"  Downloading {filename}...")
-                    file_response = requests.get(download_url, timeout=30)
-                    file_response.raise_for_status()
-                    
-                    # Save file
-                    with open(filepath, 'wb') as f:
-                        f.write(file_response.content)
-                    
-                    file_size = os.path.getsize(filepath)
-                    print(f"  ✓ Downloaded {filename} ({file_size} bytes)")
+                download_url = f"{download_base_url}/{folder_name_clean}/{file_id}/result.csv"
+                pending.append((filename, download_url, filepath))
+        
+        print(f"Downloading {len(pending)} files from {len(results)} folders with {workers} workers "
+              f"({skipped_files} already downloaded)...")
+        
+        progress = ProgressBar(len(pending))
+        
+        def download(job):
+            filename, download_url, filepath = job
+            # Continues a .part left by an interrupted run
+            try:
+                result = download_resumable(http, download_url, filepath)
+            except OSError as e:
+                result = {'ok': False, 'size': 0, 'resumed_from': 0, 'error': str(e)}
+            progress.update(result['size'] if result['ok'] else 0)
+            return filename, result
+        
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for filename, result in pool.map(download, pending):
+                if result['ok']:
                     successful_downloads += 1
-                    
-                except requests.exceptions.RequestException as e:
-                    print(f"  ✗ Failed to download {filename}: {e}")
+                else:
                     failed_downloads += 1
+                    failures.append((filename, result['error']))
+        if pending:
+            progress.close()
+        
+        for filename, error in failures:
+            print(f"  ✗ Failed to download {filename}: {error}")
         
         # Print statistics
         end_time = datetime.now()
@@ -103,6 +209,7 @@ def download_from_webhook(webhook_url="http://localhost:5000", download_dir="dow
         print(f"Failed downloads: {failed_downloads}")
         print(f"Skipped files: {skipped_files}")
         print(f"Duration: {duration:.2f} seconds")
+        print(f"Downloaded: {progress.bytes / (1024 * 1024):.1f} MB ({progress.mb_per_second():.2f} MB/s)")
         
         if total_files > 0:
             success_rate = (successful_downloads / total_files) * 100
@@ -126,18 +233,28 @@ def download_from_webhook(webhook_url="http://localhost:5000", download_dir="dow
 def main():
     """Main function"""
     # Parse command line arguments
-    webhook_url = sys.argv[1] if len(sys.argv) > 1 else "http://localhost:5000"
-    download_dir = sys.argv[2] if len(sys.argv) > 2 else "downloaded_files"
+    parser = argparse.ArgumentParser(description='Download result CSVs listed by the webhook')
+    parser.add_argument('webhook_url', nargs='?', default='http://localhost:5000', help='Webhook base URL')
+    parser.add_argument('download_dir', nargs='?', default='downloaded_files', help='Download directory')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS,
+                        help=f'Files downloaded in parallel (default: {DEFAULT_WORKERS})')
+    parser.add_argument('--folders', default=None, help="Only folders matching this glob, e.g. 'zb3*'")
+    parser.add_argument('--since', default=None, help='Only file IDs newer than this one, e.g. 000000100')
+    args = parser.parse_args()
+    webhook_url = args.webhook_url
+    download_dir = args.download_dir
     
     print("Phantombuster Webhook Downloader")
     print("="*40)
     print(f"Webhook URL: {webhook_url}")
     print(f"Download directory: {download_dir}")
+    if args.folders or args.since:
+        print(f"Filter: folders={args.folders or '*'} since={args.since or '-'}")
     print()
     
     # Check if webhook is accessible
     try:
-        health_response = requests.get(f"{webhook_url}/health", timeout=10)
+        health_response = HttpClient().get(f"{webhook_url}/health", timeout=10, retries=0)
         if health_response.status_code == 200:
             print("✓ Webhook is accessible")
         else:
@@ -146,7 +263,7 @@ def main():
         print("⚠ Could not connect to webhook (will try anyway)")
     
     # Download files
-    success = download_from_webhook(webhook_url, download_dir)
+    success = download_from_webhook(webhook_url, download_dir, args.workers, args.folders, args.since)
     
     if success:
         print("\nDownload completed successfully!")
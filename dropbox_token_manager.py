@@ -1,26 +1,73 @@
 """
 Dropbox Token Manager for handling Dropbox authentication
+
+Access tokens are cached on disk (DROPBOX_TOKEN_CACHE) with their expiry, so successive
+runs reuse a valid token instead of each doing an OAuth refresh. Refreshes are
+single-flight: one thread per process holds the lock, and the cache file is locked while
+it is read and refreshed, so concurrent threads and processes end up sharing one token.
 """
 import os
 import json
+import hashlib
+import tempfile
+import threading
 import requests
 from datetime import datetime, timedelta
 
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Where access tokens are shared between runs (one small JSON file, mode 600)
+TOKEN_CACHE_PATH = os.environ.get('DROPBOX_TOKEN_CACHE',
+                                  os.path.join(os.path.expanduser('~'), '.cache', 'dropbox_token.json'))
+
+# Tokens are treated as expired this long before Dropbox expires them
+EXPIRY_MARGIN_SECONDS = 60
+
 class DropboxTokenManager:
-    def __init__(self):
+    def __init__(self, cache_path=TOKEN_CACHE_PATH):
         self.access_token = None
         self.refresh_token = None
         self.token_expires_at = None
         self.app_key = os.environ.get('DROPBOX_APP_KEY')
         self.app_secret = os.environ.get('DROPBOX_APP_SECRET')
         self.refresh_token_env = os.environ.get('DROPBOX_REFRESH_TOKEN')
+        self.cache_path = cache_path
+        self.refresh_count = 0
+        self._lock = threading.Lock()
         
     def get_current_token(self):
         """Get the current access token, refreshing if necessary"""
-        if not self.access_token or self._is_token_expired():
-            if not self._refresh_token():
-                return None
-        return self.access_token
+        token = self.access_token
+        if token and not self._is_token_expired():
+            return token
+        
+        # Single flight: threads that were waiting find the token the first one obtained
+        with self._lock:
+            if self.access_token and not self._is_token_expired():
+                return self.access_token
+            with self._cache_lock():
+                if self._load_cached_token() or self._refresh_token():
+                    return self.access_token
+        return None
+    
+    def invalidate(self):
+        """Forget the current access token (e.g. after Dropbox rejected it) so the next call refreshes"""
+        with self._lock:
+            rejected = self.access_token
+            self.access_token = None
+            self.token_expires_at = None
+            with self._cache_lock():
+                cached = self._read_cache()
+                # Another process may already have cached a newer token; only drop this one
+                if rejected and cached and cached.get('access_token') == rejected:
+                    try:
+                        os.remove(self.cache_path)
+                    except OSError:
+                        pass
     
     def _is_token_expired(self):
         """Check if the current token is expired"""
@@ -28,6 +75,52 @@ class DropboxTokenManager:
             return True
         return datetime.now() >= self.token_expires_at
     
+    def _cache_key(self):
+        """Identifies the app and refresh token a cached access token belongs to"""
+        return hashlib.sha256(f"{self.app_key}:{self.refresh_token_env}".encode('utf-8')).hexdigest()[:16]
+    
+    def _cache_lock(self):
+        """Exclusive lock on the token cache, shared with other processes"""
+        return _FileLock(self.cache_path + '.lock')
+    
+    def _read_cache(self):
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+    
+    def _load_cached_token(self):
+        """Adopt the cached access token if it belongs to these credentials and is still valid"""
+        cached = self._read_cache()
+        if not cached or cached.get('key') != self._cache_key() or not cached.get('access_token'):
+            return False
+        
+        expires_at = datetime.fromtimestamp(cached.get('expires_at', 0))
+        if datetime.now() >= expires_at:
+            return False
+        
+        self.access_token = cached['access_token']
+        self.token_expires_at = expires_at
+        return True
+    
+    def _save_cached_token(self):
+        """Write the access token to the cache (atomically, readable only by this user)"""
+        try:
+            directory = os.path.dirname(os.path.abspath(self.cache_path))
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix='.dropbox_token_')
+            with os.fdopen(fd, 'w') as f:
+                json.dump({
+                    'key': self._cache_key(),
+                    'access_token': self.access_token,
+                    'expires_at': self.token_expires_at.timestamp()
+                }, f)
+            os.chmod(temp_path, 0o600)
+            os.replace(temp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not cache Dropbox token: {e}")
+    
     def _refresh_token(self):
         """Refresh the access token using the refresh token"""
         if not self.refresh_token_env or not self.app_key or not self.app_secret:
@@ -42,17 +135,19 @@ class DropboxTokenManager:
                 'client_secret': self.app_secret
             }
             
-            response = requests.post(url, data=data)
+            response = requests.post(url, data=data, timeout=30)
             response.raise_for_status()
             
             token_data = response.json()
             self.access_token = token_data['access_token']
             self.refresh_token = token_data.get('refresh_token', self.refresh_token_env)
+            self.refresh_count += 1
             
             # Set expiration time (typically 4 hours)
             expires_in = token_data.get('expires_in', 14400)
-            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - 60)  # 1 minute buffer
+            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in - EXPIRY_MARGIN_SECONDS)
             
+            self._save_cached_token()
             return True
             
         except Exception as e:
@@ -87,12 +182,41 @@ class DropboxTokenManager:
                 'error': str(e)
             }
 
+class _FileLock:
+    """flock() on a lock file; a no-op where fcntl is not available (Windows)"""
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+    
+    def __enter__(self):
+        if not FCNTL_AVAILABLE:
+            return self
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file, fcntl.LOCK_EX)
+        except OSError as e:
+            # An unwritable cache directory only costs the cross-process sharing
+            print(f"Could not lock Dropbox token cache: {e}")
+            if self._file:
+                self._file.close()
+                self._file = None
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        if self._file:
+            fcntl.flock(self._file, fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
 # Global instance
 _token_manager = None
+_token_manager_lock = threading.Lock()
 
 def get_token_manager():
     """Get the global token manager instance"""
     global _token_manager
-    if _token_manager is None:
-        _token_manager = DropboxTokenManager()
-    return _token_manager
+    with _token_manager_lock:
+        if _token_manager is None:
+            _token_manager = DropboxTokenManager()
+        return _token_manager
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Dropbox Uploader - one long-lived Dropbox client for every upload in a run
+The token is checked with users/get_current_account once per access token (so once per
+expiry window) instead of before every upload, and the client and its connection pool
+are reused. Files larger than one chunk are streamed through an upload session instead
+of being read into memory. Small files such as screenshots are staged - their bytes go up
+in a single closed upload session - and committed together with one
+upload_session/finish_batch call every batch_size files, or on commit().
+Usage: python dropbox_uploader.py <file> [<file> ...] [--folder /Selenium_Screenshots]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+try:
+    import dropbox
+    DROPBOX_AVAILABLE = True
+except ImportError:
+    DROPBOX_AVAILABLE = False
+
+from dropbox_token_manager import get_token_manager
+
+# Dropbox folder uploads go to unless a full path is given
+DEFAULT_FOLDER = "/Selenium_Screenshots"
+
+# Bytes per upload session request; files up to this size go up in one request
+CHUNK_SIZE = 8 * 1024 * 1024
+
+# Staged files committed per finish_batch call (Dropbox allows up to 1000)
+BATCH_SIZE = 100
+
+# How often to poll an asynchronous finish_batch job
+BATCH_POLL_SECONDS = 0.5
+
+class DropboxUploadError(Exception):
+    """No usable Dropbox token, or the Dropbox SDK is missing"""
+
+# Failures retrying cannot fix: no token or SDK, or a token Dropbox still rejects after a refresh
+PERMANENT_ERRORS = (DropboxUploadError, dropbox.exceptions.AuthError) if DROPBOX_AVAILABLE else (DropboxUploadError,)
+
+class DropboxUploader:
+    def __init__(self, token_manager=None, folder=DEFAULT_FOLDER, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE,
+                 on_commit=None):
+        """
+        Initialize the uploader
+
+        Args:
+            token_manager (DropboxTokenManager, optional): Defaults to the shared manager
+            folder (str): Dropbox folder for bare file names
+            chunk_size (int): Bytes per upload session request
+            batch_size (int): Staged files per finish_batch commit
+            on_commit (callable, optional): Called with every commit() result, including
+                the automatic commits stage() makes when a batch fills up
+        """
+        if not DROPBOX_AVAILABLE:
+            raise DropboxUploadError("The dropbox package is required (pip install dropbox)")
+        self.token_manager = token_manager or get_token_manager()
+        self.folder = folder.rstrip('/')
+        self.chunk_size = chunk_size
+        self.batch_size = max(1, min(batch_size, 1000))
+        self.on_commit = on_commit
+        self.account_name = None
+        self.stats = {'uploaded': 0, 'staged': 0, 'committed': 0, 'failed': 0, 'bytes': 0,
+                      'batches': 0, 'validations': 0}
+        # One connection pool for the whole run, kept across token refreshes
+        self._session = dropbox.create_session()
+        self._client = None
+        self._client_token = None
+        self._staged = []
+        self._lock = threading.RLock()
+
+    def dropbox_path(self, name):
+        """Full Dropbox path for a file name (paths starting with / are used as is)"""
+        return name if name.startswith('/') else f"{self.folder}/{name}"
+
+    def client(self):
+        """
+        Dropbox client for the current access token
+
+        A new token is checked once, when it is first seen; after that the same client is
+        returned until the token manager hands out a different token.
+
+        Raises:
+            DropboxUploadError: No access token could be obtained
+            dropbox.exceptions.AuthError: The token was rejected
+        """
+        with self._lock:
+            token = self.token_manager.get_current_token()
+            if not token:
+                raise DropboxUploadError("No Dropbox access token available")
+            if token != self._client_token:
+                client = dropbox.Dropbox(token, session=self._session)
+                account = client.users_get_current_account()
+                self.account_name = account.name.display_name
+                self.stats['validations'] += 1
+                self._client, self._client_token = client, token
+            return self._client
+
+    def _call(self, action):
+        """Run action(client), refreshing the token once if Dropbox rejects it"""
+        for attempt in range(2):
+            client = self.client()
+            try:
+                return action(client)
+            except dropbox.exceptions.AuthError:
+                if attempt:
+                    raise
+                # Revoked or expired early: drop the cached token and refresh it
+                with self._lock:
+                    self._client_token = None
+                    self.token_manager.invalidate()
+
+    def _send_session(self, client, f, size, close):
+        """Stream an open file into a new upload session; returns its cursor"""
+        f.seek(0)
+        chunk = f.read(self.chunk_size)
+        session = client.files_upload_session_start(chunk, close=close and len(chunk) >= size)
+        cursor = dropbox.files.UploadSessionCursor(session_id=session.session_id, offset=len(chunk))
+        while cursor.offset < size:
+            chunk = f.read(self.chunk_size)
+            if not chunk:
+                raise OSError(f"{f.name} shrank to {cursor.offset} bytes while uploading")
+            last = cursor.offset + len(chunk) >= size
+            client.files_upload_session_append_v2(chunk, cursor, close=close and last)
+            cursor.offset += len(chunk)
+        return cursor
+
+    def upload(self, file_path, name=None):
+        """
+        Upload a file now (overwriting), streaming it if it is larger than one chunk
+
+        Args:
+            file_path (str): Local file
+            name (str, optional): File name in the folder, or a full Dropbox path.
+                Defaults to the local file name.
+
+        Returns:
+            dropbox.files.FileMetadata: The uploaded file
+        """
+        path = self.dropbox_path(name or os.path.basename(file_path))
+        size = os.path.getsize(file_path)
+        mode = dropbox.files.WriteMode.overwrite
+
+        def send(client):
+            with open(file_path, 'rb') as f:
+                if size <= self.chunk_size:
+                    return client.files_upload(f.read(), path, mode=mode)
+                cursor = self._send_session(client, f, size, close=False)
+                return client.files_upload_session_finish(b'', cursor, dropbox.files.CommitInfo(path=path, mode=mode))
+
+        try:
+            metadata = self._call(send)
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+        self.stats['uploaded'] += 1
+        self.stats['bytes'] += size
+        return metadata
+
+    def stage(self, file_path, name=None):
+        """
+        Send a file's bytes now and commit it with the next batch
+
+        Args:
+            file_path (str): Local file
+            name (str, optional): File name in the folder, or a full Dropbox path
+
+        Returns:
+            str: Dropbox path the file will be committed to
+        """
+        path = self.dropbox_path(name or os.path.basename(file_path))
+        size = os.path.getsize(file_path)
+
+        def send(client):
+            with open(file_path, 'rb') as f:
+                return self._send_session(client, f, size, close=True)
+
+        try:
+            cursor = self._call(send)
+        except Exception:
+            self.stats['failed'] += 1
+            raise
+
+        with self._lock:
+            commit = dropbox.files.CommitInfo(path=path, mode=dropbox.files.WriteMode.overwrite)
+            self._staged.append(dropbox.files.UploadSessionFinishArg(cursor=cursor, commit=commit))
+            self.stats['staged'] += 1
+            self.stats['bytes'] += size
+            batch_full = len(self._staged) >= self.batch_size
+        if batch_full:
+            self.commit()
+        return path
+
+    @property
+    def pending(self):
+        """Staged files not yet committed"""
+        return len(self._staged)
+
+    def _finish_batch(self, client, entries):
+        """finish_batch entries, waiting for the job if Dropbox runs it asynchronously"""
+        if hasattr(client, 'files_upload_session_finish_batch_v2'):
+            return client.files_upload_session_finish_batch_v2(entries).entries
+        launch = client.files_upload_session_finish_batch(entries)
+        if launch.is_complete():
+            return launch.get_complete().entries
+        job_id = launch.get_async_job_id()
+        while True:
+            status = client.files_upload_session_finish_batch_check(job_id)
+            if status.is_complete():
+                return status.get_complete().entries
+            if status.is_failed():
+                raise dropbox.exceptions.DropboxException(f"finish_batch job {job_id} failed: {status.get_failed()}")
+            time.sleep(BATCH_POLL_SECONDS)
+
+    def commit(self):
+        """
+        Commit every staged file with finish_batch calls
+
+        Returns:
+            dict: committed (Dropbox paths) and failed ((path, error) pairs)
+        """
+        with self._lock:
+            staged, self._staged = self._staged, []
+        committed, failed = [], []
+
+        for start in range(0, len(staged), self.batch_size):
+            entries = staged[start:start + self.batch_size]
+            try:
+                outcomes = self._call(lambda client: self._finish_batch(client, entries))
+            except Exception as e:
+                failed.extend((entry.commit.path, str(e)) for entry in entries)
+                continue
+            self.stats['batches'] += 1
+            for entry, outcome in zip(entries, outcomes):
+                if outcome.is_success():
+                    committed.append(entry.commit.path)
+                else:
+                    failed.append((entry.commit.path, str(outcome.get_failure())))
+
+        self.stats['committed'] += len(committed)
+        self.stats['failed'] += len(failed)
+        result = {'committed': committed, 'failed': failed}
+        if self.on_commit:
+            self.on_commit(result)
+        return result
+
+# Global instance
+_uploader = None
+_uploader_lock = threading.Lock()
+
+def get_uploader():
+    """Get the global uploader instance"""
+    global _uploader
+    with _uploader_lock:
+        if _uploader is None:
+            _uploader = DropboxUploader()
+        return _uploader
+
+def main():
+    parser = argparse.ArgumentParser(description='Upload files to Dropbox in one batch')
+    parser.add_argument('files', nargs='+', help='Files to upload')
+    parser.add_argument('--folder', default=DEFAULT_FOLDER, help=f'Dropbox folder (default: {DEFAULT_FOLDER})')
+    args = parser.parse_args()
+
+    if not DROPBOX_AVAILABLE:
+        print("❌ The dropbox package is required (pip install dropbox)")
+        sys.exit(1)
+
+    try:
+        uploader = DropboxUploader(folder=args.folder)
+        started = time.time()
+        for file_path in args.files:
+            if os.path.getsize(file_path) > uploader.chunk_size:
+                uploader.upload(file_path)
+                print(f"  ✓ Uploaded {file_path}")
+            else:
+                uploader.stage(file_path)
+        result = uploader.commit()
+    except (DropboxUploadError, OSError, dropbox.exceptions.DropboxException) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    for path, error in result['failed']:
+        print(f"  ✗ {path}: {error}")
+    elapsed = time.time() - started
+    print(f"✓ {uploader.stats['uploaded'] + uploader.stats['committed']} files to {args.folder} as {uploader.account_name} "
+          f"in {elapsed:.2f}s ({uploader.stats['batches']} batch commits, {uploader.stats['bytes']} bytes)")
+    if result['failed']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -4,33 +4,268 @@ GitHub Webhook for Phantombuster Automation
 This webhook can be triggered by GitHub to run the selenium automation and return results
 """
 
-from flask import Flask, request, jsonify, render_template_string
+from flask import Flask, request, jsonify, render_template_string, Response, stream_with_context
 import subprocess
 import os
+import hmac
 import json
 import time
 import threading
-from datetime import datetime
+from datetime import datetime, timezone
 import tempfile
 import shutil
 
+import requests
+from requests.adapters import HTTPAdapter
+
+import completion_callbacks
+import job_store
+from http_client import HttpClient
+import places_index
+import results_artifact
+from job_queue import JobQueue
+import results_bundle
+from results_bundle import release_bundle_url, release_tag
+from workflow_runs import WorkflowRunTracker, new_correlation_id
+
 app = Flask(__name__)
 
-# Global variables to track automation status
-automation_status = {
-    'running': False,
-    'last_run': None,
-    'last_results': None,
-    'last_error': None,
-    'progress': 0
-}
+# Automation state lives in the job store (jobs.db) so it survives restarts and is shared
+# by every worker process. One watcher thread per process tracks the store's status
+# version and notifies this condition when it changes; long-poll and SSE clients wait on
+# it instead of each polling the database.
+status_changed = threading.Condition()
+
+# How often the watcher re-checks the store for changes made by other workers
+STATUS_POLL_SECONDS = 1
+
+# Longest a single /api/status?wait= request may block
+MAX_STATUS_WAIT = 60
+
+# Idle SSE connections get a comment line this often so proxies keep them open
+SSE_KEEPALIVE_SECONDS = 15
 
 # API key used to protect the public trigger endpoint
 TRIGGER_API_KEY = os.environ.get('SELENIUM_TRIGGER_API_KEY')
 
+# Workflow file dispatched when the workflow cannot be found by name
+SELENIUM_WORKFLOW_FILE = 'selenium-download.yml'
+
+# Only files under this path are listed in a results commit's manifest
+RESULTS_PATH_PREFIX = 'result_files/'
+
+# Keys a job's results use for run details rather than folder -> file IDs
+RUN_RESULT_KEYS = ('status', 'message', 'trigger_type', 'workflow_id', 'workflow_file', 'correlation_id',
+                   'workflow_run', 'files', 'bundle_url')
+
+# Job progress for each GitHub Actions run status
+WORKFLOW_RUN_PROGRESS = {'requested': 10, 'waiting': 15, 'pending': 15, 'queued': 20, 'in_progress': 50, 'completed': 100}
+
+# Keep-alive connections to the GitHub API per worker process, shared by every job
+GITHUB_POOL_SIZE = int(os.environ.get('GITHUB_POOL_SIZE', 10))
+
 # Directory where CSV results are stored
 RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'result_files')
 
+def _pooled_session():
+    """Session whose connections are reused across jobs (cooperative under gevent workers)"""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=GITHUB_POOL_SIZE))
+    return session
+
+# GitHub API client: pooled connections plus the shared retry policy (see http_client.py)
+github_http = HttpClient(_pooled_session())
+
+# Newest job event id seen by the watcher (None until it first runs)
+_status_version = None
+_status_watcher = None
+_status_watcher_lock = threading.Lock()
+_status_poke = threading.Event()
+
+def _refresh_status_version():
+    """Read the store's status version and wake the waiting clients if it moved"""
+    global _status_version
+    version = job_store.latest_event_id()
+    with status_changed:
+        if version != _status_version:
+            _status_version = version
+            status_changed.notify_all()
+    return version
+
+def _watch_status():
+    """Watcher thread: one version check per change or STATUS_POLL_SECONDS for all clients"""
+    while True:
+        _status_poke.wait(STATUS_POLL_SECONDS)
+        _status_poke.clear()
+        try:
+            _refresh_status_version()
+        except Exception as e:
+            print(f"Could not read the job store: {e}")
+
+def _ensure_status_watcher():
+    """Start the watcher thread on first use"""
+    global _status_watcher
+    with _status_watcher_lock:
+        if _status_watcher is None:
+            _refresh_status_version()
+            _status_watcher = threading.Thread(target=_watch_status, name='status-watcher', daemon=True)
+            _status_watcher.start()
+
+def _notify_status_change():
+    """Have the watcher pick up an in-process change right away"""
+    _status_poke.set()
+
+def _update_status(job_id, message=None, **fields):
+    """Apply a change to a job and wake every waiting client"""
+    job_store.update_job(job_id, message=message, **fields)
+    _notify_status_change()
+
+def _cancelled(job_id):
+    """True if the job was cancelled; checked before each outbound GitHub call"""
+    return job_store.is_cancel_requested(job_id)
+
+def _finish_job(job_id):
+    """Mark a job succeeded, cancelled, or failed if it recorded an error"""
+    job = job_store.get_job(job_id)
+    if job and job['status'] not in job_store.FINISHED_STATUSES:
+        if job['cancel_requested'] and not job['results']:
+            status = job_store.CANCELLED
+        else:
+            status = job_store.FAILED if job['error'] else job_store.SUCCEEDED
+        _update_status(job_id, status=status)
+    _send_callbacks(job_id)
+
+def _send_callbacks(job_id):
+    """Deliver a finished job's completion callbacks in the background (retries can take a while)"""
+    thread = threading.Thread(target=completion_callbacks.send_job_callbacks, args=(job_id,), daemon=True)
+    thread.start()
+
+def _status_snapshot():
+    """
+    Current automation status, derived from the most recent job
+
+    Returns:
+        dict: running, last_run, last_results, last_error, progress, plus version (id of
+            the newest job event, bumped on every change), job_id / job_status and the
+            tracked GitHub Actions run (workflow_run: status, conclusion, commit_sha, ...)
+    """
+    conn = job_store.connect()
+    try:
+        job = job_store.latest_job(conn)
+        version = job_store.latest_event_id(conn)
+    finally:
+        conn.close()
+
+    if job is None:
+        return {'running': False, 'last_run': None, 'last_results': None, 'last_error': None,
+                'progress': 0, 'version': version, 'job_id': None, 'job_status': None,
+                'workflow_run': None}
+
+    results = job['results']
+    return {
+        'running': job['status'] in job_store.ACTIVE_STATUSES,
+        'last_run': job['finished_at'],
+        'last_results': results,
+        'last_error': job['error'],
+        'progress': job['progress'],
+        'version': version,
+        'job_id': job['id'],
+        'job_status': job['status'],
+        'workflow_run': results.get('workflow_run') if isinstance(results, dict) else None
+    }
+
+def _folder_results(results):
+    """The folder -> file ID lists in a job's results, without the run details stored next to them"""
+    if not isinstance(results, dict):
+        return {}
+    return {folder: files for folder, files in results.items()
+            if folder not in RUN_RESULT_KEYS and isinstance(files, list)}
+
+def _wait_for_status(since, timeout):
+    """
+    Block until the status version differs from since, or the timeout passes
+
+    Args:
+        since (int): Version the client already has
+        timeout (float): Seconds to wait at most
+
+    Returns:
+        dict: Status snapshot (unchanged if the wait timed out)
+    """
+    _ensure_status_watcher()
+    deadline = time.time() + timeout
+    with status_changed:
+        while _status_version == since:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            status_changed.wait(remaining)
+    return _status_snapshot()
+
+def _queue_job(kind, req, defaults=None):
+    """
+    Queue a job for a trigger request
+
+    Priority comes from ?priority= or the JSON body's "priority" (higher runs first), and
+    ?coalesce=false forces a separate run instead of joining a queued one with the same
+    params. A "callback_url" (body or query) is POSTed the signed outcome once the job
+    finishes; it is registered on the job it ends up in, so a coalesced trigger's
+    callback fires too. Callbacks are only accepted with a valid trigger API key, so an
+    anonymous caller cannot make the webhook send requests on its behalf.
+
+    Returns:
+        tuple[dict, dict] | tuple[None, Response]: (job, response body) or (None, error response)
+    """
+    params = dict(defaults or {})
+    body = req.get_json(silent=True)
+    if isinstance(body, dict):
+        params.update(body)
+
+    # Queueing options, not run parameters: kept out of params so they do not stop coalescing
+    try:
+        priority = int(req.args.get('priority', params.pop('priority', 0)))
+    except (TypeError, ValueError):
+        return None, (jsonify({'status': 'error', 'message': 'priority must be an integer'}), 400)
+    coalesce = str(req.args.get('coalesce', params.pop('coalesce', 'true'))).lower() not in ('false', '0', 'no')
+
+    callback_url = req.args.get('callback_url', params.pop('callback_url', None))
+    if callback_url is not None:
+        if not _has_trigger_api_key(req):
+            return None, (jsonify({
+                'status': 'error',
+                'message': 'callback_url requires a valid API key (X-API-Key) and SELENIUM_TRIGGER_API_KEY set on the webhook'
+            }), 401)
+        problem = completion_callbacks.validate_callback_url(callback_url)
+        if problem:
+            return None, (jsonify({'status': 'error', 'message': problem}), 400)
+
+    job, coalesced = automation_queue.submit(kind, params or None, priority, coalesce)
+    if callback_url:
+        job_store.add_callback(job['id'], callback_url)
+    return job, {
+        'job_id': job['id'],
+        'job_status': job['status'],
+        'coalesced': coalesced,
+        'queue_position': job_store.queue_position(job['id']),
+        'job_endpoint': f"/api/jobs/{job['id']}",
+        'callback_url': callback_url
+    }
+
+def index_results_directory():
+    """
+    Bring the places index in line with the results directory
+
+    Called when the directory changes (and once at startup for files that arrived while
+    the server was down); /api/places only reads the index.
+    """
+    try:
+        stats = places_index.ingest_directory(RESULTS_DIR)
+        if stats['files_ingested'] or stats['files_removed']:
+            print(f"Indexed {stats['rows_ingested']} places from {stats['files_ingested']} result files "
+                  f"({stats['files_removed']} removed files dropped)")
+    except Exception as e:
+        print(f"Could not index {RESULTS_DIR}: {e}")
+
 def clear_results_directory() -> None:
     """Remove all files in the results directory without deleting the folder."""
     try:
@@ -89,9 +324,30 @@ RESULTS_TEMPLATE = """
             }, 30000); // Refresh every 30 seconds
         }
         
-        // Auto-refresh if automation is running
+        // Follow the status stream while automation is running: update the progress
+        // bar in place and reload once the run finishes
+        function followStatus() {
+            var source = new EventSource('/api/status/stream');
+            source.addEventListener('status', function(event) {
+                var status = JSON.parse(event.data);
+                if (!status.running) {
+                    source.close();
+                    location.reload();
+                    return;
+                }
+                var fill = document.querySelector('.progress-fill');
+                var text = document.getElementById('progress-text');
+                if (fill) { fill.style.width = status.progress + '%'; }
+                if (text) { text.textContent = 'Progress: ' + status.progress + '%'; }
+            });
+        }
+        
         if ({{ 'true' if automation_status.running else 'false' }}) {
-            autoRefresh();
+            if (window.EventSource) {
+                followStatus();
+            } else {
+                autoRefresh();
+            }
         }
     </script>
 </head>
@@ -108,7 +364,7 @@ RESULTS_TEMPLATE = """
                 <div class="progress-bar">
                     <div class="progress-fill" style="width: {{ automation_status.progress }}%"></div>
                 </div>
-                <p>Progress: {{ automation_status.progress }}%</p>
+                <p id="progress-text">Progress: {{ automation_status.progress }}%</p>
             {% endif %}
         </div>
         
@@ -161,7 +417,7 @@ RESULTS_TEMPLATE = """
         
         {% if automation_status.running %}
         <div class="auto-refresh">
-            🔄 Page will auto-refresh every 30 seconds while automation is running
+            🔄 Page updates live while automation is running
         </div>
         {% endif %}
     </div>
@@ -169,22 +425,16 @@ RESULTS_TEMPLATE = """
 </html>
 """
 
-def run_automation():
+def run_automation(job_id):
     """Trigger GitHub Actions workflow for selenium automation"""
-    global automation_status
     
     try:
-        automation_status['running'] = True
-        automation_status['progress'] = 0
-        automation_status['last_error'] = None
-        
         print("Triggering GitHub Actions workflow...")
         
         # Get GitHub token from environment
         github_token = os.environ.get('GITHUB_TOKEN')
         if not github_token:
-            automation_status['last_error'] = "GITHUB_TOKEN environment variable not set"
-            automation_status['running'] = False
+            _update_status(job_id, error="GITHUB_TOKEN environment variable not set")
             return
         
         # Get repository info from environment or use defaults
@@ -192,8 +442,6 @@ def run_automation():
         repo_name = os.environ.get('GITHUB_REPOSITORY_NAME', 'selenium-download-automation')
         
         # Trigger the workflow using repository_dispatch
-        import requests
-        
         url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/dispatches"
         
         headers = {
@@ -209,61 +457,40 @@ def run_automation():
             }
         }
         
-        response = requests.post(url, headers=headers, json=data)
+        if _cancelled(job_id):
+            print("Job cancelled before the workflow was triggered")
+            return
+        
+        response = github_http.post(url, headers=headers, json=data, timeout=30)
         
         if response.status_code == 204:
-            automation_status['progress'] = 50
-            automation_status['last_results'] = {"status": "workflow_triggered", "message": "GitHub Actions workflow started"}
-            automation_status['progress'] = 100
+            _update_status(job_id, progress=50)
+            _update_status(job_id, results={"status": "workflow_triggered", "message": "GitHub Actions workflow started"})
+            _update_status(job_id, progress=100)
             print("GitHub Actions workflow triggered successfully")
         else:
-            automation_status['last_error'] = f"Failed to trigger workflow: {response.status_code} - {response.text}"
+            _update_status(job_id, error=f"Failed to trigger workflow: {response.status_code} - {response.text}")
             print(f"Failed to trigger workflow: {response.status_code} - {response.text}")
     
     except Exception as e:
-        automation_status['last_error'] = f"Unexpected error: {str(e)}"
+        _update_status(job_id, error=f"Unexpected error: {str(e)}")
         print(f"Unexpected error: {e}")
     finally:
-        automation_status['running'] = False
-        automation_status['last_run'] = datetime.now().isoformat()
-
-def parse_results_from_output(output):
-    """Parse results from selenium script output"""
-    try:
-        # Look for the "Results by folder:" line in the output
-        lines = output.split('\n')
-        results = {}
-        
-        for line in lines:
-            if 'Results by folder:' in line:
-                # Extract the dictionary from the line
-                import re
-                pattern = r"Results by folder:\s*({.*?})"
-                match = re.search(pattern, line, re.DOTALL)
-                
-                if match:
-                    results_str = match.group(1)
-                    # Convert single quotes to double quotes for JSON parsing
-                    results_str = results_str.replace("'", '"')
-                    results = json.loads(results_str)
-                    break
-        
-        return results
-    except Exception as e:
-        print(f"Error parsing results: {e}")
-        return {}
+        _finish_job(job_id)
 
 @app.route('/')
 def home():
     """Main page with results table"""
+    automation_status = _status_snapshot()
     results = automation_status.get('last_results', {})
     
     # Handle case where results is None
     if results is None:
         results = {}
     
-    total_folders = len(results)
-    total_files = sum(len(files) for files in results.values()) if results else 0
+    folders = _folder_results(results)
+    total_folders = len(folders)
+    total_files = sum(len(files) for files in folders.values())
     
     # Determine status
     if automation_status['running']:
@@ -279,13 +506,22 @@ def home():
         status_class = 'running'
         status_text = 'No automation run yet'
     
-    last_updated = automation_status.get('last_run', 'Never')
+    last_updated = automation_status.get('last_run') or 'Never'
     if last_updated != 'Never':
         try:
             dt = datetime.fromisoformat(last_updated.replace('Z', '+00:00'))
             last_updated = dt.strftime('%Y-%m-%d %H:%M:%S')
         except:
             pass
+    
+    return render_template_string(RESULTS_TEMPLATE, 
+                                results=folders,
+                                total_folders=total_folders,
+                                total_files=total_files,
+                                status_class=status_class,
+                                status_text=status_text,
+                                last_updated=last_updated,
+                                automation_status=automation_status)
 
 
 def _validate_trigger_api_key(req):
@@ -304,59 +540,200 @@ def _validate_trigger_api_key(req):
         return False, "Invalid API key"
 
     return True, None
-    
-    return render_template_string(RESULTS_TEMPLATE, 
-                                results=results,
-                                total_folders=total_folders,
-                                total_files=total_files,
-                                status_class=status_class,
-                                status_text=status_text,
-                                last_updated=last_updated,
-                                automation_status=automation_status)
+
+def _has_trigger_api_key(req):
+    """True only if an API key is configured and the request supplied it (no open access)"""
+    supplied_key = req.headers.get('X-API-Key') or req.args.get('api_key')
+    return bool(TRIGGER_API_KEY and supplied_key) and hmac.compare_digest(supplied_key, TRIGGER_API_KEY)
 
 @app.route('/trigger', methods=['POST', 'GET'])
 def trigger_automation():
-    """Trigger the automation to run"""
-    if automation_status['running']:
-        return jsonify({
-            'status': 'error',
-            'message': 'Automation is already running'
-        }), 400
-    
-    # Start automation in a separate thread
-    thread = threading.Thread(target=run_automation)
-    thread.daemon = True
-    thread.start()
+    """Queue the automation to run"""
+    job, details = _queue_job('workflow', request)
+    if job is None:
+        return details
     
     return jsonify({
         'status': 'success',
-        'message': 'Automation started',
+        'message': 'Automation queued' if not details['coalesced'] else 'Joined the automation run already queued',
+        **details,
         'redirect': '/'
-    })
+    }), 202
 
 @app.route('/api/results')
 def api_results():
     """API endpoint to get results as JSON"""
+    automation_status = _status_snapshot()
     results = automation_status.get('last_results', {})
     
     # Handle case where results is None
     if results is None:
         results = {}
     
+    folders = _folder_results(results)
     return jsonify({
         'status': 'success',
         'timestamp': automation_status.get('last_run'),
         'running': automation_status['running'],
-        'total_folders': len(results),
-        'total_files': sum(len(files) for files in results.values()) if results else 0,
+        'total_folders': len(folders),
+        'total_files': sum(len(files) for files in folders.values()),
         'results': results,
-        'error': automation_status.get('last_error')
+        'error': automation_status.get('last_error'),
+        'artifact': _artifact_summary()
+    })
+
+def _artifact_summary():
+    """Progress and results of the last local selenium run, from its results artifact"""
+    summary = results_artifact.load_summary(results_artifact.default_artifact_path(RESULTS_DIR))
+    if summary is None:
+        return None
+    summary['total_folders'] = len(summary['results'])
+    return summary
+
+@app.route('/api/places')
+def api_places():
+    """
+    Query the indexed Maps places
+
+    Filters: category, query, postal_code, place_url, folder, min_rating, max_rating
+    Paging: limit (default 50, max 500), offset
+    Counts: group_by=category|query|postal_code|folder returns per-value counts instead of rows
+    """
+    filters = {
+        key: request.args.get(key)
+        for key in ('category', 'query', 'postal_code', 'place_url', 'folder', 'min_rating', 'max_rating')
+        if request.args.get(key)
+    }
+
+    try:
+        limit = int(request.args.get('limit', 50))
+        offset = int(request.args.get('offset', 0))
+        for key in ('min_rating', 'max_rating'):
+            if key in filters:
+                filters[key] = float(filters[key])
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'limit, offset and ratings must be numeric'}), 400
+
+    conn = places_index.connect()
+    try:
+        group_by = request.args.get('group_by')
+        if group_by:
+            try:
+                counts = places_index.count_places(group_by, filters, limit, conn)
+            except ValueError as e:
+                return jsonify({'status': 'error', 'message': str(e)}), 400
+            return jsonify({
+                'status': 'success',
+                'group_by': group_by,
+                'filters': filters,
+                'counts': counts
+            })
+
+        total, places = places_index.query_places(filters, limit, offset, conn)
+    finally:
+        conn.close()
+
+    return jsonify({
+        'status': 'success',
+        'filters': filters,
+        'total': total,
+        'limit': min(max(limit, 1), places_index.MAX_PAGE_SIZE),
+        'offset': max(offset, 0),
+        'places': places
     })
 
 @app.route('/api/status')
 def api_status():
-    """API endpoint to get automation status"""
-    return jsonify(automation_status)
+    """
+    API endpoint to get automation status
+
+    Long-poll: ?wait=<seconds> holds the request until the status changes (at most
+    MAX_STATUS_WAIT seconds). Pass ?since=<version> from the previous response so
+    changes that happened between two polls are returned immediately.
+    """
+    wait = request.args.get('wait')
+    if wait is None:
+        return jsonify(_status_snapshot())
+
+    try:
+        wait = min(max(float(wait), 0), MAX_STATUS_WAIT)
+        since = request.args.get('since')
+        if since is None:
+            _ensure_status_watcher()
+            since = _status_version
+        else:
+            since = int(since)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'wait and since must be numeric'}), 400
+
+    return jsonify(_wait_for_status(since, wait))
+
+@app.route('/api/status/stream')
+def api_status_stream():
+    """
+    Server-Sent Events stream of automation status
+
+    Sends the current status on connect and then one event per change. Reconnecting
+    clients resume from the Last-Event-ID header (the status version).
+    """
+    last_event_id = request.headers.get('Last-Event-ID', '')
+    since = int(last_event_id) if last_event_id.isdigit() else None
+
+    def events():
+        version = since
+        while True:
+            status = _wait_for_status(version, SSE_KEEPALIVE_SECONDS) if version is not None else _status_snapshot()
+            if status['version'] == version:
+                yield ": keepalive\n\n"
+                continue
+            version = status['version']
+            yield f"id: {version}\nevent: status\ndata: {json.dumps(status)}\n\n"
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/jobs')
+def api_jobs():
+    """Recent jobs, newest first (?status=queued|running|succeeded|failed|cancelled, ?limit=)"""
+    try:
+        limit = int(request.args.get('limit', 50))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'limit must be numeric'}), 400
+
+    return jsonify({
+        'status': 'success',
+        'jobs': job_store.list_jobs(request.args.get('status'), limit)
+    })
+
+@app.route('/api/jobs/<job_id>')
+def api_job(job_id):
+    """One job with its results and full status history"""
+    job = job_store.get_job(job_id, with_events=True)
+    if not job:
+        return jsonify({'status': 'error', 'message': f'Job {job_id} not found'}), 404
+    return jsonify({'status': 'success', 'job': job})
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST', 'DELETE'])
+def api_cancel_job(job_id):
+    """Cancel a queued job, or stop a running one before its next GitHub call"""
+    authorized, error_message = _validate_trigger_api_key(request)
+    if not authorized:
+        return jsonify({
+            'status': 'error',
+            'message': error_message or 'Unauthorized'
+        }), 401
+
+    job = automation_queue.cancel(job_id)
+    if not job:
+        return jsonify({'status': 'error', 'message': f'Job {job_id} not found'}), 404
+    if job['status'] in (job_store.SUCCEEDED, job_store.FAILED):
+        return jsonify({'status': 'error', 'message': f"Job already {job['status']}", 'job': job}), 409
+    if job['status'] == job_store.CANCELLED:
+        # Queued jobs are cancelled on the spot and never reach _finish_job()
+        _send_callbacks(job_id)
+    return jsonify({'status': 'success', 'job': job})
 
 @app.route('/api/health')
 def health():
@@ -364,25 +741,64 @@ def health():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'automation_running': automation_status['running']
+        'automation_running': job_store.active_job() is not None
+    })
+
+def _bundle_files(tracker, release):
+    """
+    File list of a run's results bundle, from the manifest at the start of the asset
+
+    Only the first few kilobytes of the bundle are downloaded.
+
+    Returns:
+        list[dict]: {'path', 'size', 'sha256'} per file (empty if the manifest cannot be read)
+    """
+    asset = next((asset for asset in release.get('assets', [])
+                  if asset['name'] == results_bundle.BUNDLE_FILENAME), None)
+    if asset is None:
+        return []
+    try:
+        with tracker.open_asset(asset) as response:
+            if response.status_code != 200:
+                print(f"Could not fetch {asset['name']} of release {release.get('tag_name')}: {response.status_code}")
+                return []
+            manifest = results_bundle.read_manifest(response.raw, asset['name'])
+    except (requests.RequestException, results_bundle.BundleError) as e:
+        print(f"Could not read the manifest of release {release.get('tag_name')}: {e}")
+        return []
+    return [
+        {'path': f"{RESULTS_PATH_PREFIX}{entry['path']}", 'size': entry['size'], 'sha256': entry['sha256']}
+        for entry in manifest.get('files', [])
+    ]
+
+def _repository_dispatch_selenium(job_id, tracker):
+    """Fallback trigger through repository_dispatch (the run cannot be followed)"""
+    response = tracker.repository_dispatch('selenium-download-trigger', {
+        'triggered_by': 'api',
+        'trigger_type': 'selenium-download',
+        'timestamp': datetime.now().isoformat()
     })
+    if response.status_code == 204:
+        _update_status(job_id, progress=100, results={
+            "status": "workflow_triggered",
+            "message": "Selenium Download Automation workflow started via repository_dispatch",
+            "trigger_type": "selenium-download"
+        })
+        print("Selenium Download Automation workflow triggered successfully")
+        return True
+    _update_status(job_id, error=f"Failed to trigger workflow: {response.status_code} - {response.text}")
+    return False
 
-def trigger_selenium_download_workflow():
-    """Trigger the selenium-download GitHub Actions workflow directly"""
-    global automation_status
+def trigger_selenium_download_workflow(job_id):
+    """Trigger the selenium-download GitHub Actions workflow and follow the run to completion"""
     
     try:
-        automation_status['running'] = True
-        automation_status['progress'] = 0
-        automation_status['last_error'] = None
-        
         print("Triggering Selenium Download Automation workflow...")
         
         # Get GitHub token from environment
         github_token = os.environ.get('GITHUB_TOKEN')
         if not github_token:
-            automation_status['last_error'] = "GITHUB_TOKEN environment variable not set"
-            automation_status['running'] = False
+            _update_status(job_id, error="GITHUB_TOKEN environment variable not set")
             return False
         
         # Get repository info from environment or use defaults
@@ -390,134 +806,81 @@ def trigger_selenium_download_workflow():
         repo_name = os.environ.get('GITHUB_REPOSITORY_NAME', 'selenium-download-automation')
         workflow_name = os.environ.get('SELENIUM_WORKFLOW_NAME', 'Selenium Download Automation')
         
-        import requests
-        
-        # Try to trigger the workflow using workflow_dispatch API
-        # First, get the workflow ID by listing workflows
-        workflows_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/actions/workflows"
-        headers = {
-            'Authorization': f'token {github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        
-        workflows_response = requests.get(workflows_url, headers=headers)
-        
-        if workflows_response.status_code != 200:
-            # Fallback to repository_dispatch if workflow listing fails
-            print(f"Could not list workflows, using repository_dispatch fallback")
-            dispatch_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/dispatches"
-            dispatch_data = {
-                'event_type': 'selenium-download-trigger',
-                'client_payload': {
-                    'triggered_by': 'api',
-                    'trigger_type': 'selenium-download',
-                    'timestamp': datetime.now().isoformat()
-                }
-            }
-            
-            response = requests.post(dispatch_url, headers=headers, json=dispatch_data)
-            if response.status_code == 204:
-                automation_status['progress'] = 100
-                automation_status['last_results'] = {
-                    "status": "workflow_triggered",
-                    "message": "Selenium Download Automation workflow started via repository_dispatch",
-                    "trigger_type": "selenium-download"
-                }
-                print("Selenium Download Automation workflow triggered successfully")
-                return True
-            else:
-                automation_status['last_error'] = f"Failed to trigger workflow: {response.status_code} - {response.text}"
-                return False
-        
-        # Find the selenium-download workflow
-        workflows = workflows_response.json().get('workflows', [])
-        workflow_id = None
-        workflow_file = None
+        tracker = WorkflowRunTracker(github_token, repo_owner, repo_name, session=github_http)
         
-        for workflow in workflows:
-            if 'selenium' in workflow['name'].lower() or workflow['name'] == workflow_name:
-                workflow_id = workflow['id']
-                workflow_file = workflow['path']
-                break
-        
-        if not workflow_id:
-            # Fallback: try workflow_dispatch on the known workflow file
-            workflow_file = "selenium-download.yml"
-            if not workflow_file.startswith('.github/workflows/'):
-                workflow_file = f".github/workflows/{workflow_file}"
-            
-            # Use workflow_dispatch API (no inputs since workflow doesn't define them)
-            dispatch_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/actions/workflows/{workflow_file}/dispatches"
-            dispatch_data = {
-                'ref': 'main'
-            }
-            
-            response = requests.post(dispatch_url, headers=headers, json=dispatch_data)
-            if response.status_code == 204:
-                automation_status['progress'] = 100
-                automation_status['last_results'] = {
-                    "status": "workflow_triggered",
-                    "message": "Selenium Download Automation workflow started",
-                    "trigger_type": "selenium-download",
-                    "workflow_file": workflow_file
-                }
-                print("Selenium Download Automation workflow triggered successfully")
-                return True
-            else:
-                # Final fallback to repository_dispatch
-                print(f"workflow_dispatch failed, using repository_dispatch fallback: {response.status_code}")
-                dispatch_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/dispatches"
-                dispatch_data = {
-                    'event_type': 'selenium-download-trigger',
-                    'client_payload': {
-                        'triggered_by': 'api',
-                        'trigger_type': 'selenium-download',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                }
-                response = requests.post(dispatch_url, headers=headers, json=dispatch_data)
-                if response.status_code == 204:
-                    automation_status['progress'] = 100
-                    automation_status['last_results'] = {
-                        "status": "workflow_triggered",
-                        "message": "Selenium Download Automation workflow started via repository_dispatch",
-                        "trigger_type": "selenium-download"
-                    }
-                    print("Selenium Download Automation workflow triggered successfully")
-                    return True
-                else:
-                    automation_status['last_error'] = f"Failed to trigger workflow: {response.status_code} - {response.text}"
-                    return False
+        if _cancelled(job_id):
+            print("Job cancelled before the workflow was triggered")
+            return False
         
-        # Use workflow ID to trigger (no inputs since workflow doesn't define them)
-        dispatch_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/actions/workflows/{workflow_id}/dispatches"
-        dispatch_data = {
-            'ref': 'main'
+        # The ID is looked up once per process; fall back to the known workflow file
+        workflow_id = tracker.workflow_id(workflow_name, match='selenium')
+        workflow = workflow_id or SELENIUM_WORKFLOW_FILE
+        
+        correlation_id = new_correlation_id()
+        dispatched_at = datetime.now(timezone.utc)
+        response = tracker.dispatch(workflow, ref='main', correlation_id=correlation_id)
+        if response.status_code != 204:
+            print(f"workflow_dispatch failed, using repository_dispatch fallback: {response.status_code}")
+            return _repository_dispatch_selenium(job_id, tracker)
+        
+        triggered = {
+            "status": "workflow_triggered",
+            "message": "Selenium Download Automation workflow started",
+            "trigger_type": "selenium-download",
+            "workflow_id": workflow_id,
+            "workflow_file": None if workflow_id else workflow,
+            "correlation_id": correlation_id
         }
+        _update_status(job_id, progress=WORKFLOW_RUN_PROGRESS['requested'], results=triggered)
+        print(f"Selenium Download Automation workflow triggered (correlation {correlation_id}), following the run")
+        
+        def on_update(run):
+            if run is None:
+                job_store.touch_job(job_id)
+                return
+            _update_status(job_id, message=f"Workflow run {run['run_id']} {run['status']}",
+                           progress=WORKFLOW_RUN_PROGRESS.get(run['status'], WORKFLOW_RUN_PROGRESS['requested']),
+                           results=dict(triggered, workflow_run=run))
+        
+        run = tracker.follow(workflow, correlation_id, dispatched_at,
+                             on_update=on_update, should_cancel=lambda: _cancelled(job_id))
+        
+        if run is None:
+            # Dispatched fine, but the run could not be found: report it as fire-and-forget
+            _update_status(job_id, progress=100, results=dict(
+                triggered, message="Selenium Download Automation workflow started (run could not be tracked)"))
+            return True
+        if not run['completed']:
+            _update_status(job_id, error=f"Gave up following workflow run {run['run_id']}: {run['html_url']}")
+            return False
         
-        response = requests.post(dispatch_url, headers=headers, json=dispatch_data)
-        if response.status_code == 204:
-            automation_status['progress'] = 100
-            automation_status['last_results'] = {
-                "status": "workflow_triggered",
-                "message": "Selenium Download Automation workflow started",
-                "trigger_type": "selenium-download",
-                "workflow_id": workflow_id
-            }
-            print("Selenium Download Automation workflow triggered successfully")
+        # The run only publishes a release when it found new files; None means nothing new
+        bundle_url, files = None, []
+        release = tracker.release(release_tag(run['run_id']))
+        if release:
+            bundle_url = release_bundle_url(f"{repo_owner}/{repo_name}", run['run_id'])
+            files = _bundle_files(tracker, release)
+            # Results are not committed by default: report the commit the bundle was built from
+            run['commit_sha'] = run['commit_sha'] or release.get('target_commitish')
+        results = dict(triggered, status="workflow_completed", workflow_run=run,
+                       message=f"Workflow run finished: {run['conclusion']}",
+                       files=files, bundle_url=bundle_url)
+        if run['conclusion'] == 'success':
+            _update_status(job_id, progress=100, results=results)
+            print(f"Workflow run {run['run_id']} succeeded (results commit: {run['commit_sha'] or 'none'})")
             return True
-        else:
-            automation_status['last_error'] = f"Failed to trigger workflow: {response.status_code} - {response.text}"
-            print(f"Failed to trigger workflow: {response.status_code} - {response.text}")
+        if run['conclusion'] == 'cancelled' and _cancelled(job_id):
+            _update_status(job_id, status=job_store.CANCELLED, results=results)
             return False
+        _update_status(job_id, results=results, error=f"Workflow run {run['conclusion']}: {run['html_url']}")
+        return False
     
     except Exception as e:
-        automation_status['last_error'] = f"Unexpected error: {str(e)}"
+        _update_status(job_id, error=f"Unexpected error: {str(e)}")
         print(f"Unexpected error: {e}")
         return False
     finally:
-        automation_status['running'] = False
-        automation_status['last_run'] = datetime.now().isoformat()
+        _finish_job(job_id)
 
 @app.route('/api/trigger-selenium', methods=['POST', 'GET'])
 def api_trigger_selenium():
@@ -529,21 +892,15 @@ def api_trigger_selenium():
             'message': error_message or 'Unauthorized'
         }), 401
 
-    if automation_status['running']:
-        return jsonify({
-            'status': 'error',
-            'message': 'Automation is already running',
-            'running': True
-        }), 400
-    
-    # Start automation in a separate thread
-    thread = threading.Thread(target=trigger_selenium_download_workflow)
-    thread.daemon = True
-    thread.start()
+    job, details = _queue_job('selenium-download', request)
+    if job is None:
+        return details
     
     return jsonify({
         'status': 'success',
-        'message': 'Selenium Download Automation triggered',
+        'message': 'Selenium Download Automation triggered' if not details['coalesced']
+                   else 'Joined the Selenium Download Automation run already queued',
+        **details,
         'endpoint': '/api/trigger-selenium',
         'status_endpoint': '/api/status',
         'results_endpoint': '/api/results',
@@ -556,6 +913,7 @@ def github_webhook():
     try:
         # Clear out previous results on every webhook call
         clear_results_directory()
+        index_results_directory()
         # Verify the webhook (optional - add secret verification)
         payload = request.get_json()
         
@@ -564,27 +922,31 @@ def github_webhook():
         
         # Check if this is a push to main branch
         if payload.get('ref') == 'refs/heads/main' and payload.get('action') == 'opened':
-            # Trigger automation
-            if not automation_status['running']:
-                thread = threading.Thread(target=run_automation)
-                thread.daemon = True
-                thread.start()
-                
-                return jsonify({
-                    'status': 'success',
-                    'message': 'Automation triggered by GitHub webhook'
-                })
-            else:
-                return jsonify({
-                    'status': 'info',
-                    'message': 'Automation already running'
-                })
+            # Queue automation (joins a run that is already queued)
+            job, coalesced = automation_queue.submit('workflow', {'triggered_by': 'github_webhook'})
+            
+            return jsonify({
+                'status': 'success' if not coalesced else 'info',
+                'message': 'Automation triggered by GitHub webhook' if not coalesced
+                           else 'Automation already queued',
+                'job_id': job['id']
+            })
         
         return jsonify({'status': 'ignored', 'message': 'Not a relevant event'})
     
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Bounded worker pool that runs queued triggers (see job_queue.py)
+automation_queue = JobQueue({
+    'workflow': run_automation,
+    'selenium-download': trigger_selenium_download_workflow
+}, on_change=_notify_status_change)
+automation_queue.start()
+
+# Index result files that arrived while the server was down, without delaying startup
+threading.Thread(target=index_results_directory, name='places-index', daemon=True).start()
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug = os.environ.get('DEBUG', 'false').lower() == 'true'
@@ -594,5 +956,9 @@ if __name__ == '__main__':
     print(f"🔗 GitHub webhook: http://localhost:{port}/webhook/github")
     print(f"📊 Results page: http://localhost:{port}")
     print(f"🔧 API endpoint: http://localhost:{port}/api/results")
+    print(f"🔎 Places API: http://localhost:{port}/api/places")
+    print(f"📶 Status stream: http://localhost:{port}/api/status/stream")
+    print(f"🗂️  Jobs API: http://localhost:{port}/api/jobs")
+    print("💡 Development server - in production run: gunicorn -c gunicorn.conf.py github_webhook:app")
     
     app.run(host='0.0.0.0', port=port, debug=debug)
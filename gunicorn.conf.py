@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Gunicorn configuration for the GitHub webhook
+Runs github_webhook:app on gevent workers: long-poll /api/status, SSE streams and the
+GitHub API calls made while following workflow runs all yield to each other instead of
+each holding a thread. Falls back to threaded workers where gevent is not installed.
+Usage: gunicorn -c gunicorn.conf.py github_webhook:app
+"""
+
+import os
+
+try:
+    import gevent  # noqa: F401
+    GEVENT_AVAILABLE = True
+except ImportError:
+    GEVENT_AVAILABLE = False
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 5000)}"
+
+# Worker processes (Heroku sets WEB_CONCURRENCY from the dyno size). They share state
+# through the job store, and MAX_CONCURRENT_JOBS still caps runs across all of them.
+workers = int(os.environ.get('WEB_CONCURRENCY', 2))
+
+if GEVENT_AVAILABLE:
+    worker_class = 'gevent'
+    # Open connections per worker: every long-poll and SSE client holds one
+    worker_connections = int(os.environ.get('WORKER_CONNECTIONS', 1000))
+else:
+    worker_class = 'gthread'
+    threads = int(os.environ.get('GUNICORN_THREADS', 16))
+
+# Each worker starts its own job queue threads on import, so the app must not be
+# imported before the fork
+preload_app = False
+
+# Long enough for a full /api/status?wait= (MAX_STATUS_WAIT is 60 seconds)
+timeout = 90
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info')
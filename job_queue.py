@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Job Queue - bounded worker pool over the SQLite job store
+Triggers are enqueued in job_store (duplicates of a still-queued job are coalesced), and
+a fixed set of worker threads claims them in priority order. The number of jobs running
+at once is capped across every process sharing the store, so bursts of triggers from CI
+and cron are absorbed without lost or duplicated runs.
+"""
+
+import os
+import threading
+import time
+import traceback
+
+import job_store
+
+# Jobs allowed to run at the same time across all processes (override with MAX_CONCURRENT_JOBS)
+MAX_CONCURRENT_JOBS = int(os.environ.get('MAX_CONCURRENT_JOBS', 1))
+
+# Idle workers re-check the store this often, to pick up jobs queued by other processes
+POLL_SECONDS = 2.0
+
+# How often an idle worker fails running jobs whose worker died (see job_store.expire_stale_jobs)
+EXPIRE_SECONDS = 60
+
+class JobQueue:
+    def __init__(self, handlers, workers=None, max_running=None, on_change=None):
+        """
+        Initialize the queue
+
+        Args:
+            handlers (dict): Job kind -> callable(job_id) that runs the job
+            workers (int, optional): Worker threads in this process. Defaults to max_running.
+            max_running (int, optional): Global cap on running jobs. Defaults to MAX_CONCURRENT_JOBS.
+            on_change (callable, optional): Called with no arguments after any job changes
+        """
+        self.handlers = dict(handlers)
+        self.max_running = max(1, max_running or MAX_CONCURRENT_JOBS)
+        self.workers = max(1, workers or self.max_running)
+        self.on_change = on_change
+        self._wakeup = threading.Condition()
+        self._threads = []
+        self._stopping = False
+        self._next_expiry = 0
+        self._expiry_lock = threading.Lock()
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        if self._threads:
+            return
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"job-worker-{n + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout=None):
+        """Ask workers to exit once their current job finishes"""
+        self._stopping = True
+        self._notify()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def submit(self, kind, params=None, priority=0, coalesce=True):
+        """
+        Queue a job
+
+        Args:
+            kind (str): One of the handler kinds
+            params (dict, optional): Trigger parameters
+            priority (int): Higher runs first
+            coalesce (bool): Fold into an identical job that is still queued
+
+        Returns:
+            tuple[dict, bool]: (job, coalesced)
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        job, coalesced = job_store.enqueue_job(kind, params, priority, coalesce)
+        self._changed()
+        self._notify()
+        return job, coalesced
+
+    def cancel(self, job_id):
+        """
+        Cancel a queued job, or flag a running one to stop
+
+        Returns:
+            dict | None: The job after the request, or None if it does not exist
+        """
+        job = job_store.cancel_job(job_id)
+        self._changed()
+        return job
+
+    def _notify(self):
+        with self._wakeup:
+            self._wakeup.notify_all()
+
+    def _changed(self):
+        if self.on_change:
+            self.on_change()
+
+    def _expire_stale_jobs(self):
+        """Fail dead running jobs, at most once per EXPIRE_SECONDS in this process"""
+        with self._expiry_lock:
+            if time.time() < self._next_expiry:
+                return
+            self._next_expiry = time.time() + EXPIRE_SECONDS
+        try:
+            if job_store.expire_stale_jobs():
+                self._changed()
+        except Exception as e:
+            print(f"⚠ Could not expire stale jobs: {e}")
+
+    def _worker(self):
+        """Claim and run jobs until stopped"""
+        while not self._stopping:
+            # Before claiming: a dead job would otherwise hold a running slot
+            self._expire_stale_jobs()
+            try:
+                job = job_store.claim_next_job(self.handlers.keys(), self.max_running)
+            except Exception as e:
+                print(f"⚠ Could not claim job: {e}")
+                job = None
+
+            if job is None:
+                with self._wakeup:
+                    self._wakeup.wait(POLL_SECONDS)
+                continue
+
+            self._changed()
+            try:
+                self.handlers[job['kind']](job['id'])
+            except Exception as e:
+                traceback.print_exc()
+                job_store.update_job(job['id'], status=job_store.FAILED, error=f"Unexpected error: {e}")
+            finally:
+                finished = job_store.get_job(job['id'])
+                if finished and finished['status'] not in job_store.FINISHED_STATUSES:
+                    # Handlers normally finish their own job; never leave one stuck in 'running'
+                    job_store.update_job(job['id'], status=job_store.SUCCEEDED)
+                self._changed()
+                # A slot just freed up: let the other workers look for work
+                self._notify()
@@ -0,0 +1,629 @@
+#!/usr/bin/env python3
+"""
+Job Store - SQLite-backed automation jobs for the webhook
+Every trigger becomes a job row with its own status, progress, results and error, and
+every change is appended to job_events. State survives restarts and is shared by all
+worker processes that point at the same database file. Enqueueing and claiming run in
+write-locked transactions, so concurrent triggers and workers never race.
+"""
+
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import uuid
+from datetime import datetime, timedelta
+
+# Location of the SQLite database (override with JOBS_DB_PATH)
+DEFAULT_DB_PATH = os.environ.get(
+    'JOBS_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs.db')
+)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+SUCCEEDED = 'succeeded'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+FINISHED_STATUSES = (SUCCEEDED, FAILED, CANCELLED)
+
+# A running job whose worker has not written anything for this long is presumed dead
+# (e.g. the dyno restarted mid-run) and is marked failed
+STALE_JOB_SECONDS = 600
+
+# Largest page list_jobs() returns
+MAX_PAGE_SIZE = 200
+
+# Fields update_job() accepts; results and params are stored as JSON
+JOB_FIELDS = ('status', 'progress', 'results', 'error', 'started_at', 'finished_at')
+
+# Trigger params that describe the request rather than the run; they do not stop two
+# triggers from being coalesced
+COALESCE_IGNORED_PARAMS = ('triggered_by', 'timestamp')
+
+# Columns added after the first release, created on connect() for older databases
+MIGRATIONS = (
+    ('priority', 'INTEGER NOT NULL DEFAULT 0'),
+    ('cancel_requested', 'INTEGER NOT NULL DEFAULT 0'),
+    ('coalesced', 'INTEGER NOT NULL DEFAULT 0'),
+    ('coalesce_key', 'TEXT'),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    params TEXT,
+    results TEXT,
+    error TEXT,
+    worker TEXT,
+    priority INTEGER NOT NULL DEFAULT 0,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    coalesced INTEGER NOT NULL DEFAULT 0,
+    coalesce_key TEXT,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    finished_at TEXT,
+    updated_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs (created_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    at TEXT NOT NULL,
+    status TEXT NOT NULL,
+    progress INTEGER NOT NULL,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job_id ON job_events (job_id);
+CREATE TABLE IF NOT EXISTS job_callbacks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    delivered_at TEXT,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_job_callbacks_job_id ON job_callbacks (job_id);
+"""
+
+# Databases this process has already created the schema in (see connect())
+_initialized = set()
+_initialized_lock = threading.Lock()
+
+def _initialize(conn):
+    """Create the schema and apply MIGRATIONS"""
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.executescript(SCHEMA)
+
+    columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+    for column, definition in MIGRATIONS:
+        if column not in columns:
+            conn.execute(f'ALTER TABLE jobs ADD COLUMN {column} {definition}')
+
+def connect(db_path=None):
+    """
+    Open the jobs database, creating the schema the first time this process opens it
+
+    Args:
+        db_path (str, optional): Database path. Defaults to DEFAULT_DB_PATH.
+
+    Returns:
+        sqlite3.Connection: Connection with rows returned as sqlite3.Row
+    """
+    path = os.path.abspath(db_path or DEFAULT_DB_PATH)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA synchronous=NORMAL')
+
+    if path not in _initialized:
+        with _initialized_lock:
+            if path not in _initialized:
+                _initialize(conn)
+                _initialized.add(path)
+    return conn
+
+def _now():
+    return datetime.now().isoformat()
+
+def _worker_id():
+    """Identifies the process running a job (host:pid)"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+def _job_from_row(row):
+    """Convert a jobs row into a plain dict with JSON fields decoded"""
+    if row is None:
+        return None
+    job = dict(row)
+    for field in ('params', 'results'):
+        job[field] = json.loads(job[field]) if job[field] else None
+    return job
+
+def _append_event(conn, job_id, message=None):
+    """Record the job's current status/progress in job_events; returns the event id"""
+    row = conn.execute('SELECT status, progress FROM jobs WHERE id = ?', (job_id,)).fetchone()
+    if row is None:
+        return None
+    cursor = conn.execute(
+        'INSERT INTO job_events (job_id, at, status, progress, message) VALUES (?, ?, ?, ?, ?)',
+        (job_id, _now(), row['status'], row['progress'], message)
+    )
+    return cursor.lastrowid
+
+def coalesce_key(params):
+    """Hash of the params that matter for the run (COALESCE_IGNORED_PARAMS left out)"""
+    relevant = {key: value for key, value in (params or {}).items() if key not in COALESCE_IGNORED_PARAMS}
+    return hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode('utf-8')).hexdigest()[:16]
+
+def create_job(kind, params=None, conn=None):
+    """
+    Create a queued job (never coalesced)
+
+    Args:
+        kind (str): What the job does, e.g. 'workflow' or 'selenium-download'
+        params (dict, optional): Trigger parameters, stored as JSON
+        conn (sqlite3.Connection, optional): Open connection
+
+    Returns:
+        dict: The new job
+    """
+    job, _ = enqueue_job(kind, params, coalesce=False, conn=conn)
+    return job
+
+def enqueue_job(kind, params=None, priority=0, coalesce=True, conn=None):
+    """
+    Queue a job, folding it into an identical pending one when possible
+
+    A trigger that arrives while a job of the same kind with the same params is still
+    queued adds nothing new (the queued run will pick up the latest state anyway), so it
+    is coalesced into that job instead, raising its priority if needed. Params are
+    compared by coalesce_key(), so triggers asking for a different run always get their
+    own job. The check and the insert happen under
+    SQLite's write lock, so two concurrent triggers cannot both create a job.
+
+    Args:
+        kind (str): What the job does, e.g. 'workflow' or 'selenium-download'
+        params (dict, optional): Trigger parameters, stored as JSON
+        priority (int): Higher runs first
+        coalesce (bool): Reuse a queued job of the same kind and params
+        conn (sqlite3.Connection, optional): Open connection
+
+    Returns:
+        tuple[dict, bool]: (job, coalesced) - coalesced is True if an existing job was reused
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    key = coalesce_key(params)
+
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            pending = None
+            if coalesce:
+                pending = conn.execute(
+                    'SELECT id, priority FROM jobs WHERE kind = ? AND coalesce_key = ? AND status = ? '
+                    'AND cancel_requested = 0 ORDER BY created_at LIMIT 1',
+                    (kind, key, QUEUED)
+                ).fetchone()
+
+            if pending:
+                job_id = pending['id']
+                conn.execute(
+                    'UPDATE jobs SET priority = ?, coalesced = coalesced + 1, updated_at = ? WHERE id = ?',
+                    (max(pending['priority'], priority), _now(), job_id)
+                )
+                _append_event(conn, job_id, 'Duplicate trigger coalesced')
+            else:
+                job_id = uuid.uuid4().hex
+                now = _now()
+                conn.execute(
+                    'INSERT INTO jobs (id, kind, status, progress, params, priority, coalesce_key, '
+                    'created_at, updated_at) VALUES (?, ?, ?, 0, ?, ?, ?, ?, ?)',
+                    (job_id, kind, QUEUED, json.dumps(params) if params is not None else None,
+                     priority, key, now, now)
+                )
+                _append_event(conn, job_id, 'Job queued')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return get_job(job_id, conn=conn), pending is not None
+    finally:
+        if own_conn:
+            conn.close()
+
+def claim_next_job(kinds=None, max_running=1, conn=None):
+    """
+    Atomically move the highest-priority queued job to running
+
+    Args:
+        kinds (Iterable[str], optional): Only claim jobs of these kinds
+        max_running (int): Claim nothing while this many jobs are already running
+            (across every process sharing the database)
+        conn (sqlite3.Connection, optional): Open connection
+
+    Returns:
+        dict | None: The claimed job, or None if nothing is runnable
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            running = conn.execute('SELECT COUNT(*) FROM jobs WHERE status = ?', (RUNNING,)).fetchone()[0]
+            if running >= max_running:
+                conn.rollback()
+                return None
+
+            query = 'SELECT id FROM jobs WHERE status = ? AND cancel_requested = 0'
+            params = [QUEUED]
+            if kinds:
+                kinds = list(kinds)
+                query += f" AND kind IN ({', '.join('?' * len(kinds))})"
+                params.extend(kinds)
+            row = conn.execute(query + ' ORDER BY priority DESC, created_at LIMIT 1', params).fetchone()
+            if row is None:
+                conn.rollback()
+                return None
+
+            now = _now()
+            conn.execute(
+                'UPDATE jobs SET status = ?, progress = 0, started_at = ?, updated_at = ?, worker = ? WHERE id = ?',
+                (RUNNING, now, now, _worker_id(), row['id'])
+            )
+            _append_event(conn, row['id'], 'Job started')
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        return get_job(row['id'], conn=conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+def cancel_job(job_id, conn=None):
+    """
+    Cancel a job
+
+    Queued jobs are cancelled immediately. Running jobs are flagged and stop at their
+    next cancellation check (see is_cancel_requested()).
+
+    Args:
+        job_id (str): Job to cancel
+        conn (sqlite3.Connection, optional): Open connection
+
+    Returns:
+        dict | None: The job after the request, or None if it does not exist
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        now = _now()
+        with conn:
+            cursor = conn.execute(
+                'UPDATE jobs SET status = ?, cancel_requested = 1, finished_at = ?, updated_at = ? '
+                'WHERE id = ? AND status = ?',
+                (CANCELLED, now, now, job_id, QUEUED)
+            )
+            if cursor.rowcount:
+                _append_event(conn, job_id, 'Cancelled before it started')
+            else:
+                cursor = conn.execute(
+                    'UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = ?',
+                    (now, job_id, RUNNING)
+                )
+                if cursor.rowcount:
+                    _append_event(conn, job_id, 'Cancellation requested')
+        return get_job(job_id, conn=conn)
+    finally:
+        if own_conn:
+            conn.close()
+
+def is_cancel_requested(job_id, conn=None):
+    """True if cancel_job() was called for this job"""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        row = conn.execute('SELECT cancel_requested FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return bool(row and row['cancel_requested'])
+    finally:
+        if own_conn:
+            conn.close()
+
+def queue_position(job_id, conn=None):
+    """
+    Number of queued jobs that will run before this one (0 = next), None if not queued
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        job = conn.execute('SELECT status, priority, created_at FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if job is None or job['status'] != QUEUED:
+            return None
+        return conn.execute(
+            'SELECT COUNT(*) FROM jobs WHERE status = ? AND cancel_requested = 0 AND '
+            '(priority > ? OR (priority = ? AND created_at < ?))',
+            (QUEUED, job['priority'], job['priority'], job['created_at'])
+        ).fetchone()[0]
+    finally:
+        if own_conn:
+            conn.close()
+
+def update_job(job_id, message=None, conn=None, **fields):
+    """
+    Update a job and append a status event
+
+    Args:
+        job_id (str): Job to update
+        message (str, optional): Note stored with the event
+        conn (sqlite3.Connection, optional): Open connection
+        **fields: Any of JOB_FIELDS
+
+    Returns:
+        int | None: Id of the new event (the store-wide status version), None if no such job
+    """
+    unknown = set(fields) - set(JOB_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown job fields: {', '.join(sorted(unknown))}")
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        if 'results' in fields:
+            fields['results'] = json.dumps(fields['results']) if fields['results'] is not None else None
+        if fields.get('status') == RUNNING and 'started_at' not in fields:
+            fields['started_at'] = _now()
+        if fields.get('status') in FINISHED_STATUSES and 'finished_at' not in fields:
+            fields['finished_at'] = _now()
+
+        fields['updated_at'] = _now()
+        fields['worker'] = _worker_id()
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+
+        with conn:
+            cursor = conn.execute(
+                f'UPDATE jobs SET {assignments} WHERE id = ?',
+                list(fields.values()) + [job_id]
+            )
+            if cursor.rowcount == 0:
+                return None
+            return _append_event(conn, job_id, message)
+    finally:
+        if own_conn:
+            conn.close()
+
+def touch_job(job_id, conn=None):
+    """
+    Record that a long-running job is still alive, without appending an event
+
+    Keeps expire_stale_jobs() away from jobs that wait a long time between real updates.
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        with conn:
+            conn.execute('UPDATE jobs SET updated_at = ? WHERE id = ?', (_now(), job_id))
+    finally:
+        if own_conn:
+            conn.close()
+
+def add_callback(job_id, url, conn=None):
+    """
+    Register a URL to be notified when a job finishes
+
+    Kept apart from the job's params so a trigger that is coalesced into an existing
+    job still gets its callback.
+
+    Returns:
+        int: Callback id
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        with conn:
+            cursor = conn.execute(
+                'INSERT INTO job_callbacks (job_id, url, created_at) VALUES (?, ?, ?)',
+                (job_id, url, _now())
+            )
+            return cursor.lastrowid
+    finally:
+        if own_conn:
+            conn.close()
+
+def pending_callbacks(job_id, conn=None):
+    """Callbacks of a job that have not been delivered yet"""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        return [dict(row) for row in conn.execute(
+            'SELECT * FROM job_callbacks WHERE job_id = ? AND delivered_at IS NULL ORDER BY id', (job_id,)
+        )]
+    finally:
+        if own_conn:
+            conn.close()
+
+def record_callback_attempt(callback_id, delivered, error=None, conn=None):
+    """Count a delivery attempt, marking the callback delivered if it succeeded"""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        with conn:
+            conn.execute(
+                'UPDATE job_callbacks SET attempts = attempts + 1, delivered_at = ?, last_error = ? WHERE id = ?',
+                (_now() if delivered else None, error, callback_id)
+            )
+    finally:
+        if own_conn:
+            conn.close()
+
+def get_job(job_id, with_events=False, conn=None):
+    """
+    Look up a job
+
+    Args:
+        job_id (str): Job id
+        with_events (bool): Include the job's status history under 'events'
+        conn (sqlite3.Connection, optional): Open connection
+
+    Returns:
+        dict | None: The job, or None if it does not exist
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        job = _job_from_row(conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone())
+        if job and with_events:
+            job['events'] = [dict(row) for row in conn.execute(
+                'SELECT id, at, status, progress, message FROM job_events WHERE job_id = ? ORDER BY id',
+                (job_id,)
+            )]
+        return job
+    finally:
+        if own_conn:
+            conn.close()
+
+def list_jobs(status=None, limit=50, conn=None):
+    """
+    Most recent jobs first
+
+    Args:
+        status (str, optional): Only jobs with this status
+        limit (int): Page size (capped at MAX_PAGE_SIZE)
+        conn (sqlite3.Connection, optional): Open connection
+
+    Returns:
+        list[dict]: Jobs
+    """
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        if status:
+            rows = conn.execute(
+                'SELECT * FROM jobs WHERE status = ? ORDER BY created_at DESC LIMIT ?', (status, limit)
+            ).fetchall()
+        else:
+            rows = conn.execute('SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?', (limit,)).fetchall()
+        return [_job_from_row(row) for row in rows]
+    finally:
+        if own_conn:
+            conn.close()
+
+def active_job(conn=None):
+    """The oldest queued or running job, or None"""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        row = conn.execute(
+            f"SELECT * FROM jobs WHERE status IN ({', '.join('?' * len(ACTIVE_STATUSES))}) "
+            f"ORDER BY created_at LIMIT 1",
+            ACTIVE_STATUSES
+        ).fetchone()
+        return _job_from_row(row)
+    finally:
+        if own_conn:
+            conn.close()
+
+def latest_job(conn=None):
+    """The most recently created job, or None"""
+    jobs = list_jobs(limit=1, conn=conn)
+    return jobs[0] if jobs else None
+
+def latest_event_id(conn=None):
+    """Id of the newest job event (0 if none); changes whenever any job changes"""
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        return conn.execute('SELECT COALESCE(MAX(id), 0) FROM job_events').fetchone()[0]
+    finally:
+        if own_conn:
+            conn.close()
+
+def expire_stale_jobs(max_age=STALE_JOB_SECONDS, conn=None):
+    """
+    Fail running jobs whose worker stopped updating them
+
+    Args:
+        max_age (int): Seconds without an update before a running job is presumed dead
+        conn (sqlite3.Connection, optional): Open connection
+
+    Returns:
+        int: Number of jobs marked failed
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        cutoff = (datetime.now() - timedelta(seconds=max_age)).isoformat()
+        stale = [row['id'] for row in conn.execute(
+            'SELECT id FROM jobs WHERE status = ? AND updated_at < ?', (RUNNING, cutoff)
+        )]
+        for job_id in stale:
+            update_job(job_id, message='Worker stopped responding', conn=conn,
+                       status=FAILED, error='Job was interrupted (worker restarted or stopped responding)')
+        return len(stale)
+    finally:
+        if own_conn:
+            conn.close()
+
+def main():
+    """Print recent jobs, or one job's history: python job_store.py [job_id]"""
+    conn = connect()
+    try:
+        if len(sys.argv) > 1:
+            job = get_job(sys.argv[1], with_events=True, conn=conn)
+            if not job:
+                print(f"❌ No job {sys.argv[1]}")
+                sys.exit(1)
+            print(f"{job['id']} [{job['kind']}] {job['status']} {job['progress']}%")
+            if job['error']:
+                print(f"  Error: {job['error']}")
+            for event in job['events']:
+                print(f"  {event['at']}  {event['status']:<10} {event['progress']:>3}%  {event['message'] or ''}")
+        else:
+            for job in list_jobs(conn=conn):
+                print(f"{job['created_at']}  {job['id']}  {job['kind']:<18} {job['status']:<10} {job['progress']:>3}%")
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Load Test - concurrent pollers against the webhook's status and results endpoints
+Each poller thread hits the endpoints in turn on its own keep-alive session for the
+given duration, then requests/sec and latency percentiles are reported per endpoint.
+Usage: python load_test.py [--url http://localhost:5000] [--concurrency 50] [--duration 30]
+"""
+
+import argparse
+import threading
+import time
+
+import requests
+
+DEFAULT_ENDPOINTS = ['/api/status', '/api/results']
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (None if it is empty)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def _ms(value):
+    return f"{value:8.1f}" if value is not None else f"{'-':>8}"
+
+def poller(base_url, endpoints, deadline, samples, lock):
+    """
+    Poll the endpoints round-robin until the deadline
+
+    Args:
+        base_url (str): Webhook base URL
+        endpoints (list[str]): Paths to request
+        deadline (float): time.time() at which to stop
+        samples (dict): Endpoint -> {'latencies': [...], 'errors': int}, filled in
+        lock (threading.Lock): Guards samples
+    """
+    session = requests.Session()
+    n = 0
+    while time.time() < deadline:
+        endpoint = endpoints[n % len(endpoints)]
+        n += 1
+        started = time.perf_counter()
+        try:
+            response = session.get(base_url + endpoint, timeout=30)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            if ok:
+                samples[endpoint]['latencies'].append(elapsed)
+            else:
+                samples[endpoint]['errors'] += 1
+
+def run_load_test(base_url, endpoints=None, concurrency=50, duration=30):
+    """
+    Run concurrent pollers and summarize the results
+
+    Returns:
+        dict: Endpoint -> {'requests', 'errors', 'rps', 'p50_ms', 'p99_ms', 'max_ms'}
+    """
+    endpoints = endpoints or DEFAULT_ENDPOINTS
+    samples = {endpoint: {'latencies': [], 'errors': 0} for endpoint in endpoints}
+    lock = threading.Lock()
+    deadline = time.time() + duration
+
+    started = time.time()
+    threads = [
+        threading.Thread(target=poller, args=(base_url.rstrip('/'), endpoints, deadline, samples, lock), daemon=True)
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.time() - started
+
+    report = {}
+    for endpoint, sample in samples.items():
+        latencies = sample['latencies']
+        report[endpoint] = {
+            'requests': len(latencies),
+            'errors': sample['errors'],
+            'rps': len(latencies) / elapsed if elapsed else 0,
+            'p50_ms': percentile(latencies, 50) * 1000 if latencies else None,
+            'p99_ms': percentile(latencies, 99) * 1000 if latencies else None,
+            'max_ms': max(latencies) * 1000 if latencies else None
+        }
+    return report
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the webhook status and results endpoints')
+    parser.add_argument('--url', default='http://localhost:5000', help='Webhook base URL')
+    parser.add_argument('--concurrency', type=int, default=50, help='Concurrent pollers (default: 50)')
+    parser.add_argument('--duration', type=float, default=30, help='Seconds to run (default: 30)')
+    parser.add_argument('--endpoint', action='append', dest='endpoints',
+                       help='Endpoint to poll (repeatable, default: /api/status and /api/results)')
+    args = parser.parse_args()
+
+    print(f"🚀 {args.concurrency} pollers against {args.url} for {args.duration:g}s...")
+    report = run_load_test(args.url, args.endpoints, args.concurrency, args.duration)
+
+    print(f"{'Endpoint':<20} {'Requests':>9} {'Errors':>7} {'Req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for endpoint, row in report.items():
+        print(f"{endpoint:<20} {row['requests']:>9} {row['errors']:>7} {row['rps']:>9.1f} "
+              f"{_ms(row['p50_ms'])} {_ms(row['p99_ms'])} {_ms(row['max_ms'])}")
+
+if __name__ == "__main__":
+    main()
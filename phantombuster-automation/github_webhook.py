@@ -5,8 +5,8 @@ This webhook can be triggered by GitHub to run the selenium automation and retur
 """
 
 from flask import Flask, request, jsonify, render_template_string
-import subprocess
 import os
+import sys
 import json
 import time
 import threading
@@ -14,17 +14,110 @@ from datetime import datetime
 import tempfile
 import shutil
 
+from selenium_worker import SeleniumWorker, WorkerTimeout
+
 app = Flask(__name__)
 
+# The selenium run is killed after this long
+RUN_TIMEOUT_SECONDS = 1800
+
+SELENIUM_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'selenium-automation')
+if not os.path.exists(SELENIUM_DIR):
+    SELENIUM_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The results artifact helpers ship with the selenium script
+sys.path.insert(0, SELENIUM_DIR)
+import results_artifact
+
+# One warm worker process runs every selenium job (started on the first trigger or at startup)
+selenium_worker = SeleniumWorker(SELENIUM_DIR)
+
+# How often the results artifact is re-read while the selenium script runs
+ARTIFACT_POLL_SECONDS = 2
+
+# Share of the overall progress given to scanning agents; downloading files is the rest
+AGENT_PHASE_WEIGHT = 0.8
+
 # Global variables to track automation status
 automation_status = {
     'running': False,
     'last_run': None,
     'last_results': None,
     'last_error': None,
-    'progress': 0
+    'progress': 0,
+    'progress_detail': None,
+    'eta_seconds': None
 }
 
+class ProgressTracker:
+    """Turns the selenium script's progress events into a percentage and an ETA"""
+
+    def __init__(self):
+        self.started = time.time()
+        self.agents_done = 0
+        self.agents_total = 0
+        self.files_done = 0
+        self.files_total = 0
+        self.bytes_done = 0
+        self.downloads_started = None
+        self.finished = False
+
+    def apply(self, event):
+        """Update from one event dict"""
+        kind = event.get('event')
+        if kind == 'run_started':
+            self.agents_total = event.get('agents_total') or 0
+        elif kind == 'agent':
+            self.agents_done = event.get('agents_done', self.agents_done)
+            self.agents_total = event.get('agents_total', self.agents_total)
+        elif kind == 'downloads_started':
+            self.files_total = event.get('files_total') or 0
+            self.downloads_started = time.time()
+        elif kind == 'file':
+            self.files_done = event.get('files_done', self.files_done)
+            self.files_total = event.get('files_total', self.files_total)
+            self.bytes_done = event.get('bytes_done', self.bytes_done)
+        elif kind == 'run_finished':
+            self.finished = True
+
+    def fraction(self):
+        """Overall completion between 0 and 1"""
+        if self.finished:
+            return 1.0
+        agents = self.agents_done / self.agents_total if self.agents_total else 0.0
+        if self.downloads_started is None:
+            return AGENT_PHASE_WEIGHT * agents
+        files = self.files_done / self.files_total if self.files_total else 1.0
+        return AGENT_PHASE_WEIGHT + (1 - AGENT_PHASE_WEIGHT) * files
+
+    def eta_seconds(self):
+        """Seconds left at the throughput seen so far, or None before there is any"""
+        if self.finished:
+            return 0
+        done = self.fraction()
+        if done <= 0:
+            return None
+        elapsed = time.time() - self.started
+        return int(elapsed * (1 - done) / done)
+
+    def snapshot(self):
+        """Progress details for the status endpoints"""
+        phase = 'finished' if self.finished else 'downloading' if self.downloads_started else 'agents'
+        bytes_per_second = None
+        if self.downloads_started is not None:
+            elapsed = time.time() - self.downloads_started
+            bytes_per_second = int(self.bytes_done / elapsed) if elapsed > 0 else None
+        return {
+            'phase': phase,
+            'agents_done': self.agents_done,
+            'agents_total': self.agents_total,
+            'files_done': self.files_done,
+            'files_total': self.files_total,
+            'bytes_done': self.bytes_done,
+            'bytes_per_second': bytes_per_second,
+            'elapsed_seconds': int(time.time() - self.started)
+        }
+
 # HTML template for results display
 RESULTS_TEMPLATE = """
 <!DOCTYPE html>
@@ -81,7 +174,7 @@ RESULTS_TEMPLATE = """
                 <div class="progress-bar">
                     <div class="progress-fill" style="width: {{ automation_status.progress }}%"></div>
                 </div>
-                <p>Progress: {{ automation_status.progress }}%</p>
+                <p>Progress: {{ automation_status.progress }}%{% if automation_status.eta_seconds %} (about {{ (automation_status.eta_seconds // 60) + 1 }} min left){% endif %}</p>
             {% endif %}
         </div>
         
@@ -149,38 +242,48 @@ def run_automation():
         automation_status['running'] = True
         automation_status['progress'] = 0
         automation_status['last_error'] = None
+        automation_status['last_results'] = None
+        automation_status['progress_detail'] = None
+        automation_status['eta_seconds'] = None
         
         print("Starting selenium automation...")
         
-        # Change to the selenium automation directory
-        selenium_dir = os.path.join(os.path.dirname(__file__), 'selenium-automation')
-        if not os.path.exists(selenium_dir):
-            selenium_dir = os.path.dirname(__file__)
-        
-        # Run the selenium script
-        result = subprocess.run(
-            ['python', 'selenium_download.py'],
-            cwd=selenium_dir,
-            capture_output=True,
-            text=True,
-            timeout=1800  # 30 minute timeout
-        )
+        with tempfile.TemporaryDirectory(prefix='selenium-run-') as run_dir:
+            # The script appends its results here as it goes (see results_artifact.py)
+            artifact_path = os.path.join(run_dir, results_artifact.ARTIFACT_FILENAME)
+            summary = results_artifact.new_summary()
+            tracker = ProgressTracker()
+            offset = 0
+            
+            def follow_artifact():
+                nonlocal offset
+                records, offset = results_artifact.read_records(artifact_path, offset)
+                results_artifact.apply_records(summary, records)
+                # Partial results are visible while the run is still going
+                automation_status['last_results'] = dict(summary['results'])
+            
+            # The warm worker already has selenium and friends imported
+            outcome = selenium_worker.run(
+                artifact_path,
+                on_progress=lambda line: apply_progress(tracker, line),
+                on_tick=follow_artifact,
+                timeout=RUN_TIMEOUT_SECONDS,
+                poll_seconds=ARTIFACT_POLL_SECONDS
+            )
+            follow_artifact()
         
-        automation_status['progress'] = 50
+        automation_status['last_results'] = summary['results']
         
-        if result.returncode == 0:
-            # Parse results from the output
-            output = result.stdout
-            results = parse_results_from_output(output)
-            
-            automation_status['last_results'] = results
+        if outcome['ok'] and summary['finished'] and not summary['error']:
             automation_status['progress'] = 100
+            automation_status['eta_seconds'] = 0
             print("Automation completed successfully")
         else:
-            automation_status['last_error'] = f"Automation failed: {result.stderr}"
-            print(f"Automation failed: {result.stderr}")
+            reason = outcome['error'] or summary['error'] or "no results artifact was written"
+            automation_status['last_error'] = f"Automation failed: {reason}"
+            print(f"Automation failed: {reason}")
     
-    except subprocess.TimeoutExpired:
+    except WorkerTimeout:
         automation_status['last_error'] = "Automation timed out after 30 minutes"
         print("Automation timed out")
     except Exception as e:
@@ -190,31 +293,23 @@ def run_automation():
         automation_status['running'] = False
         automation_status['last_run'] = datetime.now().isoformat()
 
-def parse_results_from_output(output):
-    """Parse results from selenium script output"""
+def apply_progress(tracker, line):
+    """
+    Apply one progress event line from the selenium script to automation_status
+
+    Args:
+        tracker (ProgressTracker): Tracker for the current run
+        line (str): JSON event written by report_progress() in selenium_download.py
+    """
     try:
-        # Look for the "Results by folder:" line in the output
-        lines = output.split('\n')
-        results = {}
-        
-        for line in lines:
-            if 'Results by folder:' in line:
-                # Extract the dictionary from the line
-                import re
-                pattern = r"Results by folder:\s*({.*?})"
-                match = re.search(pattern, line, re.DOTALL)
-                
-                if match:
-                    results_str = match.group(1)
-                    # Convert single quotes to double quotes for JSON parsing
-                    results_str = results_str.replace("'", '"')
-                    results = json.loads(results_str)
-                    break
-        
-        return results
-    except Exception as e:
-        print(f"Error parsing results: {e}")
-        return {}
+        event = json.loads(line)
+    except ValueError:
+        return
+    tracker.apply(event)
+    # 100 is only reported once the run's outcome is known
+    automation_status['progress'] = min(99, int(100 * tracker.fraction()))
+    automation_status['progress_detail'] = tracker.snapshot()
+    automation_status['eta_seconds'] = tracker.eta_seconds()
 
 @app.route('/')
 def home():
@@ -300,7 +395,8 @@ def health():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'automation_running': automation_status['running']
+        'automation_running': automation_status['running'],
+        'selenium_worker': selenium_worker.status()
     })
 
 @app.route('/webhook/github', methods=['POST'])
@@ -346,4 +442,7 @@ if __name__ == '__main__':
     print(f"📊 Results page: http://localhost:{port}")
     print(f"🔧 API endpoint: http://localhost:{port}/api/results")
     
+    # Load the selenium imports now rather than on the first trigger
+    selenium_worker.start()
+    
     app.run(host='0.0.0.0', port=port, debug=debug)
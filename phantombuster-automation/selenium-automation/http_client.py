@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+HTTP Client - one retry policy for every outbound HTTP call in the project
+HttpClient wraps a requests.Session and retries connection errors and 429/5xx answers.
+Sleeps use full-jitter exponential backoff, or the server's Retry-After when it sends
+one. Each host gets a circuit breaker, which fails fast after repeated failures instead
+of hammering a host that is down. Each host also gets a retry budget: retries are
+funded by successful traffic, so a partial outage cannot turn every call into a burst
+of retries. Breakers and budgets are shared by every client in the process.
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+# Answers worth retrying; everything else is returned to the caller as is
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Methods retried by default (others only when the caller passes retries=)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+# Backoff before retry n is uniform in [0, min(MAX_DELAY, BASE_DELAY * 2**n)]
+BASE_DELAY = 0.5
+MAX_DELAY = 30
+
+# Never sleep longer than this for a Retry-After header
+MAX_RETRY_AFTER = 120
+
+# Consecutive failures that open a host's breaker, and how long it stays open
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_RESET_SECONDS = 30
+
+# Retry budget per host: every request deposits BUDGET_RATIO of a retry, up to BUDGET_MAX
+BUDGET_RATIO = 0.2
+BUDGET_INITIAL = 10
+BUDGET_MAX = 20
+
+class CircuitOpen(requests.ConnectionError):
+    """The host's circuit breaker is open; the request was not sent"""
+
+def backoff_delay(attempt, base=BASE_DELAY, cap=MAX_DELAY):
+    """Full-jitter exponential backoff: seconds to sleep before retry number attempt (0-based)"""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def retry_after_seconds(response):
+    """
+    Seconds the server asked us to wait, from a Retry-After header
+
+    Returns:
+        float | None: Delay, or None if the header is missing or unreadable
+    """
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=BREAKER_FAILURE_THRESHOLD, reset_seconds=BREAKER_RESET_SECONDS):
+        """
+        Closed until failure_threshold failures in a row, then open (requests fail fast)
+        for reset_seconds, then half-open: one trial request decides whether it closes again
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self._trial_sent = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.time() - self.opened_at < self.reset_seconds:
+            return 'open'
+        return 'half_open'
+
+    def allow(self):
+        """Whether a request may be sent now"""
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial_sent:
+                self._trial_sent = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_sent = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                # A failed trial re-opens the breaker for another reset period
+                self.opened_at = time.time()
+                self._trial_sent = False
+
+class RetryBudget:
+    def __init__(self, ratio=BUDGET_RATIO, initial=BUDGET_INITIAL, maximum=BUDGET_MAX):
+        """Token bucket: each request deposits ratio tokens, each retry spends one"""
+        self.ratio = ratio
+        self.maximum = maximum
+        self.tokens = float(initial)
+        self._lock = threading.Lock()
+
+    def deposit(self):
+        with self._lock:
+            self.tokens = min(self.maximum, self.tokens + self.ratio)
+
+    def withdraw(self):
+        """Spend one retry; False when the budget is exhausted"""
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+# Host -> (CircuitBreaker, RetryBudget), shared by every client in the process
+_hosts = {}
+_hosts_lock = threading.Lock()
+
+def host_state(url):
+    """Circuit breaker and retry budget for the host of url"""
+    host = urlparse(url).netloc
+    with _hosts_lock:
+        if host not in _hosts:
+            _hosts[host] = (CircuitBreaker(), RetryBudget())
+        return _hosts[host]
+
+class HttpClient:
+    def __init__(self, session=None, retries=3, retry_statuses=RETRY_STATUSES):
+        """
+        Initialize the client
+
+        Args:
+            session (requests.Session, optional): Session to send requests with
+            retries (int): Default retries for idempotent methods
+            retry_statuses (tuple[int]): Status codes that are retried
+        """
+        self.session = session or requests.Session()
+        self.retries = retries
+        self.retry_statuses = retry_statuses
+        self.stats = {'requests': 0, 'retries': 0, 'wait_seconds': 0.0, 'short_circuited': 0}
+
+    @property
+    def headers(self):
+        return self.session.headers
+
+    def retry_delay(self, url, attempt, response=None):
+        """
+        Seconds to wait before retrying a failed attempt, if a retry is allowed
+
+        Args:
+            url (str): Request URL (selects the host's breaker and budget)
+            attempt (int): 0-based number of the attempt that failed
+            response (requests.Response, optional): The failed answer, for Retry-After
+
+        Returns:
+            float | None: Delay, or None when the breaker is open or the budget is spent
+        """
+        breaker, budget = host_state(url)
+        if breaker.state == 'open' or not budget.withdraw():
+            return None
+        retry_after = retry_after_seconds(response)
+        if retry_after is not None:
+            return min(retry_after, MAX_RETRY_AFTER)
+        return backoff_delay(attempt)
+
+    def wait(self, seconds):
+        """Sleep before a retry, counting it in stats"""
+        self.stats['retries'] += 1
+        self.stats['wait_seconds'] += seconds
+        time.sleep(seconds)
+
+    def request(self, method, url, retries=None, **kwargs):
+        """
+        Send a request, retrying connection errors and retryable statuses
+
+        Args:
+            method (str): HTTP method
+            url (str): URL
+            retries (int, optional): Retries for this call. Defaults to self.retries for
+                idempotent methods and 0 for the rest.
+            **kwargs: Passed to requests.Session.request
+
+        Returns:
+            requests.Response: The first non-retryable answer, or the last answer once retries run out
+
+        Raises:
+            CircuitOpen: The host's breaker is open
+            requests.RequestException: The last attempt failed to connect
+        """
+        if retries is None:
+            retries = self.retries if method.upper() in IDEMPOTENT_METHODS else 0
+        breaker, budget = host_state(url)
+
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self.stats['short_circuited'] += 1
+                raise CircuitOpen(f"Circuit open for {urlparse(url).netloc}; not sending {method} {url}")
+
+            self.stats['requests'] += 1
+            budget.deposit()
+            response = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.RequestException:
+                breaker.record_failure()
+                delay = self.retry_delay(url, attempt) if attempt < retries else None
+                if delay is None:
+                    raise
+            else:
+                # 429 means the host is up, just busy: only 5xx answers count against the breaker
+                if response.status_code >= 500:
+                    breaker.record_failure()
+                else:
+                    breaker.record_success()
+                if response.status_code not in self.retry_statuses:
+                    return response
+                delay = self.retry_delay(url, attempt, response) if attempt < retries else None
+                if delay is None:
+                    return response
+                response.close()
+
+            self.wait(delay)
+            attempt += 1
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Results Artifact - machine-readable record of a Selenium download run
+run_selenium_download() appends one JSON object per line (NDJSON) as it goes: one record
+when the run starts, one per agent once its result IDs are known, one per downloaded
+file and one when the run finishes. Every record names its folder the same way: the S3
+folder without its trailing slash, as in the result file names. Consumers read the file
+directly (or tail it for partial results mid-run) instead of regex-parsing
+"Results by folder:" out of the log.
+Usage: python results_artifact.py [result_files/results.ndjson]
+"""
+
+import json
+import os
+import sys
+import uuid
+from datetime import datetime
+
+ARTIFACT_FILENAME = "results.ndjson"
+
+# Record types, in the order a run writes them
+RUN_STARTED = 'run_started'
+AGENT = 'agent'
+FILE = 'file'
+RUN_FINISHED = 'run_finished'
+
+def default_artifact_path(download_dir="result_files"):
+    """Artifact location: RESULTS_ARTIFACT_PATH, or results.ndjson in the download directory"""
+    return os.environ.get('RESULTS_ARTIFACT_PATH') or os.path.join(download_dir, ARTIFACT_FILENAME)
+
+class ResultsArtifactWriter:
+    def __init__(self, path):
+        """
+        Start a new artifact (truncating any previous run's)
+
+        Args:
+            path (str): Where to write the NDJSON records
+        """
+        self.path = path
+        self.run_id = uuid.uuid4().hex
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Line buffered: every record is visible to readers as soon as it is written
+        self._file = open(path, 'w', buffering=1, encoding='utf-8')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, record_type, **fields):
+        """Append one record"""
+        record = {'type': record_type, 'run_id': self.run_id, 'at': datetime.now().isoformat()}
+        record.update(fields)
+        self._file.write(json.dumps(record) + '\n')
+
+    def run_started(self, agents):
+        self.write(RUN_STARTED, agents=agents)
+
+    def agent(self, folder, file_ids, agent_id=None, error=None):
+        self.write(AGENT, folder=folder.rstrip('/'), file_ids=list(file_ids), agent_id=agent_id, error=error)
+
+    def file(self, folder, file_id, path=None, size=None, error=None):
+        self.write(FILE, folder=folder.rstrip('/'), file_id=file_id, path=path, size=size,
+                   status='failed' if error else 'saved', error=error)
+
+    def run_finished(self, error=None):
+        self.write(RUN_FINISHED, error=error)
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+def read_records(path, offset=0):
+    """
+    Read the complete records written since offset
+
+    A trailing line without its newline is still being written and is left for the next
+    call, so tailing a live artifact never sees half a record.
+
+    Args:
+        path (str): Artifact path
+        offset (int): Byte offset returned by the previous call (0 to read from the start)
+
+    Returns:
+        tuple[list[dict], int]: (records, new offset)
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+
+    end = data.rfind(b'\n') + 1
+    records = []
+    for line in data[:end].splitlines():
+        if line.strip():
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records, offset + end
+
+def new_summary():
+    """Empty summary for apply_records()"""
+    return {
+        'run_id': None,
+        'started_at': None,
+        'finished_at': None,
+        'finished': False,
+        'error': None,
+        'agents_total': 0,
+        'agents_done': 0,
+        'files_total': 0,
+        'files_saved': 0,
+        'files_failed': 0,
+        'bytes_saved': 0,
+        'results': {}
+    }
+
+def apply_records(summary, records):
+    """
+    Fold records into a summary (incrementally, for tailing)
+
+    Args:
+        summary (dict): From new_summary() or a previous apply_records() call
+        records (list[dict]): Records from read_records()
+
+    Returns:
+        dict: The same summary, updated in place
+    """
+    for record in records:
+        record_type = record.get('type')
+        if record_type == RUN_STARTED:
+            summary.update(new_summary())
+            summary['run_id'] = record.get('run_id')
+            summary['started_at'] = record.get('at')
+            summary['agents_total'] = record.get('agents') or 0
+        elif record_type == AGENT:
+            summary['results'][record['folder']] = record.get('file_ids') or []
+            summary['agents_done'] += 1
+            summary['files_total'] += len(record.get('file_ids') or [])
+        elif record_type == FILE:
+            if record.get('status') == 'saved':
+                summary['files_saved'] += 1
+                summary['bytes_saved'] += record.get('size') or 0
+            else:
+                summary['files_failed'] += 1
+        elif record_type == RUN_FINISHED:
+            summary['finished'] = True
+            summary['finished_at'] = record.get('at')
+            summary['error'] = record.get('error')
+    return summary
+
+def load_summary(path):
+    """Summary of a whole artifact, or None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    records, _ = read_records(path)
+    return apply_records(new_summary(), records)
+
+def load_results(path):
+    """
+    Folder -> file IDs from an artifact (the shape "Results by folder:" used to log)
+
+    Returns:
+        dict | None: Results, or None if the artifact does not exist
+    """
+    summary = load_summary(path)
+    return summary['results'] if summary else None
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else default_artifact_path()
+    summary = load_summary(path)
+    if summary is None:
+        print(f"❌ No results artifact at {path}")
+        sys.exit(1)
+
+    state = 'finished' if summary['finished'] else 'in progress'
+    print(f"Run {summary['run_id']} ({state}), started {summary['started_at']}")
+    print(f"Agents: {summary['agents_done']}/{summary['agents_total']} | "
+          f"Files: {summary['files_saved']} saved, {summary['files_failed']} failed of {summary['files_total']} "
+          f"({summary['bytes_saved']} bytes)")
+    if summary['error']:
+        print(f"Error: {summary['error']}")
+    for folder, file_ids in summary['results'].items():
+        print(f"  {folder}: {len(file_ids)} files")
+
+if __name__ == "__main__":
+    main()
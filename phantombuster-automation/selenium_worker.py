@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Selenium Worker - long-lived process that runs selenium_download.py jobs
+Importing selenium, googleapiclient and dropbox takes seconds, so instead of starting a
+fresh interpreter per trigger the webhook keeps one worker process with those imports
+loaded and hands it jobs over a pipe. Progress events come back over the same pipe. The
+worker is recycled after a number of jobs or once its memory grows past a cap.
+"""
+
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+try:
+    import resource
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+# Start a new worker after this many jobs (override with SELENIUM_WORKER_MAX_JOBS)
+MAX_JOBS_PER_WORKER = int(os.environ.get('SELENIUM_WORKER_MAX_JOBS', 20))
+
+# Start a new worker once its peak memory passes this (override with SELENIUM_WORKER_MAX_MEMORY_MB)
+MAX_WORKER_MEMORY_MB = int(os.environ.get('SELENIUM_WORKER_MAX_MEMORY_MB', 1024))
+
+# Seconds to wait for a worker to exit before it is killed
+STOP_TIMEOUT = 10
+
+class WorkerTimeout(Exception):
+    """The job ran past its timeout; the worker was killed"""
+
+class WorkerCrashed(Exception):
+    """The worker process died in the middle of a job"""
+
+def _peak_memory_mb():
+    """Peak resident memory of this process in MB, or None where it cannot be measured"""
+    if not RESOURCE_AVAILABLE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class _ProgressStream:
+    """File-like stand-in for the progress pipe: each write becomes one message to the parent"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def write(self, text):
+        self.conn.send(('progress', text))
+
+    def close(self):
+        pass
+
+def _worker_main(selenium_dir, conn):
+    """
+    Worker process body: import selenium_download once, then run jobs until told to stop
+
+    Args:
+        selenium_dir (str): Directory holding selenium_download.py (also the working directory)
+        conn (multiprocessing.connection.Connection): Job and result channel to the parent
+    """
+    os.chdir(selenium_dir)
+    sys.path.insert(0, selenium_dir)
+    import selenium_download
+
+    conn.send(('ready', {'pid': os.getpid(), 'memory_mb': _peak_memory_mb()}))
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        os.environ['RESULTS_ARTIFACT_PATH'] = job['artifact_path']
+        outcome = {'ok': True, 'error': None, 'logs': None}
+        try:
+            outcome['logs'] = selenium_download.run_selenium_download(progress=_ProgressStream(conn))
+        except Exception as e:
+            outcome['ok'] = False
+            outcome['error'] = str(e)
+            outcome['logs'] = traceback.format_exc()
+        outcome['memory_mb'] = _peak_memory_mb()
+        conn.send(('done', outcome))
+
+class SeleniumWorker:
+    def __init__(self, selenium_dir, max_jobs=None, max_memory_mb=None):
+        """
+        Initialize the worker handle (the process starts on start() or the first run())
+
+        Args:
+            selenium_dir (str): Directory holding selenium_download.py
+            max_jobs (int, optional): Jobs before recycling. Defaults to MAX_JOBS_PER_WORKER.
+            max_memory_mb (int, optional): Memory cap before recycling. Defaults to MAX_WORKER_MEMORY_MB.
+        """
+        self.selenium_dir = os.path.abspath(selenium_dir)
+        self.max_jobs = max_jobs or MAX_JOBS_PER_WORKER
+        self.max_memory_mb = max_memory_mb or MAX_WORKER_MEMORY_MB
+        # spawn rather than fork: the webhook has threads running, and fork only copies one
+        self._context = multiprocessing.get_context('spawn')
+        self._process = None
+        self._conn = None
+        self.jobs_done = 0
+        self.memory_mb = None
+        self.recycled = 0
+
+    def start(self):
+        """Start the worker process if it is not already running (imports load in the background)"""
+        if self._process is not None and self._process.is_alive():
+            return
+        self._close()
+        parent_conn, child_conn = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_worker_main,
+            args=(self.selenium_dir, child_conn),
+            name='selenium-worker',
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        self.jobs_done = 0
+        self.memory_mb = None
+        print(f"✓ Selenium worker started (pid {self._process.pid})")
+
+    def stop(self):
+        """Ask the worker to exit, killing it if it does not"""
+        if self._process is None:
+            return
+        try:
+            self._conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self._process.join(STOP_TIMEOUT)
+        if self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._close()
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+        self._process = None
+        self._conn = None
+
+    def _kill(self):
+        if self._process is not None and self._process.is_alive():
+            self._process.kill()
+            self._process.join()
+        self._close()
+
+    def status(self):
+        """Worker state for the status endpoints"""
+        return {
+            'pid': self._process.pid if self._process is not None and self._process.is_alive() else None,
+            'jobs_done': self.jobs_done,
+            'max_jobs': self.max_jobs,
+            'memory_mb': round(self.memory_mb, 1) if self.memory_mb is not None else None,
+            'max_memory_mb': self.max_memory_mb,
+            'recycled': self.recycled
+        }
+
+    def run(self, artifact_path, on_progress=None, on_tick=None, timeout=1800, poll_seconds=2):
+        """
+        Run one selenium_download job in the worker
+
+        Args:
+            artifact_path (str): Where the job writes its results artifact
+            on_progress (callable, optional): Called with each progress event line
+            on_tick (callable, optional): Called every poll_seconds while the job runs
+            timeout (int): Seconds before the worker is killed
+            poll_seconds (float): Tick interval
+
+        Returns:
+            dict: {'ok', 'error', 'logs', 'memory_mb'}
+
+        Raises:
+            WorkerTimeout: The job ran past the timeout
+            WorkerCrashed: The worker process died during the job
+        """
+        self.start()
+        deadline = time.time() + timeout
+        self._conn.send({'artifact_path': artifact_path})
+
+        outcome = None
+        while outcome is None:
+            if time.time() > deadline:
+                self._kill()
+                raise WorkerTimeout(f"Selenium job timed out after {timeout} seconds")
+            try:
+                if self._conn.poll(poll_seconds):
+                    kind, payload = self._conn.recv()
+                    if kind == 'progress' and on_progress:
+                        on_progress(payload)
+                    elif kind == 'done':
+                        outcome = payload
+                elif not self._process.is_alive():
+                    raise EOFError
+            except (EOFError, OSError):
+                exitcode = None
+                if self._process is not None:
+                    self._process.join(1)
+                    exitcode = self._process.exitcode
+                self._kill()
+                raise WorkerCrashed(f"Selenium worker exited during the job (exit code {exitcode})")
+            if on_tick:
+                on_tick()
+
+        self.jobs_done += 1
+        self.memory_mb = outcome.get('memory_mb')
+        self._recycle_if_needed()
+        return outcome
+
+    def _recycle_if_needed(self):
+        """Watchdog: replace the worker after max_jobs jobs or once it passes the memory cap"""
+        reason = None
+        if self.jobs_done >= self.max_jobs:
+            reason = f"{self.jobs_done} jobs"
+        elif self.memory_mb is not None and self.memory_mb > self.max_memory_mb:
+            reason = f"{self.memory_mb:.0f} MB peak memory"
+        if reason is None:
+            return
+        print(f"⚠ Recycling selenium worker after {reason}")
+        self.stop()
+        self.recycled += 1
+        # Warm the replacement now so the next trigger does not pay for the imports
+        self.start()
@@ -1,36 +1,38 @@
 #!/usr/bin/env python3
 """
 Script to update webhook results from selenium script execution
-This extracts the results from the selenium script logs and updates the webhook data
+This reads the results artifact written by the selenium script and updates the webhook data
+Usage: python update_webhook_results.py [result_files/results.ndjson]
 """
 
 import re
 import json
 import os
+import sys
 from datetime import datetime
 
-def extract_results_from_log(log_content):
+try:
+    import results_artifact
+except ImportError:
+    # Packaged layout: the artifact helpers ship with the selenium script
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'selenium-automation'))
+    import results_artifact
+
+def load_results_from_artifact(artifact_path):
     """
-    Extract the results dictionary from selenium script log content
+    Read the results by folder from the NDJSON artifact written by selenium_download.py
+
+    Agent records are applied in order, so an artifact from a run that is still going
+    (or that died part way) yields the folders processed so far.
     """
-    # Look for the "Results by folder:" line in the log
-    pattern = r"Results by folder:\s*({.*?})"
-    match = re.search(pattern, log_content, re.DOTALL)
-    
-    if match:
-        try:
-            # Extract the dictionary string and evaluate it
-            results_str = match.group(1)
-            # Convert single quotes to double quotes for JSON parsing
-            results_str = results_str.replace("'", '"')
-            results = json.loads(results_str)
-            return results
-        except (json.JSONDecodeError, ValueError) as e:
-            print(f"Error parsing results: {e}")
-            return None
-    else:
-        print("No results found in log content")
+    summary = results_artifact.load_summary(artifact_path)
+    if summary is None:
+        print(f"No results artifact at {artifact_path}")
         return None
+    
+    if not summary['finished']:
+        print(f"Results artifact {artifact_path} is from an unfinished run, using partial results")
+    return summary['results']
 
 def update_webhook_data(results):
     """
@@ -71,8 +73,13 @@ def main():
     """
     Main function to update webhook results
     """
-    # This would typically read from a log file or database
-    # For now, we'll use the sample data
+    artifact_path = sys.argv[1] if len(sys.argv) > 1 else results_artifact.default_artifact_path()
+    results = load_results_from_artifact(artifact_path)
+    if results is not None:
+        print(f"Loaded results from {artifact_path}")
+        return publish_results(results)
+    
+    # No run output to publish: fall back to the sample data
     sample_results = {
         'zb3ZwQnVuZcM0cfCNbQoIQ/': ['000000108', '000000107', '000000106', '000000105', '000000104'],
         'EQl5K9ngclSt6QfdgqaWOQ/': ['000000078', '000000077', '000000076', '000000075', '000000074'],
@@ -126,13 +133,18 @@ def main():
         'HaRj88fFDQql8W10JnGp5Q/': ['000000063', '000000062', '000000061', '000000060']
     }
     
-    # Update the webhook with the results
-    success = update_webhook_data(sample_results)
+    return publish_results(sample_results)
+
+def publish_results(results):
+    """
+    Update the webhook with results and report the outcome
+    """
+    success = update_webhook_data(results)
     
     if success:
         print("Webhook updated successfully!")
-        print(f"Total folders: {len(sample_results)}")
-        print(f"Total files: {sum(len(files) for files in sample_results.values())}")
+        print(f"Total folders: {len(results)}")
+        print(f"Total files: {sum(len(files) for files in results.values())}")
     else:
         print("Failed to update webhook")
     
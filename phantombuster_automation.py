@@ -2,7 +2,9 @@
 """
 Phantombuster Complete Automation
 This is the main script that handles everything: trigger webhook, wait, and download files.
-No rate limit issues - uses Git clone instead of API calls.
+No rate limit issues - uses Git instead of API calls. Results come from the run's
+manifest-verified results bundle (a release asset, one request), or from a persistent
+sparse, shallow mirror of the repository that only ever holds the latest result_files/.
 """
 
 import os
@@ -11,36 +13,163 @@ import time
 import subprocess
 import shutil
 import argparse
+import base64
+import hashlib
+import hmac
+import json
+import threading
 import requests
 from datetime import datetime
 
+import dir_sync
+import results_bundle
+from http_client import HttpClient
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 # Configuration (override via environment variables)
 # PHANTOMBUSTER_WEBHOOK_URL: Base URL of the Heroku webhook app (e.g., https://your-app.herokuapp.com)
 # GITHUB_REPOSITORY: GitHub repo in owner/name format
 WEBHOOK_URL = os.getenv("PHANTOMBUSTER_WEBHOOK_URL", "https://phantombuster-webhook-72a87a1e67bb.herokuapp.com")
 GITHUB_REPO = os.getenv("GITHUB_REPOSITORY", "integrusautomation/selenium-download-automation")
+GITHUB_BRANCH = os.getenv("GITHUB_BRANCH", "main")
+
+# Directory checked out in the mirror, and the mirror's default location inside the output directory
+RESULTS_PATH = "result_files"
+MIRROR_DIRNAME = ".repo_mirror"
+
+# Results bundle to fetch instead of the run's release asset (e.g. a local HTTP stand-in)
+RESULTS_BUNDLE_URL = os.getenv("RESULTS_BUNDLE_URL")
+
+# Where a bundle is verified and unpacked before it is synced into result_files/
+BUNDLE_STAGING_DIRNAME = ".bundle_staging"
+
+# Where results come from: the published bundle, or the Git mirror (deprecated: it only
+# has results while the workflow still commits them)
+SOURCE_BUNDLE = 'bundle'
+SOURCE_GIT = 'git'
+
+# Retries per trigger endpoint (connection errors and 429/5xx, with jittered backoff)
+TRIGGER_RETRIES = 4
+
+# Shared retry policy for calls to the webhook (see http_client.py)
+webhook_http = HttpClient()
+
+# Long-poll window for /api/status?wait= (Heroku's router drops requests after 30s)
+STATUS_WAIT_SECONDS = 25
+
+# Shared with the webhook to verify completion callbacks (CALLBACK_SECRET on both sides)
+CALLBACK_SECRET = os.getenv("CALLBACK_SECRET")
+
+# Trigger API key (SELENIUM_TRIGGER_API_KEY on the webhook); required to register a callback
+TRIGGER_API_KEY = os.getenv("SELENIUM_TRIGGER_API_KEY")
+
+# Callbacks signed longer ago than this are rejected as replays
+CALLBACK_MAX_AGE_SECONDS = 300
+
+class CallbackReceiver:
+    """
+    Tiny local HTTP server that waits for the webhook's signed completion callback
+
+    It binds to localhost and only accepts signed callbacks: expose it to the webhook
+    through a tunnel or reverse proxy and pass that public URL as the callback URL.
+    """
+
+    def __init__(self, secret, host='127.0.0.1', port=8765):
+        if not secret:
+            raise ValueError("CallbackReceiver needs a secret to verify callbacks")
+        self.secret = secret
+        self.payloads = {}
+        self._arrived = threading.Condition()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.port = self.server.server_address[1]
+
+    def _handler(self):
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if not receiver.verify(body, self.headers.get('X-Callback-Timestamp'),
+                                       self.headers.get('X-Callback-Signature')):
+                    self.send_response(401)
+                    self.end_headers()
+                    return
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                self.send_response(204)
+                self.end_headers()
+                with receiver._arrived:
+                    receiver.payloads[payload.get('job_id')] = payload
+                    receiver._arrived.notify_all()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def verify(self, body, timestamp, signature):
+        """Check the HMAC signature and its age"""
+        if not timestamp or not signature:
+            return False
+        try:
+            if abs(time.time() - int(timestamp)) > CALLBACK_MAX_AGE_SECONDS:
+                return False
+        except ValueError:
+            return False
+        expected = hmac.new(self.secret.encode('utf-8'), f"{timestamp}.".encode('utf-8') + body, hashlib.sha256)
+        return hmac.compare_digest(f"sha256={expected.hexdigest()}", signature)
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"📬 Listening for the completion callback on {self.server.server_address[0]}:{self.port}")
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def wait(self, job_id, timeout):
+        """
+        Block until the callback for job_id arrives
+
+        Returns:
+            dict | None: The completion payload, or None on timeout
+        """
+        deadline = time.time() + timeout
+        with self._arrived:
+            while job_id not in self.payloads:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._arrived.wait(remaining)
+            return self.payloads[job_id]
 
 def _heroku_warmup(base_url: str, attempts: int = 3) -> None:
     """Best-effort warm-up for Heroku dyno cold starts."""
     try:
-        for _ in range(attempts):
-            try:
-                # Prefer explicit health endpoint if available
-                requests.get(f"{base_url}/api/health", timeout=8)
-                return
-            except Exception:
-                try:
-                    # Fallback to root
-                    requests.get(base_url, timeout=8)
-                    return
-                except Exception:
-                    time.sleep(2)
-    except Exception:
-        # Non-fatal
-        pass
-
-def trigger_webhook():
-    """Trigger the webhook to start the automation"""
+        # Prefer explicit health endpoint if available (503s while the dyno boots are retried)
+        webhook_http.get(f"{base_url}/api/health", timeout=8, retries=attempts - 1)
+    except requests.RequestException:
+        try:
+            # Fallback to root
+            webhook_http.get(base_url, timeout=8, retries=0)
+        except requests.RequestException:
+            # Non-fatal
+            pass
+
+def trigger_webhook(callback_url=None):
+    """
+    Trigger the webhook to start the automation
+
+    Args:
+        callback_url (str, optional): URL the webhook POSTs the outcome to when the job finishes
+
+    Returns:
+        dict | None: The webhook's answer (with job_id), or None if the trigger failed
+    """
     print("🚀 Triggering Phantombuster webhook...")
 
     try:
@@ -55,42 +184,50 @@ def trigger_webhook():
         ]
         
         last_status = None
+        body = {"triggered_by": "automation_script", "timestamp": datetime.now().isoformat()}
+        headers = {"X-API-Key": TRIGGER_API_KEY} if TRIGGER_API_KEY else {}
+        if callback_url:
+            body["callback_url"] = callback_url
+            # /trigger is unauthenticated and refuses callbacks
+            endpoints = endpoints[:1]
         for endpoint in endpoints:
-            for attempt in range(1, 6):
-                try:
-                    response = requests.post(
-                        endpoint,
-                        json={"triggered_by": "automation_script", "timestamp": datetime.now().isoformat()},
-                        timeout=35
-                    )
-                    last_status = response.status_code
-                    if response.status_code in [200, 202]:
-                        result = response.json()
-                        print(f"✅ Webhook triggered via {endpoint}: {result.get('message', 'OK')}")
-                        return True
-                    else:
-                        print(f"⚠️  Trigger attempt {attempt}/5 on {endpoint} failed: {response.status_code}")
-                except Exception as e:
-                    print(f"⚠️  Trigger attempt {attempt}/5 on {endpoint} error: {e}")
-
-                # Exponential backoff between attempts
-                time.sleep(min(2 ** attempt, 15))
-            
-            # If first endpoint worked, don't try the second
-            if last_status in [200, 202]:
-                break
+            try:
+                # Duplicate triggers are coalesced by the webhook, so the POST is safe to retry
+                response = webhook_http.post(endpoint, json=body, headers=headers, timeout=35,
+                                             retries=TRIGGER_RETRIES)
+            except requests.RequestException as e:
+                print(f"⚠️  Trigger on {endpoint} error: {e}")
+                continue
+            last_status = response.status_code
+            if response.status_code in [200, 202]:
+                result = response.json()
+                print(f"✅ Webhook triggered via {endpoint}: {result.get('message', 'OK')}")
+                return result
+            print(f"⚠️  Trigger on {endpoint} failed: {response.status_code} {response.text[:200]}")
 
         print(f"❌ Failed to trigger webhook after retries. Last status: {last_status}")
-        return False
+        return None
             
     except Exception as e:
         print(f"❌ Error triggering webhook: {e}")
-        return False
+        return None
+
+def check_webhook_status(wait=None, since=None):
+    """
+    Check the current status of the webhook
 
-def check_webhook_status():
-    """Check the current status of the webhook"""
+    Args:
+        wait (float, optional): Long-poll - let the server hold the request until the
+            status changes, for up to this many seconds
+        since (int, optional): Status version already seen by the caller
+    """
+    params = {}
+    if wait:
+        params['wait'] = wait
+        if since is not None:
+            params['since'] = since
     try:
-        response = requests.get(f"{WEBHOOK_URL}/api/status", timeout=15)
+        response = requests.get(f"{WEBHOOK_URL}/api/status", params=params, timeout=15 + (wait or 0))
         if response.status_code == 200:
             return response.json()
         else:
@@ -98,31 +235,65 @@ def check_webhook_status():
     except:
         return None
 
-def wait_for_completion(timeout_minutes=30):
-    """Wait for the automation to complete"""
+def wait_for_completion(timeout_minutes=60):
+    """
+    Wait for the automation to complete
+
+    Returns:
+        dict | None: Final status (with the tracked workflow_run, when the server
+            follows the GitHub Actions run), or None if it failed or timed out
+    """
     print(f"⏳ Waiting for automation to complete (timeout: {timeout_minutes} minutes)...")
     
     start_time = time.time()
     timeout_seconds = timeout_minutes * 60
+    version = None
     
     while time.time() - start_time < timeout_seconds:
-        status = check_webhook_status()
+        remaining = timeout_seconds - (time.time() - start_time)
+        status = check_webhook_status(wait=min(STATUS_WAIT_SECONDS, max(remaining, 1)), since=version)
         if status:
             if status.get('running'):
                 progress = status.get('progress', 0)
-                print(f"🔄 Automation running... Progress: {progress}%")
+                run = status.get('workflow_run')
+                run_state = f" (workflow run {run['run_id']}: {run['status']})" if run else ""
+                print(f"🔄 Automation running... Progress: {progress}%{run_state}")
             else:
                 if status.get('last_error'):
                     print(f"❌ Automation failed: {status['last_error']}")
-                    return False
+                    return None
                 else:
                     print("✅ Automation completed successfully!")
-                    return True
+                    return status
+            
+            if status.get('version') is not None:
+                # The server supports long-polling: ask again right away
+                version = status['version']
+                continue
         
-        time.sleep(30)  # Check every 30 seconds
+        time.sleep(30)  # Older server (or no response): check every 30 seconds
     
     print(f"⏰ Timeout reached ({timeout_minutes} minutes)")
-    return False
+    return None
+
+def wait_for_callback(receiver, job_id, timeout_minutes=60):
+    """
+    Block until the webhook's completion callback for the job arrives
+
+    Returns:
+        dict | None: The payload if the job succeeded, otherwise None
+    """
+    print(f"⏳ Waiting for the completion callback for job {job_id} (timeout: {timeout_minutes} minutes)...")
+    payload = receiver.wait(job_id, timeout_minutes * 60)
+    if payload is None:
+        print(f"⏰ Timeout reached ({timeout_minutes} minutes)")
+        return None
+    if payload.get('status') != 'succeeded':
+        print(f"❌ Automation {payload.get('status')}: {payload.get('error')}")
+        return None
+    print(f"✅ Automation completed: results commit {payload.get('commit_sha') or 'none'}, "
+          f"{len(payload.get('files') or [])} files")
+    return payload
 
 def wait_for_files_to_be_committed():
     """Wait additional time for files to be committed to repository"""
@@ -136,54 +307,100 @@ def wait_for_files_to_be_committed():
     
     print("✅ Wait period completed - files should now be available")
 
-def download_files(output_dir, token=None):
-    """Download files using Git clone (no rate limits)"""
+def _git(args, cwd=None, token=None, timeout=300):
+    """
+    Run a git command
+
+    The token is passed as a per-command auth header, so it never ends up in the
+    mirror's .git/config.
+
+    Returns:
+        subprocess.CompletedProcess: Finished command (check returncode)
+    """
+    command = ['git']
+    if token:
+        credentials = base64.b64encode(f"x-access-token:{token}".encode()).decode()
+        command += ['-c', f'http.https://github.com/.extraheader=Authorization: Basic {credentials}']
+    if cwd:
+        command += ['-C', cwd]
+    return subprocess.run(command + args, capture_output=True, text=True, timeout=timeout)
+
+def _clone_mirror(mirror_dir, token=None):
+    """Shallow, blobless, sparse clone with only result_files/ checked out"""
+    repo_url = f"https://github.com/{GITHUB_REPO}.git"
+    os.makedirs(os.path.dirname(os.path.abspath(mirror_dir)), exist_ok=True)
+    result = _git(['clone', '--depth', '1', '--filter=blob:none', '--sparse',
+                   '--branch', GITHUB_BRANCH, repo_url, mirror_dir], token=token)
+    if result.returncode != 0:
+        print(f"❌ Clone failed: {result.stderr}")
+        return False
+    result = _git(['sparse-checkout', 'set', RESULTS_PATH], cwd=mirror_dir, token=token)
+    if result.returncode != 0:
+        print(f"❌ Sparse checkout failed: {result.stderr}")
+        return False
+    return True
+
+def sync_mirror(mirror_dir, token=None):
+    """
+    Bring the local mirror up to the latest commit, cloning it on first use
+
+    Only the newest commit and the result_files/ blobs it references are fetched. After
+    the update, objects from earlier runs are pruned, so disk use follows the latest
+    results rather than the repository's history.
+
+    Args:
+        mirror_dir (str): Where the mirror lives between runs
+        token (str, optional): GitHub token for private repositories
+
+    Returns:
+        bool: True if the mirror is at the latest commit
+    """
+    if not os.path.isdir(os.path.join(mirror_dir, '.git')):
+        print(f"🔄 Creating sparse mirror of {GITHUB_REPO} in {mirror_dir}...")
+        if not _clone_mirror(mirror_dir, token):
+            return False
+        print("✅ Mirror created")
+        return True
+
+    print("🔄 Fetching latest results into mirror...")
+    fetch = _git(['fetch', '--depth', '1', '--filter=blob:none', 'origin', GITHUB_BRANCH], cwd=mirror_dir, token=token)
+    reset = fetch.returncode == 0 and _git(['reset', '--hard', 'FETCH_HEAD'], cwd=mirror_dir, token=token)
+    if not reset or reset.returncode != 0:
+        # A broken mirror is cheap to rebuild: start over from a fresh clone
+        print(f"⚠️  Mirror update failed, re-cloning: {(reset or fetch).stderr.strip()}")
+        shutil.rmtree(mirror_dir, ignore_errors=True)
+        return _clone_mirror(mirror_dir, token)
+
+    _git(['reflog', 'expire', '--expire=now', '--all'], cwd=mirror_dir)
+    _git(['gc', '--prune=now', '--quiet'], cwd=mirror_dir)
+    head = _git(['rev-parse', '--short', 'HEAD'], cwd=mirror_dir).stdout.strip()
+    print(f"✅ Mirror at {head}")
+    return True
+
+def download_files(output_dir, token=None, mirror_dir=None, compare=dir_sync.COMPARE_MTIME, link=False, delete=False):
+    """
+    Download files from a sparse, shallow Git mirror (no rate limits)
+
+    result_files/ is synced into the output directory incrementally: only new or changed
+    files are copied (or hardlinked), and stale ones are only removed when delete is set.
+    """
     print(f"📥 Downloading files to: {output_dir}")
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
-    
-    # Clone repository
-    repo_url = f"https://github.com/{GITHUB_REPO}.git"
-    if token:
-        repo_url = f"https://{token}@github.com/{GITHUB_REPO}.git"
-    
-    temp_dir = os.path.join(output_dir, "temp_clone")
+    mirror_dir = mirror_dir or os.path.join(output_dir, MIRROR_DIRNAME)
     
     try:
-        # Remove existing temp directory
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-        
-        print("🔄 Cloning repository...")
-        result = subprocess.run(
-            ['git', 'clone', repo_url, temp_dir],
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
-        
-        if result.returncode != 0:
-            print(f"❌ Clone failed: {result.stderr}")
+        if not sync_mirror(mirror_dir, token):
             return False
         
-        print("✅ Repository cloned")
-        
         # Copy result_files
-        result_files_source = os.path.join(temp_dir, "result_files")
-        result_files_target = os.path.join(output_dir, "result_files")
+        result_files_source = os.path.join(mirror_dir, RESULTS_PATH)
+        result_files_target = os.path.join(output_dir, RESULTS_PATH)
         
         if os.path.exists(result_files_source):
-            if os.path.exists(result_files_target):
-                shutil.rmtree(result_files_target)
-            shutil.copytree(result_files_source, result_files_target)
-            
-            # Count files
-            file_count = 0
-            for root, dirs, files in os.walk(result_files_target):
-                file_count += len(files)
-            
-            print(f"✅ Downloaded {file_count} files")
+            summary = dir_sync.sync_tree(result_files_source, result_files_target, compare, link=link, delete=delete)
+            print(f"✅ Synced {summary['total']} files: {dir_sync.format_summary(summary)}")
         else:
             print("❌ result_files directory not found in repository")
             print("   This means the GitHub Actions workflow hasn't run yet or failed")
@@ -194,61 +411,92 @@ def download_files(output_dir, token=None):
             print("   Try running the full automation with: python phantombuster_automation.py")
             return False
         
-        # Clean up
-        shutil.rmtree(temp_dir)
-        print("🧹 Cleaned up temporary files")
-        
         return True
         
     except subprocess.TimeoutExpired:
-        print("❌ Clone timed out")
+        print("❌ Git fetch timed out")
         return False
     except Exception as e:
         print(f"❌ Error downloading files: {e}")
         return False
 
-def clear_and_push_repository(token=None):
-    """Clear result_files directory and push changes to repository"""
-    print("🧹 Clearing result_files directory and pushing changes...")
-    
-    # Clone repository to a temporary location
-    temp_repo_dir = "temp_repo_for_cleanup"
-    repo_url = f"https://github.com/{GITHUB_REPO}.git"
-    if token:
-        repo_url = f"https://{token}@github.com/{GITHUB_REPO}.git"
+def download_bundle(output_dir, bundle_url, token=None, compare=dir_sync.COMPARE_MTIME, delete=False):
+    """
+    Download a run's results bundle in one request and sync it into result_files/
+
+    The bundle is unpacked into a staging directory and checked against its manifest
+    (size and SHA-256 of every file) before anything in result_files/ is touched, so a
+    truncated or tampered bundle leaves the previous results in place.
+
+    Args:
+        output_dir (str): Output directory
+        bundle_url (str): Bundle URL (release asset or any HTTP server)
+        token (str, optional): GitHub token, sent only to an api.github.com asset URL
+            (private repositories)
+        compare (str): dir_sync.COMPARE_MTIME or dir_sync.COMPARE_HASH
+        delete (bool): Remove files that are not in the bundle
+
+    Returns:
+        bool: True if the bundle was verified and synced, or if none was published (no new results)
+    """
+    print(f"📥 Downloading results bundle to: {output_dir}")
+    print(f"🔗 {bundle_url}")
+    os.makedirs(output_dir, exist_ok=True)
+    staging_dir = os.path.join(output_dir, BUNDLE_STAGING_DIRNAME)
+    shutil.rmtree(staging_dir, ignore_errors=True)
     
     try:
-        # Remove existing temp directory
-        if os.path.exists(temp_repo_dir):
-            shutil.rmtree(temp_repo_dir)
+        # github.com download URLs are public; only the asset API needs the token
+        api_token = token if bundle_url.startswith('https://api.github.com/') else None
+        result = results_bundle.fetch_bundle(bundle_url, staging_dir, token=api_token)
+        if result['missing']:
+            # Runs that find no new files publish no release
+            print("ℹ️  No results bundle published there: no new results, keeping the current files")
+            return True
+        if not result['ok']:
+            print(f"❌ Results bundle rejected: {result['error']}")
+            return False
         
-        print("🔄 Cloning repository for cleanup...")
-        result = subprocess.run(
-            ['git', 'clone', repo_url, temp_repo_dir],
-            capture_output=True,
-            text=True,
-            timeout=300
-        )
+        manifest = result['manifest']
+        print(f"✅ Bundle for run {manifest.get('run_id') or 'unknown'} verified: {manifest['file_count']} files, "
+              f"{result['size'] / (1024 * 1024):.1f} MB compressed")
         
-        if result.returncode != 0:
-            print(f"❌ Clone failed: {result.stderr}")
-            return False
+        # Staged files are throwaway, so linking them into place is as good as a copy
+        summary = dir_sync.sync_tree(staging_dir, os.path.join(output_dir, RESULTS_PATH), compare,
+                                     link=True, delete=delete)
+        print(f"✅ Synced {summary['total']} files: {dir_sync.format_summary(summary)}")
+        return True
         
-        # Change to repository directory
-        os.chdir(temp_repo_dir)
+    except Exception as e:
+        print(f"❌ Error downloading results bundle: {e}")
+        return False
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+
+def clear_and_push_repository(token=None, mirror_dir=None):
+    """Clear result_files directory and push changes to repository (reusing the mirror)"""
+    print("🧹 Clearing result_files directory and pushing changes...")
+    mirror_dir = mirror_dir or os.path.join('.', MIRROR_DIRNAME)
+    
+    try:
+        if not sync_mirror(mirror_dir, token):
+            return False
         
         # Remove result_files directory if it exists
-        if os.path.exists("result_files"):
+        if os.path.exists(os.path.join(mirror_dir, RESULTS_PATH)):
             print("🗑️  Removing result_files directory...")
-            shutil.rmtree("result_files")
             
-            # Git add, commit, and push
+            # Git rm, commit, and push
             print("📝 Committing changes...")
-            subprocess.run(['git', 'add', '-A'], check=True)
-            subprocess.run(['git', 'commit', '-m', f'Clear result_files directory - {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}'], check=True)
+            for args in (['rm', '-r', '--quiet', RESULTS_PATH],
+                         ['commit', '-m', f'Clear result_files directory - {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}']):
+                result = _git(args, cwd=mirror_dir, token=token)
+                if result.returncode != 0:
+                    print(f"❌ Git command failed: {result.stderr}")
+                    return False
             
             print("🚀 Pushing changes...")
-            push_result = subprocess.run(['git', 'push'], capture_output=True, text=True)
+            push_result = _git(['push', 'origin', f'HEAD:{GITHUB_BRANCH}'], cwd=mirror_dir, token=token)
             
             if push_result.returncode == 0:
                 print("✅ Successfully cleared and pushed changes")
@@ -258,35 +506,22 @@ def clear_and_push_repository(token=None):
         else:
             print("ℹ️  result_files directory not found, nothing to clear")
         
-        # Change back to original directory
-        os.chdir("..")
-        
-        # Clean up
-        shutil.rmtree(temp_repo_dir)
-        print("🧹 Cleaned up temporary repository")
-        
         return True
         
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Git command failed: {e}")
+    except subprocess.TimeoutExpired:
+        print("❌ Git command timed out")
         return False
     except Exception as e:
         print(f"❌ Error clearing repository: {e}")
         return False
-    finally:
-        # Make sure we're back in the original directory
-        try:
-            os.chdir("..")
-        except:
-            pass
 
 def main():
     parser = argparse.ArgumentParser(description='Complete Phantombuster automation')
     parser.add_argument('--output', '-o', default='./phantombuster_files', 
                        help='Output directory (default: ./phantombuster_files)')
     parser.add_argument('--token', '-t', help='GitHub token (optional)')
-    parser.add_argument('--timeout', type=int, default=30, 
-                       help='Timeout in minutes (default: 30)')
+    parser.add_argument('--timeout', type=int, default=60, 
+                       help='Timeout in minutes, including the GitHub Actions run (default: 60)')
     parser.add_argument('--no-wait', action='store_true', 
                        help='Do not wait for completion, just trigger and download')
     parser.add_argument('--no-file-wait', action='store_true', 
@@ -295,9 +530,39 @@ def main():
                        help='Skip webhook trigger, just download files')
     parser.add_argument('--clear-after', action='store_true', 
                        help='Clear result_files directory and push changes after download')
+    parser.add_argument('--source', choices=[SOURCE_BUNDLE, SOURCE_GIT], default=SOURCE_BUNDLE,
+                       help='Fetch the run\'s results bundle (default, the supported source) or sync from the '
+                            'Git mirror (deprecated: empty once the workflow stops committing results)')
+    parser.add_argument('--bundle-url', default=RESULTS_BUNDLE_URL,
+                       help='Results bundle URL (default: RESULTS_BUNDLE_URL, else the finished run\'s release asset, else the latest)')
+    parser.add_argument('--hash', action='store_true',
+                       help='Compare result files by content hash instead of size + mtime when syncing')
+    parser.add_argument('--hardlink', action='store_true',
+                       help='Hardlink result files from the mirror instead of copying them')
+    parser.add_argument('--delete', action='store_true',
+                       help='Remove files from the output that are no longer in the repository')
+    parser.add_argument('--mirror-dir', default=None,
+                       help=f'Persistent repository mirror, updated by git fetch between runs (default: <output>/{MIRROR_DIRNAME})')
+    parser.add_argument('--callback', action='store_true',
+                       help='Run a local receiver and wait for the webhook\'s completion callback instead of polling')
+    parser.add_argument('--callback-host', default='127.0.0.1',
+                       help='Address the callback receiver binds to (default: 127.0.0.1)')
+    parser.add_argument('--callback-port', type=int, default=8765,
+                       help='Port for the callback receiver (default: 8765)')
+    parser.add_argument('--callback-url', default=None,
+                       help='Public URL the webhook can reach the receiver on, e.g. a tunnel (required with --callback)')
     
     args = parser.parse_args()
     
+    if args.callback and not args.no_wait and not args.download_only:
+        # The webhook runs elsewhere (Heroku): a localhost URL would never be called back
+        if not args.callback_url:
+            parser.error("--callback needs --callback-url, a public URL that forwards to the receiver")
+        if not CALLBACK_SECRET:
+            parser.error("--callback needs CALLBACK_SECRET (the webhook's signing key) to verify callbacks")
+        if not TRIGGER_API_KEY:
+            parser.error("--callback needs SELENIUM_TRIGGER_API_KEY; the webhook only accepts callbacks with an API key")
+    
     print("🤖 Phantombuster Complete Automation")
     print("=" * 50)
     print(f"📁 Output directory: {args.output}")
@@ -306,34 +571,70 @@ def main():
     print(f"📥 Download only: {'Yes' if args.download_only else 'No'}")
     print()
     
+    # Bundle published by the run we waited for (None: use the latest one)
+    bundle_url = args.bundle_url
+    
     if not args.download_only:
+        receiver = None
+        callback_url = None
+        if args.callback and not args.no_wait:
+            receiver = CallbackReceiver(CALLBACK_SECRET, host=args.callback_host, port=args.callback_port)
+            receiver.start()
+            callback_url = args.callback_url
+        
         # Step 1: Trigger webhook
-        if not trigger_webhook():
+        trigger = trigger_webhook(callback_url)
+        if not trigger:
             print("❌ Failed to trigger webhook")
             sys.exit(1)
         
         if args.no_wait:
             print("💡 Webhook triggered. Proceeding to download...")
+        elif receiver:
+            # Step 2: Block on the completion callback (it arrives once the results are committed)
+            payload = wait_for_callback(receiver, trigger.get('job_id'), args.timeout)
+            receiver.stop()
+            if not payload:
+                sys.exit(1)
+            bundle_url = bundle_url or payload.get('bundle_url')
         else:
             # Step 2: Wait for completion
-            if not wait_for_completion(args.timeout):
+            status = wait_for_completion(args.timeout)
+            if not status:
                 print("❌ Automation did not complete in time")
                 sys.exit(1)
             
-            # Step 2.5: Wait for files to be committed (unless skipped)
-            if not args.no_file_wait:
+            # Step 2.5: Wait for files to be committed (unless skipped, or the server
+            # followed the workflow run to completion so the commit is already there)
+            run = status.get('workflow_run')
+            last_results = status.get('last_results')
+            if isinstance(last_results, dict):
+                bundle_url = bundle_url or last_results.get('bundle_url')
+            if run and run.get('completed'):
+                print(f"✅ Workflow run {run['run_id']} finished ({run['conclusion']}), "
+                      f"results commit: {run.get('commit_sha') or 'none'}")
+            elif not args.no_file_wait:
                 wait_for_files_to_be_committed()
             else:
                 print("💡 Skipping file commit wait period")
     
     # Step 3: Download files
-    if not download_files(args.output, args.token):
+    mirror_dir = args.mirror_dir or os.path.join(args.output, MIRROR_DIRNAME)
+    compare = dir_sync.COMPARE_HASH if args.hash else dir_sync.COMPARE_MTIME
+    if args.source == SOURCE_BUNDLE:
+        bundle_url = bundle_url or results_bundle.release_bundle_url(GITHUB_REPO)
+        downloaded = download_bundle(args.output, bundle_url, args.token, compare, args.delete)
+    else:
+        print("⚠️  --source git is deprecated: the mirror only has results while the workflow commits them "
+              "(COMMIT_RESULTS); use the results bundle")
+        downloaded = download_files(args.output, args.token, mirror_dir, compare, args.hardlink, args.delete)
+    if not downloaded:
         print("❌ Failed to download files")
         sys.exit(1)
     
     # Step 4: Clear repository (if requested)
     if args.clear_after:
-        if not clear_and_push_repository(args.token):
+        if not clear_and_push_repository(args.token, mirror_dir):
             print("⚠️  Warning: Failed to clear repository, but files were downloaded successfully")
     
     print(f"\n🎉 Automation completed successfully!")
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Places Index - SQLite index over the scraped Google Maps result CSVs
+Result files are ingested incrementally (unchanged files are skipped) so lookups by
+category, query, rating, postal code or place URL use an index instead of re-reading CSVs.
+Each file keeps its own rows; a place found by several files is returned once, from the
+file ingested last, and deleting one of those files leaves the others' rows in place.
+"""
+
+import csv
+import os
+import re
+import sqlite3
+import sys
+from datetime import datetime
+
+# Location of the SQLite database (override with PLACES_DB_PATH)
+DEFAULT_DB_PATH = os.environ.get(
+    'PLACES_DB_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'places.db')
+)
+
+# Largest page a caller may request from query_places()
+MAX_PAGE_SIZE = 500
+
+# Columns that can be used with count_places(group_by=...)
+GROUPABLE_COLUMNS = ('category', 'query', 'postal_code', 'folder')
+
+# Tried in order; the last match in the address wins
+POSTAL_CODE_PATTERNS = (
+    re.compile(r'\b[A-Z]{2}\s+(\d{5})(?:-\d{4})?\b'),   # "..., TX 75022, United States"
+    re.compile(r'\b([A-Z]\d[A-Z] ?\d[A-Z]\d)\b'),        # "..., ON N6N 1B5, Canada"
+    re.compile(r'\b([A-Z]{1,2}\d[A-Z\d]? \d[A-Z]{2})\b'),  # "..., York YO30 6QD, United Kingdom"
+    re.compile(r'(?<!\d)(\d{5})(?:-\d{4})?(?!\d)'),      # "West Virginia 25404, United States"
+)
+
+# Bumped when the schema changes; the index is rebuilt from the CSVs on the next ingest
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS places (
+    place_url TEXT NOT NULL,
+    query TEXT NOT NULL DEFAULT '',
+    title TEXT,
+    rating REAL,
+    review_count INTEGER,
+    category TEXT,
+    address TEXT,
+    postal_code TEXT,
+    website TEXT,
+    phone_number TEXT,
+    scraped_at TEXT,
+    folder TEXT,
+    file_id TEXT,
+    source_file TEXT,
+    PRIMARY KEY (place_url, query, source_file)
+);
+CREATE INDEX IF NOT EXISTS idx_places_place_url ON places (place_url);
+CREATE INDEX IF NOT EXISTS idx_places_category ON places (category);
+CREATE INDEX IF NOT EXISTS idx_places_query ON places (query);
+CREATE INDEX IF NOT EXISTS idx_places_rating ON places (rating);
+CREATE INDEX IF NOT EXISTS idx_places_postal_code ON places (postal_code);
+CREATE TABLE IF NOT EXISTS ingested_files (
+    source_file TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    rows INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+"""
+
+# Result CSVs carry long free-text fields (attributes, info)
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+def connect(db_path=None):
+    """
+    Open the places database, creating the schema if needed
+
+    Args:
+        db_path (str, optional): Database path. Defaults to DEFAULT_DB_PATH.
+
+    Returns:
+        sqlite3.Connection: Connection with rows returned as sqlite3.Row
+    """
+    conn = sqlite3.connect(db_path or DEFAULT_DB_PATH, timeout=30)
+    conn.row_factory = sqlite3.Row
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+        # Version 1 kept one row per (place_url, query) for all files: start over. Checked
+        # again under the write lock, so concurrent first connections only drop it once.
+        conn.execute('BEGIN IMMEDIATE')
+        if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+            conn.execute('DROP TABLE IF EXISTS places')
+            conn.execute('DROP TABLE IF EXISTS ingested_files')
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        conn.commit()
+    conn.executescript(SCHEMA)
+    return conn
+
+def parse_postal_code(address):
+    """Extract the postal code from a Maps address, or None"""
+    if not address:
+        return None
+    for pattern in POSTAL_CODE_PATTERNS:
+        matches = pattern.findall(address)
+        if matches:
+            return matches[-1]
+    return None
+
+def parse_result_filename(path):
+    """
+    Split a result file name into its folder and file ID
+
+    Args:
+        path (str): Path like result_files/<folder>_<file_id>_result.csv
+
+    Returns:
+        tuple[str | None, str | None]: (folder, file_id)
+    """
+    name = os.path.basename(path)
+    if not name.endswith('_result.csv'):
+        return None, None
+    stem = name[:-len('_result.csv')]
+    if '_' not in stem:
+        return None, None
+    folder, file_id = stem.rsplit('_', 1)
+    return folder, file_id
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _to_int(value):
+    try:
+        return int(str(value).replace(',', ''))
+    except (TypeError, ValueError):
+        return None
+
+def ingest_file(path, conn=None, force=False):
+    """
+    Load one result CSV into the index
+
+    Files whose size and mtime match the last ingest are skipped, so calling this
+    for every file on every run only costs a stat() per unchanged file.
+
+    Args:
+        path (str): Path to the result CSV
+        conn (sqlite3.Connection, optional): Open connection. One is opened if omitted.
+        force (bool): Re-read the file even if it looks unchanged
+
+    Returns:
+        int: Number of rows written (0 if the file was skipped)
+    """
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        source_file = os.path.abspath(path)
+        st = os.stat(source_file)
+
+        if not force:
+            previous = conn.execute(
+                'SELECT size, mtime_ns FROM ingested_files WHERE source_file = ?',
+                (source_file,)
+            ).fetchone()
+            if previous and previous['size'] == st.st_size and previous['mtime_ns'] == st.st_mtime_ns:
+                return 0
+
+        folder, file_id = parse_result_filename(source_file)
+        rows = []
+        with open(source_file, newline='', encoding='utf-8', errors='replace') as f:
+            for row in csv.DictReader(f):
+                place_url = row.get('placeUrl')
+                if not place_url:
+                    continue
+                address = row.get('address')
+                rows.append((
+                    place_url,
+                    row.get('query') or '',
+                    row.get('title'),
+                    _to_float(row.get('rating')),
+                    _to_int(row.get('reviewCount')),
+                    row.get('category'),
+                    address,
+                    parse_postal_code(address),
+                    row.get('website'),
+                    row.get('phoneNumber'),
+                    row.get('timestamp'),
+                    folder,
+                    file_id,
+                    source_file
+                ))
+
+        with conn:
+            # Drop the file's previous rows so rows removed from it leave the index too
+            conn.execute('DELETE FROM places WHERE source_file = ?', (source_file,))
+            conn.executemany(
+                'INSERT OR REPLACE INTO places (place_url, query, title, rating, review_count, '
+                'category, address, postal_code, website, phone_number, scraped_at, folder, '
+                'file_id, source_file) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+            conn.execute(
+                'INSERT OR REPLACE INTO ingested_files (source_file, size, mtime_ns, rows, ingested_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (source_file, st.st_size, st.st_mtime_ns, len(rows), datetime.now().isoformat())
+            )
+        return len(rows)
+    finally:
+        if own_conn:
+            conn.close()
+
+def forget_file(path, conn):
+    """Remove a result file's rows from the index (e.g. after the file was deleted)"""
+    source_file = os.path.abspath(path)
+    with conn:
+        conn.execute('DELETE FROM places WHERE source_file = ?', (source_file,))
+        conn.execute('DELETE FROM ingested_files WHERE source_file = ?', (source_file,))
+
+def ingest_directory(directory, conn=None):
+    """
+    Ingest every *_result.csv in a directory, skipping files already indexed
+
+    Files from this directory that were indexed before but no longer exist are removed
+    from the index.
+
+    Args:
+        directory (str): Directory containing result CSVs
+        conn (sqlite3.Connection, optional): Open connection
+
+    Returns:
+        dict: {'files_ingested': int, 'rows_ingested': int, 'files_removed': int}
+    """
+    stats = {'files_ingested': 0, 'rows_ingested': 0, 'files_removed': 0}
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        names = sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+        for name in names:
+            if not name.endswith('_result.csv'):
+                continue
+            written = ingest_file(os.path.join(directory, name), conn)
+            if written:
+                stats['files_ingested'] += 1
+                stats['rows_ingested'] += written
+
+        root = os.path.abspath(directory)
+        present = {os.path.join(root, name) for name in names}
+        for row in conn.execute('SELECT source_file FROM ingested_files').fetchall():
+            if os.path.dirname(row['source_file']) == root and row['source_file'] not in present:
+                forget_file(row['source_file'], conn)
+                stats['files_removed'] += 1
+        return stats
+    finally:
+        if own_conn:
+            conn.close()
+
+def _build_where(filters):
+    """Translate a filter dict into a WHERE clause and its parameters"""
+    clauses = []
+    params = []
+
+    for key, column in (('category', 'category'), ('query', 'query'),
+                        ('postal_code', 'postal_code'), ('place_url', 'place_url'),
+                        ('folder', 'folder')):
+        value = filters.get(key)
+        if value:
+            clauses.append(f'{column} = ?')
+            params.append(value)
+
+    if filters.get('min_rating') is not None:
+        clauses.append('rating >= ?')
+        params.append(float(filters['min_rating']))
+    if filters.get('max_rating') is not None:
+        clauses.append('rating <= ?')
+        params.append(float(filters['max_rating']))
+
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+    return where, params
+
+def _matching_places(columns, filters):
+    """
+    SELECT giving one row per (place_url, query) among the rows matching filters
+
+    Files that share a place keep a row each; the one ingested last (highest rowid) is
+    picked, through SQLite's bare-column rule for MAX().
+
+    Returns:
+        tuple[str, list]: (SQL, parameters)
+    """
+    where, params = _build_where(filters)
+    return (f'SELECT {columns} FROM (SELECT {columns}, MAX(rowid) FROM places{where} '
+            f'GROUP BY place_url, query)'), params
+
+def query_places(filters=None, limit=50, offset=0, conn=None):
+    """
+    Look up places matching the given filters
+
+    Args:
+        filters (dict, optional): Any of category, query, postal_code, place_url,
+            folder, min_rating, max_rating
+        limit (int): Page size (capped at MAX_PAGE_SIZE)
+        offset (int): Number of matching rows to skip
+        conn (sqlite3.Connection, optional): Open connection
+
+    Returns:
+        tuple[int, list[dict]]: (total matching rows, rows in this page)
+    """
+    filters = filters or {}
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+    offset = max(0, int(offset))
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        where, params = _build_where(filters)
+        total = conn.execute(
+            f'SELECT COUNT(*) FROM (SELECT 1 FROM places{where} GROUP BY place_url, query)', params
+        ).fetchone()[0]
+        sql, params = _matching_places(
+            'place_url, query, title, rating, review_count, category, address, '
+            'postal_code, website, phone_number, scraped_at, folder, file_id', filters
+        )
+        rows = conn.execute(f'{sql} ORDER BY place_url, query LIMIT ? OFFSET ?', params + [limit, offset]).fetchall()
+        return total, [dict(row) for row in rows]
+    finally:
+        if own_conn:
+            conn.close()
+
+def count_places(group_by, filters=None, limit=50, conn=None):
+    """
+    Count matching places grouped by one column
+
+    Args:
+        group_by (str): One of GROUPABLE_COLUMNS
+        filters (dict, optional): Same filters as query_places()
+        limit (int): Maximum number of groups returned (largest first)
+        conn (sqlite3.Connection, optional): Open connection
+
+    Returns:
+        list[dict]: [{'value': ..., 'count': int}, ...]
+    """
+    if group_by not in GROUPABLE_COLUMNS:
+        raise ValueError(f"Cannot group by '{group_by}'")
+
+    limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+
+    own_conn = conn is None
+    if own_conn:
+        conn = connect()
+
+    try:
+        sql, params = _matching_places(', '.join(dict.fromkeys(('place_url', 'query', group_by))), filters or {})
+        rows = conn.execute(
+            f'SELECT {group_by} AS value, COUNT(*) AS count FROM ({sql}) '
+            f'GROUP BY {group_by} ORDER BY count DESC, value LIMIT ?',
+            params + [limit]
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        if own_conn:
+            conn.close()
+
+def main():
+    """Index a results directory from the command line"""
+    directory = sys.argv[1] if len(sys.argv) > 1 else 'result_files'
+    conn = connect()
+    try:
+        start = datetime.now()
+        stats = ingest_directory(directory, conn)
+        duration = (datetime.now() - start).total_seconds()
+        total = conn.execute('SELECT COUNT(*) FROM (SELECT 1 FROM places GROUP BY place_url, query)').fetchone()[0]
+    finally:
+        conn.close()
+
+    print(f"Indexed {stats['rows_ingested']} rows from {stats['files_ingested']} new/changed files "
+          f"in {duration:.2f}s ({total} places in {DEFAULT_DB_PATH})")
+
+if __name__ == "__main__":
+    main()
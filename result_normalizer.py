@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Result Normalizer - typed columns for the free-text fields in result CSVs
+Parses rating, reviewCount, currentStatus and the monday..sunday opening hours a whole
+column at a time. Each column is reduced to its distinct values, every distinct value is
+parsed once, and the column is mapped through the resulting lookup table into a compact
+array. The Maps data is highly repetitive ("8 am–5 pm", "Closed", ...), so the corpus
+needs only a few thousand parses instead of one per cell.
+"""
+
+import csv
+import os
+import re
+import sys
+import time
+from array import array
+from operator import add
+
+DAY_COLUMNS = ('monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday')
+
+# Sentinel for missing integer values (review counts, weekly minutes)
+MISSING = -1
+
+# currentStatus categories, indexed by the codes stored in the 'status' array
+STATUS_CODES = (
+    'unknown',
+    'open',
+    'closed',
+    'open_24_hours',
+    'opens_soon',
+    'closes_soon',
+    'temporarily_closed',
+    'permanently_closed',
+)
+_STATUS_INDEX = {name: code for code, name in enumerate(STATUS_CODES)}
+
+# Google Maps separates times with U+202F and ranges with an en dash
+_TIME_PATTERN = r'(\d{1,2})(?::(\d{2}))?\s*(am|pm)?'
+_RANGE_PATTERN = re.compile(_TIME_PATTERN + r'\s*[–-]\s*' + _TIME_PATTERN, re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+_DIGITS = re.compile(r'[^\d]')
+
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+def _clock_minutes(hour, minute, meridiem):
+    """Convert a 12-hour clock time to minutes after midnight"""
+    hour = int(hour) % 12
+    if meridiem == 'pm':
+        hour += 12
+    return hour * 60 + (int(minute) if minute else 0)
+
+def parse_day_hours(value):
+    """
+    Parse one opening-hours cell into open minutes for that day
+
+    Args:
+        value (str): e.g. "8 am–5 pm", "7:30 am–12 pm, 1–5 pm", "Open 24 hours", "Closed"
+
+    Returns:
+        int: Minutes open, or MISSING if the cell is empty or unparseable
+    """
+    if not value:
+        return MISSING
+    text = _WHITESPACE.sub(' ', value).strip().lower()
+    if not text:
+        return MISSING
+    if text.startswith('closed'):
+        return 0
+    if '24 hours' in text:
+        return 24 * 60
+
+    total = 0
+    matched = False
+    for start_h, start_m, start_ampm, end_h, end_m, end_ampm in _RANGE_PATTERN.findall(text):
+        matched = True
+        end_ampm = end_ampm or start_ampm or 'pm'
+        start = _clock_minutes(start_h, start_m, start_ampm or end_ampm)
+        end = _clock_minutes(end_h, end_m, end_ampm)
+        if not start_ampm and start > end:
+            # "11–2 pm": an inherited meridiem cannot put the start after the end
+            start -= 12 * 60
+        if end <= start:
+            # Overnight range such as "6 pm–2 am"
+            end += 24 * 60
+        total += end - start
+
+    return total if matched else MISSING
+
+def parse_rating(value):
+    """Parse a rating cell to a float, NaN when missing"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+def parse_review_count(value):
+    """Parse a reviewCount cell ("1,267") to an int, MISSING when absent"""
+    if not value:
+        return MISSING
+    digits = _DIGITS.sub('', value)
+    return int(digits) if digits else MISSING
+
+def parse_status(value):
+    """Map a currentStatus cell to one of STATUS_CODES (returned as its code)"""
+    if not value:
+        return _STATUS_INDEX['unknown']
+    first_line = _WHITESPACE.sub(' ', value.split('\n', 1)[0]).strip().lower()
+    if first_line.startswith('permanently closed'):
+        name = 'permanently_closed'
+    elif first_line.startswith('temporarily closed'):
+        name = 'temporarily_closed'
+    elif first_line.startswith('open 24 hours'):
+        name = 'open_24_hours'
+    elif first_line.startswith('opens soon'):
+        name = 'opens_soon'
+    elif first_line.startswith('closes soon'):
+        name = 'closes_soon'
+    elif first_line.startswith('open'):
+        name = 'open'
+    elif first_line.startswith('closed'):
+        name = 'closed'
+    else:
+        name = 'unknown'
+    return _STATUS_INDEX[name]
+
+def _map_column(values, parser, typecode):
+    """
+    Parse a column through a table of its distinct values
+
+    Args:
+        values (Sequence[str]): Raw column values
+        parser (callable): Function applied once per distinct value
+        typecode (str): array typecode of the result
+
+    Returns:
+        array: Parsed column
+    """
+    table = {value: parser(value) for value in set(values)}
+    # array() consumes a list far faster than an iterator
+    return array(typecode, list(map(table.__getitem__, values)))
+
+def load_columns(path):
+    """
+    Read a result CSV into columns
+
+    Args:
+        path (str): Path to the CSV
+
+    Returns:
+        dict: Column name -> tuple of raw string values
+    """
+    with open(path, newline='', encoding='utf-8', errors='replace') as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return {}
+        width = len(header)
+        rows = [row for row in reader if len(row) == width]
+
+    if not rows:
+        return {name: () for name in header}
+    return dict(zip(header, zip(*rows)))
+
+def normalize_columns(columns):
+    """
+    Convert raw result columns into typed arrays
+
+    Args:
+        columns (dict): Column name -> sequence of raw strings (see load_columns())
+
+    Returns:
+        dict: {
+            'rows': int,
+            'rating': array('d'),               # NaN when missing
+            'review_count': array('q'),         # MISSING when absent
+            'status': array('b'),               # index into STATUS_CODES
+            'weekly_open_minutes': array('l'),  # MISSING when no day has hours
+            '<day>_open_minutes': array('l')    # per day, MISSING when blank
+        }
+    """
+    rows = len(next(iter(columns.values()), ()))
+    blank = ('',) * rows
+
+    result = {
+        'rows': rows,
+        'rating': _map_column(columns.get('rating', blank), parse_rating, 'd'),
+        'review_count': _map_column(columns.get('reviewCount', blank), parse_review_count, 'q'),
+        'status': _map_column(columns.get('currentStatus', blank), parse_status, 'b'),
+    }
+
+    # Every day shares one lookup table: the same strings repeat across days
+    day_values = [columns.get(day, blank) for day in DAY_COLUMNS]
+    distinct = set()
+    for values in day_values:
+        distinct.update(values)
+
+    # Each string maps to minutes * 8 + known-flag, so summing the seven encoded
+    # columns with C-level map(add, ...) yields both the weekly minutes and how many
+    # days were known (at most 7, which fits in the low 3 bits)
+    encode = {}
+    for value in distinct:
+        minutes = parse_day_hours(value)
+        encode[value] = minutes * 8 + 1 if minutes != MISSING else 0
+    decode = {code: code >> 3 if code & 7 else MISSING for code in set(encode.values())}
+
+    totals = [0] * rows
+    for day, values in zip(DAY_COLUMNS, day_values):
+        encoded = list(map(encode.__getitem__, values))
+        result[f'{day}_open_minutes'] = array('l', list(map(decode.__getitem__, encoded)))
+        totals = list(map(add, totals, encoded))
+
+    result['weekly_open_minutes'] = _map_column(totals, _decode_week, 'l')
+    return result
+
+def _decode_week(total):
+    """Split an encoded weekly sum into minutes, MISSING when no day was known"""
+    return total >> 3 if total & 7 else MISSING
+
+def normalize_file(path):
+    """Load and normalize a single result CSV"""
+    return normalize_columns(load_columns(path))
+
+def normalize_corpus(directory="result_files"):
+    """
+    Normalize every result CSV in a directory into one set of arrays
+
+    Columns are concatenated per name first so each parse table is built once for
+    the whole corpus rather than once per file.
+
+    Args:
+        directory (str): Directory of *_result.csv files
+
+    Returns:
+        dict: Same layout as normalize_columns(), plus 'files' (list of file names)
+            and 'load_seconds' / 'normalize_seconds' timings
+    """
+    wanted = ('rating', 'reviewCount', 'currentStatus') + DAY_COLUMNS
+    merged = {name: [] for name in wanted}
+    files = []
+
+    start = time.perf_counter()
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith('_result.csv'):
+            continue
+        columns = load_columns(os.path.join(directory, name))
+        if not columns:
+            continue
+        rows = len(next(iter(columns.values())))
+        for column in wanted:
+            merged[column].extend(columns.get(column, ('',) * rows))
+        files.append(name)
+    loaded = time.perf_counter()
+
+    result = normalize_columns(merged)
+    done = time.perf_counter()
+
+    result['files'] = files
+    result['load_seconds'] = loaded - start
+    result['normalize_seconds'] = done - loaded
+    return result
+
+def main():
+    """Normalize a results directory and print a summary"""
+    directory = sys.argv[1] if len(sys.argv) > 1 else "result_files"
+    result = normalize_corpus(directory)
+
+    ratings = [r for r in result['rating'] if r == r]
+    weekly = [m for m in result['weekly_open_minutes'] if m != MISSING]
+    statuses = {}
+    for code in result['status']:
+        statuses[STATUS_CODES[code]] = statuses.get(STATUS_CODES[code], 0) + 1
+
+    print(f"Files: {len(result['files'])} | Rows: {result['rows']}")
+    print(f"Load: {result['load_seconds']:.2f}s | Normalize: {result['normalize_seconds']:.3f}s")
+    if ratings:
+        print(f"Average rating: {sum(ratings) / len(ratings):.2f} ({len(ratings)} rated)")
+    if weekly:
+        print(f"Average weekly open hours: {sum(weekly) / len(weekly) / 60:.1f} ({len(weekly)} with hours)")
+    print("Status breakdown:")
+    for name, count in sorted(statuses.items(), key=lambda item: -item[1]):
+        print(f"  {name}: {count}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Result Reader - random access to rows of a result CSV
+The first access builds a sidecar row-offset index (<file>.idx) that respects quoted
+multi-line fields such as address and currentStatus. Later reads mmap the CSV and slice
+out only the requested rows, so fetching row N or the rows for one placeUrl no longer
+means parsing the whole file.
+"""
+
+import csv
+import hashlib
+import io
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+INDEX_SUFFIX = '.idx'
+INDEX_MAGIC = b'RIDX'
+INDEX_VERSION = 1
+
+# magic, version, source size, source mtime_ns, record count (header row included)
+_INDEX_HEADER = struct.Struct('<4sIQQQ')
+
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+def _key_hash(value):
+    """64-bit hash of a placeUrl, stored in the index for lookups"""
+    digest = hashlib.blake2b(value, digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def _parse_record(raw):
+    """Parse one CSV record (possibly spanning several lines) into a list of fields"""
+    text = raw.decode('utf-8', errors='replace')
+    return next(csv.reader(io.StringIO(text, newline='')), [])
+
+class ResultFileReader:
+    def __init__(self, path, index_path=None):
+        """
+        Open a result CSV for random access, building its index if needed
+
+        Args:
+            path (str): Path to the result CSV
+            index_path (str, optional): Sidecar index path. Defaults to <path>.idx
+        """
+        self.path = path
+        self.index_path = index_path or path + INDEX_SUFFIX
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # mmap cannot map an empty file
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._by_key = None
+
+        if not self._load_index():
+            self._build_index()
+            self._save_index()
+
+        self.header = _parse_record(self._record(0)) if len(self._offsets) > 1 else []
+        self._key_column = self.header.index('placeUrl') if 'placeUrl' in self.header else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        """Number of data rows (header excluded)"""
+        return max(len(self._offsets) - 2, 0)
+
+    def close(self):
+        """Release the memory map and file handle"""
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def _source_signature(self):
+        st = os.fstat(self._file.fileno())
+        return st.st_size, st.st_mtime_ns
+
+    def _load_index(self):
+        """
+        Load the sidecar index if it matches the current CSV
+
+        Returns:
+            bool: True if a valid index was loaded
+        """
+        try:
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return False
+
+        if len(data) < _INDEX_HEADER.size:
+            return False
+        magic, version, size, mtime_ns, records = _INDEX_HEADER.unpack_from(data)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION:
+            return False
+        if (size, mtime_ns) != self._source_signature():
+            return False
+
+        offsets = array('Q')
+        hashes = array('Q')
+        body = memoryview(data)[_INDEX_HEADER.size:]
+        offsets_bytes = (records + 1) * offsets.itemsize
+        hashes_bytes = max(records - 1, 0) * hashes.itemsize
+        if len(body) != offsets_bytes + hashes_bytes:
+            return False
+        offsets.frombytes(body[:offsets_bytes])
+        hashes.frombytes(body[offsets_bytes:])
+        self._offsets = offsets
+        self._hashes = hashes
+        return True
+
+    def _build_index(self):
+        """
+        Scan the CSV once and record where every record starts
+
+        A newline only ends a record when an even number of quotes has been seen since
+        the record began; newlines inside quoted fields are skipped.
+        """
+        mm = self._mm
+        size = len(mm)
+        offsets = array('Q')
+
+        pos = 0
+        start = 0
+        in_quotes = False
+        while pos < size:
+            newline = mm.find(b'\n', pos)
+            end = size if newline == -1 else newline + 1
+            if mm[pos:end].count(b'"') % 2:
+                in_quotes = not in_quotes
+            pos = end
+            if not in_quotes:
+                if mm[start:end].strip():
+                    offsets.append(start)
+                start = end
+        offsets.append(size)
+        self._offsets = offsets
+
+        header = _parse_record(mm[offsets[0]:offsets[1]]) if len(offsets) > 1 else []
+        key_column = header.index('placeUrl') if 'placeUrl' in header else None
+
+        hashes = array('Q')
+        for record in range(1, len(offsets) - 1):
+            raw = mm[offsets[record]:offsets[record + 1]]
+            hashes.append(_key_hash(self._raw_key(raw, key_column)))
+        self._hashes = hashes
+
+    @staticmethod
+    def _raw_key(raw, key_column):
+        """Extract the placeUrl bytes from a raw record"""
+        if key_column is None:
+            return b''
+        if key_column == 0 and not raw.startswith(b'"'):
+            # Fast path: placeUrl is the first, unquoted column
+            comma = raw.find(b',')
+            return raw[:comma] if comma != -1 else raw.rstrip(b'\r\n')
+        fields = _parse_record(raw)
+        return fields[key_column].encode('utf-8') if key_column < len(fields) else b''
+
+    def _save_index(self):
+        """Write the sidecar index atomically; failures only cost a rebuild next time"""
+        size, mtime_ns = self._source_signature()
+        tmp_path = self.index_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(_INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, size, mtime_ns,
+                                           len(self._offsets) - 1))
+                self._offsets.tofile(f)
+                self._hashes.tofile(f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"⚠ Could not write index {self.index_path}: {e}")
+
+    def _record(self, record):
+        """Raw bytes of a record (0 is the header row)"""
+        return self._mm[self._offsets[record]:self._offsets[record + 1]]
+
+    def raw_row(self, n):
+        """
+        Raw CSV bytes of data row n, without parsing
+
+        Args:
+            n (int): Zero-based data row number
+
+        Returns:
+            bytes: The record, including its trailing newline
+        """
+        if n < 0:
+            n += len(self)
+        if not 0 <= n < len(self):
+            raise IndexError(f"Row {n} out of range (file has {len(self)} rows)")
+        return self._record(n + 1)
+
+    def row(self, n):
+        """
+        Parse data row n into a dict keyed by the CSV header
+
+        Args:
+            n (int): Zero-based data row number
+
+        Returns:
+            dict: Column name -> value
+        """
+        return dict(zip(self.header, _parse_record(self.raw_row(n))))
+
+    def rows(self, start, stop=None):
+        """
+        Parse a contiguous range of data rows with a single slice of the map
+
+        Args:
+            start (int): First row (inclusive)
+            stop (int, optional): Last row (exclusive). Defaults to the end of the file.
+
+        Returns:
+            list[dict]: Parsed rows
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return []
+        raw = self._mm[self._offsets[start + 1]:self._offsets[stop + 1]]
+        text = raw.decode('utf-8', errors='replace')
+        return [dict(zip(self.header, fields)) for fields in csv.reader(io.StringIO(text, newline=''))]
+
+    def find(self, place_url):
+        """
+        All rows whose placeUrl matches exactly
+
+        Args:
+            place_url (str): placeUrl to look up
+
+        Returns:
+            list[dict]: Matching rows (usually one)
+        """
+        if self._key_column is None:
+            return []
+
+        if self._by_key is None:
+            by_key = {}
+            for n, key_hash in enumerate(self._hashes):
+                by_key.setdefault(key_hash, []).append(n)
+            self._by_key = by_key
+
+        matches = []
+        for n in self._by_key.get(_key_hash(place_url.encode('utf-8')), []):
+            row = self.row(n)
+            # Guard against 64-bit hash collisions
+            if row.get('placeUrl') == place_url:
+                matches.append(row)
+        return matches
+
+def main():
+    """Print one row (by number or placeUrl) from a result file"""
+    if len(sys.argv) < 3:
+        print("Usage: python result_reader.py <result.csv> <row-number | placeUrl>")
+        sys.exit(1)
+
+    path, target = sys.argv[1], sys.argv[2]
+    with ResultFileReader(path) as reader:
+        print(f"{path}: {len(reader)} rows (index: {reader.index_path})")
+        rows = [reader.row(int(target))] if target.lstrip('-').isdigit() else reader.find(target)
+        for row in rows:
+            for column, value in row.items():
+                print(f"  {column}: {value}")
+            print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Results Bundle - one compressed, manifest-indexed archive per Selenium download run
+The workflow packs result_files/ into results-bundle.tar.gz and publishes it as a GitHub
+release asset instead of committing the CSVs, so the repository stops growing with every
+run. The first member of the archive is manifest.json: run ID, folder -> file IDs (from
+the results artifact) and the size and SHA-256 of every file. Consumers fetch the bundle
+in a single request and only accept it once every file matches the manifest.
+Usage: python results_bundle.py build|verify|extract|fetch ...
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import zlib
+from datetime import datetime
+
+import requests
+
+import results_artifact
+from http_client import HttpClient
+from resumable_download import download_resumable
+
+BUNDLE_FILENAME = "results-bundle.tar.gz"
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+
+# Release tags are results-<workflow run ID>; the newest one is also marked "latest"
+RELEASE_TAG_PREFIX = "results-"
+
+# CSVs compress well; past 6 gzip gets much slower for very little
+COMPRESS_LEVEL = 6
+
+# Bytes per read while hashing and extracting
+CHUNK_SIZE = 1024 * 1024
+
+class BundleError(ValueError):
+    """The bundle is malformed or does not match its manifest"""
+
+def _sha256(fileobj):
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b''):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def release_tag(run_id):
+    """Release tag the workflow publishes a run's bundle under"""
+    return f"{RELEASE_TAG_PREFIX}{run_id}"
+
+def release_bundle_url(repo, run_id=None):
+    """
+    Public download URL of a run's bundle
+
+    Args:
+        repo (str): owner/name
+        run_id (int | str, optional): Workflow run ID. Defaults to the latest release.
+
+    Returns:
+        str: github.com release asset URL (redirects to the file itself)
+    """
+    if run_id is None:
+        return f"https://github.com/{repo}/releases/latest/download/{BUNDLE_FILENAME}"
+    return f"https://github.com/{repo}/releases/download/{release_tag(run_id)}/{BUNDLE_FILENAME}"
+
+def build_manifest(source_dir, run_id=None):
+    """
+    Manifest for every file under source_dir
+
+    Args:
+        source_dir (str): Directory to bundle (normally result_files)
+        run_id (str, optional): Run the files came from
+
+    Returns:
+        dict: format, run_id, created_at, file_count, total_bytes, results and files
+            ({'path', 'size', 'sha256', 'mtime'} each, paths relative and /-separated)
+    """
+    files = []
+    for root, dirs, filenames in os.walk(source_dir):
+        dirs.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(root, filename)
+            stat = os.stat(path)
+            with open(path, 'rb') as f:
+                digest = _sha256(f)
+            files.append({
+                'path': os.path.relpath(path, source_dir).replace(os.sep, '/'),
+                'size': stat.st_size,
+                'sha256': digest,
+                'mtime': int(stat.st_mtime)
+            })
+
+    results = results_artifact.load_results(os.path.join(source_dir, results_artifact.ARTIFACT_FILENAME))
+    return {
+        'format': MANIFEST_FORMAT,
+        'run_id': run_id,
+        'created_at': datetime.now().isoformat(),
+        'file_count': len(files),
+        'total_bytes': sum(f['size'] for f in files),
+        'results': results or {},
+        'files': files
+    }
+
+def build_bundle(source_dir, bundle_path, run_id=None):
+    """
+    Pack source_dir into a gzipped tarball with manifest.json as its first member
+
+    Returns:
+        dict: The manifest written into the bundle
+    """
+    manifest = build_manifest(source_dir, run_id)
+    data = json.dumps(manifest, indent=2).encode('utf-8')
+
+    temp_path = bundle_path + '.tmp'
+    with tarfile.open(temp_path, 'w:gz', compresslevel=COMPRESS_LEVEL) as tar:
+        info = tarfile.TarInfo(MANIFEST_NAME)
+        info.size = len(data)
+        info.mtime = int(datetime.now().timestamp())
+        with tempfile.SpooledTemporaryFile() as buffer:
+            buffer.write(data)
+            buffer.seek(0)
+            tar.addfile(info, buffer)
+        for entry in manifest['files']:
+            tar.add(os.path.join(source_dir, entry['path']), arcname=entry['path'], recursive=False)
+    os.replace(temp_path, bundle_path)
+    return manifest
+
+def _safe_path(name):
+    """Whether an archive member name stays inside the extraction directory"""
+    return not (os.path.isabs(name) or name.startswith('/') or '..' in name.split('/'))
+
+def _read_manifest(tar, source):
+    """Read and check manifest.json, which must be the first member of an open bundle"""
+    first = tar.next()
+    if first is None or first.name != MANIFEST_NAME or not first.isfile():
+        raise BundleError(f"{source} does not start with {MANIFEST_NAME}")
+    try:
+        manifest = json.load(tar.extractfile(first))
+    except ValueError as e:
+        raise BundleError(f"Unreadable manifest: {e}")
+    if manifest.get('format') != MANIFEST_FORMAT:
+        raise BundleError(f"Unsupported manifest format {manifest.get('format')}")
+    return manifest
+
+def read_manifest(fileobj, source='bundle'):
+    """
+    Manifest of a bundle, read from the start of a stream (e.g. an HTTP response body)
+
+    Only the first member is decompressed, so a few kilobytes of a large bundle are
+    enough. The files themselves are not checked; use extract_bundle() for that.
+
+    Args:
+        fileobj: Readable binary stream positioned at the start of the bundle
+        source (str): Name used in error messages
+
+    Returns:
+        dict: The manifest
+
+    Raises:
+        BundleError: The stream does not start with a usable manifest
+    """
+    try:
+        with tarfile.open(fileobj=fileobj, mode='r|gz') as tar:
+            return _read_manifest(tar, source)
+    except (tarfile.TarError, EOFError, OSError, zlib.error) as e:
+        raise BundleError(f"Corrupt or truncated bundle {source}: {e}")
+
+def extract_bundle(bundle_path, target_dir):
+    """
+    Verify a bundle against its manifest while extracting it
+
+    The archive is read in a single pass. Every member must be listed in the manifest
+    with the same size and SHA-256, and every listed file must be present; anything
+    else (including a truncated or corrupt archive) raises BundleError. Extracted files
+    keep the mtime recorded in the manifest, so an unchanged file syncs as unchanged.
+
+    Args:
+        bundle_path (str): Downloaded bundle
+        target_dir (str): Empty (or missing) directory to extract into
+
+    Returns:
+        dict: The manifest
+
+    Raises:
+        BundleError: The bundle does not match its manifest
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    try:
+        with tarfile.open(bundle_path, 'r|gz') as tar:
+            manifest = _read_manifest(tar, bundle_path)
+
+            expected = {entry['path']: entry for entry in manifest.get('files', [])}
+            seen = set()
+            while True:
+                member = tar.next()
+                if member is None:
+                    break
+                entry = expected.get(member.name)
+                if not member.isfile() or entry is None or not _safe_path(member.name) or member.name in seen:
+                    raise BundleError(f"Unexpected member {member.name!r} in {bundle_path}")
+                if member.size != entry['size']:
+                    raise BundleError(f"{member.name}: {member.size} bytes, manifest says {entry['size']}")
+
+                path = os.path.join(target_dir, *member.name.split('/'))
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                digest = hashlib.sha256()
+                source = tar.extractfile(member)
+                with open(path, 'wb') as f:
+                    for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                        digest.update(chunk)
+                        f.write(chunk)
+                if digest.hexdigest() != entry['sha256']:
+                    raise BundleError(f"{member.name}: SHA-256 does not match the manifest")
+                if entry.get('mtime') is not None:
+                    os.utime(path, (entry['mtime'], entry['mtime']))
+                seen.add(member.name)
+    except (tarfile.TarError, EOFError, OSError, zlib.error) as e:
+        raise BundleError(f"Corrupt or truncated bundle {bundle_path}: {e}")
+
+    missing = set(expected) - seen
+    if missing:
+        raise BundleError(f"{len(missing)} files listed in the manifest are missing, e.g. {sorted(missing)[0]}")
+    return manifest
+
+def fetch_bundle(url, target_dir, client=None, token=None, keep_path=None):
+    """
+    Download a bundle in one request and extract it, verified, into target_dir
+
+    Args:
+        url (str): Bundle URL (release asset, or any HTTP server holding the file)
+        target_dir (str): Empty (or missing) directory to extract into
+        client (HttpClient, optional): Client to download with
+        token (str, optional): Bearer token, e.g. for a private repository's asset API URL
+        keep_path (str, optional): Where to keep the downloaded bundle. Defaults to a
+            temporary file that is removed afterwards.
+
+    Returns:
+        dict: ok, manifest, size (compressed bytes), resumed_from, error, missing (the URL
+            answered 404: no bundle was published there)
+    """
+    if token:
+        # Own session, so the token is not sent on the caller's other requests
+        client = HttpClient(retries=client.retries if client else 3)
+        client.headers['Authorization'] = f'Bearer {token}'
+        # The asset API answers with the file itself (via a redirect) instead of JSON
+        client.headers['Accept'] = 'application/octet-stream'
+    elif client is None:
+        client = HttpClient()
+
+    bundle_path = keep_path or os.path.join(tempfile.mkdtemp(prefix='results_bundle_'), BUNDLE_FILENAME)
+    try:
+        download = download_resumable(client, url, bundle_path)
+        if not download['ok']:
+            return {'ok': False, 'manifest': None, 'size': 0, 'resumed_from': 0, 'error': download['error'],
+                    'missing': download['status'] == 404}
+        try:
+            manifest = extract_bundle(bundle_path, target_dir)
+        except BundleError as e:
+            return {'ok': False, 'manifest': None, 'size': download['size'],
+                    'resumed_from': download['resumed_from'], 'error': str(e), 'missing': False}
+        return {'ok': True, 'manifest': manifest, 'size': download['size'],
+                'resumed_from': download['resumed_from'], 'error': None, 'missing': False}
+    finally:
+        if not keep_path:
+            shutil.rmtree(os.path.dirname(bundle_path), ignore_errors=True)
+
+def main():
+    parser = argparse.ArgumentParser(description='Build, verify and fetch result bundles')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='Pack a directory into a bundle')
+    build.add_argument('source', help='Directory to bundle (e.g. result_files)')
+    build.add_argument('bundle', nargs='?', default=BUNDLE_FILENAME, help=f'Output path (default: {BUNDLE_FILENAME})')
+    build.add_argument('--run-id', default=None, help='Run ID recorded in the manifest')
+
+    verify = commands.add_parser('verify', help='Check a bundle against its manifest')
+    verify.add_argument('bundle', help='Bundle path')
+
+    extract = commands.add_parser('extract', help='Verify and extract a bundle')
+    extract.add_argument('bundle', help='Bundle path')
+    extract.add_argument('target', help='Directory to extract into')
+
+    fetch = commands.add_parser('fetch', help='Download, verify and extract a bundle')
+    fetch.add_argument('url', help='Bundle URL')
+    fetch.add_argument('target', help='Directory to extract into')
+    fetch.add_argument('--token', default=os.getenv('GITHUB_TOKEN'), help='Bearer token (default: GITHUB_TOKEN)')
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        manifest = build_bundle(args.source, args.bundle, args.run_id)
+        print(f"✓ {args.bundle}: {manifest['file_count']} files, {manifest['total_bytes']} bytes "
+              f"-> {os.path.getsize(args.bundle)} bytes compressed")
+        return
+
+    try:
+        if args.command == 'verify':
+            target = tempfile.mkdtemp(prefix='results_bundle_')
+            try:
+                manifest = extract_bundle(args.bundle, target)
+            finally:
+                shutil.rmtree(target, ignore_errors=True)
+        elif args.command == 'extract':
+            manifest = extract_bundle(args.bundle, args.target)
+        else:
+            result = fetch_bundle(args.url, args.target, token=args.token)
+            if not result['ok']:
+                raise BundleError(result['error'])
+            manifest = result['manifest']
+    except (BundleError, requests.RequestException) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"✓ Run {manifest.get('run_id') or 'unknown'}: {manifest['file_count']} files "
+          f"({manifest['total_bytes']} bytes) match the manifest")
+
+if __name__ == "__main__":
+    main()
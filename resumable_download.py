@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Resumable Download - fetch a file over HTTP so an interrupted transfer can be continued
+Bytes are streamed into <file>.part next to a small <file>.part.json recording the URL,
+ETag and expected size. A retry (or the next run) sends Range: bytes=<part size>- with
+If-Range, so only the missing bytes are transferred; if the file changed on the server
+the full body comes back and the part is started over. The final file only appears,
+by rename, once its size matches Content-Length/Content-Range.
+"""
+
+import json
+import os
+import re
+
+import requests
+
+from http_client import HttpClient
+
+PART_SUFFIX = '.part'
+META_SUFFIX = '.part.json'
+
+# Bytes per read from the response stream
+CHUNK_SIZE = 64 * 1024
+
+_CONTENT_RANGE = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+class PartDiscarded(requests.RequestException):
+    """The part file no longer matched the file on the server and was dropped; retrying starts over"""
+
+def _load_meta(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _save_meta(path, meta):
+    with open(path, 'w') as f:
+        json.dump(meta, f)
+
+def _discard(*paths):
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def part_offset(filepath, url):
+    """
+    Bytes of filepath already downloaded from url
+
+    Returns:
+        tuple[int, dict | None]: (offset, recorded metadata); (0, None) when there is nothing to resume
+    """
+    part_path = filepath + PART_SUFFIX
+    meta = _load_meta(filepath + META_SUFFIX)
+    if not meta or meta.get('url') != url or not os.path.exists(part_path):
+        return 0, None
+    return os.path.getsize(part_path), meta
+
+def _expected_total(response):
+    """Full size of the file from Content-Range (206) or Content-Length (200), None if unknown"""
+    if response.status_code == 206:
+        match = _CONTENT_RANGE.match(response.headers.get('Content-Range', ''))
+        if match and match.group(3) != '*':
+            return int(match.group(3))
+        return None
+    length = response.headers.get('Content-Length')
+    return int(length) if length and length.isdigit() else None
+
+def _fetch(client, url, filepath, timeout):
+    """
+    One attempt: resume or start the part file and stream the rest of the body into it
+
+    Returns:
+        tuple[int, dict]: (offset the attempt resumed from, metadata) once the part is complete
+
+    Raises:
+        PartDiscarded: The server's file changed under the part file
+        requests.HTTPError: The server refused the request
+        requests.RequestException: Transfer failed or came up short (the part is kept)
+    """
+    part_path = filepath + PART_SUFFIX
+    meta_path = filepath + META_SUFFIX
+    offset, meta = part_offset(filepath, url)
+
+    # identity: byte ranges must refer to the file itself, not a compressed encoding of it
+    headers = {'Accept-Encoding': 'identity'}
+    if offset:
+        headers['Range'] = f'bytes={offset}-'
+        if meta.get('etag'):
+            # Changed on the server since the part was started: send the whole new file instead
+            headers['If-Range'] = meta['etag']
+
+    # Retries happen a level up, so each one recomputes the Range from the part file
+    with client.request('GET', url, retries=0, headers=headers, stream=True, timeout=timeout) as response:
+        if response.status_code == 416 and meta and offset == meta.get('total'):
+            # Everything had arrived before the last attempt was cut off
+            return offset, meta
+        if response.status_code == 416:
+            _discard(part_path, meta_path)
+            raise PartDiscarded(f"416 Range Not Satisfiable for {url} (restarting)", response=response)
+        response.raise_for_status()
+
+        etag = response.headers.get('ETag')
+        resumed = response.status_code == 206
+        if resumed:
+            match = _CONTENT_RANGE.match(response.headers.get('Content-Range', ''))
+            if not match or int(match.group(1)) != offset or (meta.get('etag') and etag and etag != meta['etag']):
+                _discard(part_path, meta_path)
+                raise PartDiscarded(f"Unexpected partial response for {url} (restarting)", response=response)
+        else:
+            offset = 0
+
+        meta = {
+            'url': url,
+            'etag': etag,
+            'total': _expected_total(response),
+            'content_type': response.headers.get('Content-Type', '')
+        }
+        _save_meta(meta_path, meta)
+
+        with open(part_path, 'ab' if resumed else 'wb') as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+
+    size = os.path.getsize(part_path)
+    if meta['total'] is not None and size != meta['total']:
+        raise requests.ConnectionError(f"Transfer of {url} stopped at {size}/{meta['total']} bytes")
+    return offset, meta
+
+def download_resumable(client, url, filepath, retries=3, timeout=30, accept=None):
+    """
+    Download url to filepath, resuming from an existing .part file
+
+    Args:
+        client (HttpClient | requests.Session): Client to download with (a session is wrapped
+            in an HttpClient, so its retry policy applies either way)
+        url (str): File URL
+        filepath (str): Final path (only created once the download is complete)
+        retries (int): Attempts before giving up; later attempts continue the part file.
+            Only connection errors, timeouts and the client's retry statuses (429/5xx) are retried.
+        timeout (float): Connect/read timeout per attempt
+        accept (callable, optional): accept(content_type, head_bytes) -> bool, checked
+            before the part is renamed into place
+
+    Returns:
+        dict: ok, size, resumed_from (offset the final attempt continued from), error,
+            status (HTTP status of the answer that failed the download, None if there was none)
+    """
+    if not isinstance(client, HttpClient):
+        client = HttpClient(client)
+    part_path = filepath + PART_SUFFIX
+    meta_path = filepath + META_SUFFIX
+    error = None
+    status = None
+
+    for attempt in range(retries):
+        try:
+            resumed_from, meta = _fetch(client, url, filepath, timeout)
+        except requests.RequestException as e:
+            error = str(e)
+            response = getattr(e, 'response', None)
+            status = response.status_code if response is not None else None
+            # Same policy as HttpClient: a 404/403/401 will not change on retry
+            if isinstance(e, requests.HTTPError) and response is not None and response.status_code not in client.retry_statuses:
+                break
+            delay = client.retry_delay(url, attempt, response) if attempt < retries - 1 else None
+            if delay is None:
+                break
+            client.wait(delay)
+            continue
+
+        if accept:
+            with open(part_path, 'rb') as f:
+                head = f.read(100)
+            if not accept(meta.get('content_type', ''), head):
+                _discard(part_path, meta_path)
+                return {'ok': False, 'size': 0, 'resumed_from': 0, 'error': 'Invalid content type', 'status': None}
+
+        os.replace(part_path, filepath)
+        _discard(meta_path)
+        return {'ok': True, 'size': os.path.getsize(filepath), 'resumed_from': resumed_from, 'error': None,
+                'status': None}
+
+    return {'ok': False, 'size': 0, 'resumed_from': 0, 'error': error, 'status': status}
@@ -19,7 +19,6 @@ from datetime import datetime
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.http import MediaFileUpload
-import dropbox
 import requests
 
 # Phantombuster CAPTCHA solving functions
@@ -97,59 +96,134 @@ def solve_recaptcha(driver, logs):
 
 def upload_to_dropbox(file_path, filename, logs):
     """
-    Upload file to Dropbox using the existing token manager
+    Queue a file for upload to Dropbox by the background upload queue
+
+    Only the copy into the spool directory happens here; the network upload runs on the
+    queue's worker threads, off the scraping path. flush_dropbox_uploads() waits for them
+    at the end of the run, and anything unfinished is resumed by the next run. Nothing is
+    spooled when no Dropbox token can be obtained.
     """
     try:
-        logs.write(f"[{datetime.now()}] Uploading {filename} to Dropbox...\n")
-        
-        # Use the existing Dropbox token manager
         try:
-            from dropbox_token_manager import get_token_manager
-            manager = get_token_manager()
-            access_token = manager.get_current_token()
-            
-            if not access_token:
-                logs.write(f"[{datetime.now()}] Error: No Dropbox access token found\n")
-                return False
-            
-            # Test token validity
-            token_status = manager.test_token(access_token)
-            if not token_status['valid']:
-                logs.write(f"[{datetime.now()}] Error: Dropbox token is invalid: {token_status['error']}\n")
-                return False
-            
-            logs.write(f"[{datetime.now()}] Using Dropbox account: {token_status.get('account_name', 'Unknown')}\n")
-            
+            from upload_queue import get_upload_queue
+            upload_queue = get_upload_queue(log=lambda message: logs.write(f"[{datetime.now()}] {message}\n"))
         except ImportError:
-            logs.write(f"[{datetime.now()}] Error: Dropbox token manager not available\n")
-            return False
-        except Exception as e:
-            logs.write(f"[{datetime.now()}] Error accessing Dropbox token manager: {str(e)}\n")
+            logs.write(f"[{datetime.now()}] Error: Dropbox upload queue not available\n")
             return False
         
-        # Create Dropbox client
-        dbx = dropbox.Dropbox(access_token)
-        
-        # Upload file to Dropbox
-        dropbox_path = f"/Selenium_Screenshots/{filename}"
-        
-        with open(file_path, 'rb') as f:
-            file_data = f.read()
-        
-        # Upload the file
-        dbx.files_upload(
-            file_data,
-            dropbox_path,
-            mode=dropbox.files.WriteMode.overwrite
-        )
-        
-        logs.write(f"[{datetime.now()}] Successfully uploaded {filename} to Dropbox at {dropbox_path}\n")
+        # Checked once per token: raises when there is none, or Dropbox rejects it
+        upload_queue.uploader.client()
+        upload_queue.put(file_path, filename)
+        logs.write(f"[{datetime.now()}] Queued {filename} for upload to Dropbox\n")
         return True
         
     except Exception as e:
         logs.write(f"[{datetime.now()}] Error uploading to Dropbox: {str(e)}\n")
         return False
 
+def resume_dropbox_uploads(logs):
+    """
+    Start the upload queue right away when a previous run left uploads in the spool
+    """
+    try:
+        from upload_queue import SPOOL_DIR, get_upload_queue
+        if os.path.isdir(SPOOL_DIR) and os.listdir(SPOOL_DIR):
+            get_upload_queue(log=lambda message: logs.write(f"[{datetime.now()}] {message}\n"))
+    except ImportError:
+        pass
+    except Exception as e:
+        logs.write(f"[{datetime.now()}] Could not resume Dropbox uploads: {str(e)}\n")
+
+def flush_dropbox_uploads(logs):
+    """
+    Wait (up to FLUSH_TIMEOUT_SECONDS) for the queued Dropbox uploads to be committed
+    """
+    try:
+        from upload_queue import close_upload_queue
+        result = close_upload_queue()
+        if result is None:
+            return
+        logs.write(f"[{datetime.now()}] Dropbox uploads: {result['uploaded']} committed "
+                   f"({result['resumed']} resumed from a previous run), {result['retries']} retries\n")
+        if result['remaining']:
+            logs.write(f"[{datetime.now()}] {result['remaining']} uploads left in the spool for the next run\n")
+    except ImportError:
+        pass
+    except Exception as e:
+        logs.write(f"[{datetime.now()}] Error flushing Dropbox uploads: {str(e)}\n")
+
+def index_result_file(file_path, logs):
+    """
+    Add a downloaded result CSV to the local places index used by /api/places
+    """
+    try:
+        from places_index import ingest_file
+        rows = ingest_file(file_path)
+        logs.write(f"[{datetime.now()}] Indexed {rows} places from {os.path.basename(file_path)}\n")
+        return True
+    except ImportError:
+        logs.write(f"[{datetime.now()}] Places index not available, skipping indexing\n")
+        return False
+    except Exception as e:
+        logs.write(f"[{datetime.now()}] Error indexing {file_path}: {str(e)}\n")
+        return False
+
+def open_results_artifact(download_dir, logs):
+    """
+    Start the NDJSON results artifact that consumers read instead of parsing this log
+    """
+    try:
+        from results_artifact import ResultsArtifactWriter, default_artifact_path
+        path = default_artifact_path(download_dir)
+        artifact = ResultsArtifactWriter(path)
+        logs.write(f"[{datetime.now()}] Writing results artifact to {path}\n")
+        return artifact
+    except ImportError:
+        logs.write(f"[{datetime.now()}] Results artifact not available, results are only logged\n")
+        return None
+    except Exception as e:
+        logs.write(f"[{datetime.now()}] Could not open results artifact: {str(e)}\n")
+        return None
+
+def open_http_client(logs):
+    """
+    Client for the result downloads: the shared retry policy from http_client.py when it
+    is alongside this script, otherwise a plain session (no retries)
+    """
+    try:
+        from http_client import HttpClient
+        return HttpClient()
+    except ImportError:
+        logs.write(f"[{datetime.now()}] http_client not available, downloads are not retried\n")
+        return requests.Session()
+
+def open_progress_stream(logs):
+    """
+    Open the progress pipe a parent process passes in PROGRESS_FD, if any
+    """
+    fd = os.environ.get('PROGRESS_FD')
+    if not fd:
+        return None
+    try:
+        return os.fdopen(int(fd), 'w', buffering=1)
+    except (ValueError, OSError) as e:
+        logs.write(f"[{datetime.now()}] Could not open progress stream {fd}: {str(e)}\n")
+        return None
+
+def report_progress(stream, event, **fields):
+    """
+    Send one progress event (a JSON line) to the parent process
+    """
+    if stream is None:
+        return
+    fields['event'] = event
+    fields['at'] = time.time()
+    try:
+        stream.write(json.dumps(fields) + "\n")
+    except (OSError, ValueError):
+        # The parent stopped listening; the run itself carries on
+        pass
+
 def take_debug_screenshot(driver, description, logs):
     """
     Take a debug screenshot and upload to Dropbox
@@ -171,9 +245,9 @@ def take_debug_screenshot(driver, description, logs):
         upload_success = upload_to_dropbox(screenshot_file, f"debug_{description}_{timestamp}.png", logs)
         
         if upload_success:
-            logs.write(f"[{datetime.now()}] Screenshot successfully uploaded to Dropbox\n")
+            logs.write(f"[{datetime.now()}] Screenshot queued for upload to Dropbox\n")
         else:
-            logs.write(f"[{datetime.now()}] Screenshot saved locally but Dropbox upload failed\n")
+            logs.write(f"[{datetime.now()}] Screenshot saved locally but could not be queued for Dropbox\n")
             # Keep the local file for debugging purposes
         
     except Exception as e:
@@ -211,7 +285,13 @@ def create_screenshot_summary(logs):
     except Exception as e:
         logs.write(f"[{datetime.now()}] Error creating screenshot summary: {str(e)}\n")
 
-def run_selenium_download():
+def run_selenium_download(progress=None):
+    """
+    Log in to Phantombuster, collect every agent's result IDs and download the CSVs
+
+    Args:
+        progress (file-like, optional): Progress event stream. Defaults to the PROGRESS_FD pipe, if any.
+    """
     logs = io.StringIO()
     download_dir = os.path.abspath("result_files")
     os.makedirs(download_dir, exist_ok=True)  # Ensure directory exists
@@ -234,6 +314,9 @@ def run_selenium_download():
     except Exception as e:
         logs.write(f"Failed to clear result_files directory: {e}\n")
     
+    # Uploads a previous run did not finish go out in the background while this one starts
+    resume_dropbox_uploads(logs)
+    
     # Ensure matching chromedriver is present for the installed Chrome
     if CHROMEDRIVER_AUTOINSTALLER_AVAILABLE:
         try:
@@ -554,6 +637,13 @@ def run_selenium_download():
             logs.write(f"Could not run diagnostics: {diag_e}\n")
         
         raise
+
+    artifact = open_results_artifact(download_dir, logs)
+    if artifact:
+        artifact.run_started(len(AGENT_IDS_TO_PROCESS))
+    progress = progress or open_progress_stream(logs)
+    report_progress(progress, 'run_started', agents_total=len(AGENT_IDS_TO_PROCESS))
+    run_error = None
     try:
         # Navigate to login page (only once)
         driver.get(LOGIN_URL)
@@ -622,7 +712,7 @@ def run_selenium_download():
         logs.write("Saved post-cookie page source to 'post_cookie_page_source.html'.\n")
 
         # Loop through agent IDs
-        for agent_id in AGENT_IDS_TO_PROCESS:
+        for agent_index, agent_id in enumerate(AGENT_IDS_TO_PROCESS, 1):
             agent_console_url = f"https://phantombuster.com/7429435058026063/phantoms/{agent_id}/console"
             try:
                 driver.get(agent_console_url)
@@ -693,14 +783,25 @@ def run_selenium_download():
                     logs.write(f"Could not find result.csv buttons: {e}\n")
                 folder_name = AGENT_ID_TO_S3_FOLDER.get(agent_id, agent_id)
                 results_by_agent[folder_name] = result_numbers
+                if artifact:
+                    artifact.agent(folder_name, result_numbers, agent_id=agent_id)
             except Exception as e:
                 logs.write(f"Could not process agent {agent_id}: {e}\n")
                 folder_name = AGENT_ID_TO_S3_FOLDER.get(agent_id, agent_id)
                 results_by_agent[folder_name] = []
+                if artifact:
+                    artifact.agent(folder_name, [], agent_id=agent_id, error=str(e))
+            report_progress(progress, 'agent', agent_id=agent_id, agents_done=agent_index,
+                            agents_total=len(AGENT_IDS_TO_PROCESS),
+                            files_found=len(results_by_agent[folder_name]))
         logs.write(f"Results by folder: {results_by_agent}\n")
 
         # Download each result.csv file for each folder
-        import requests
+        http = open_http_client(logs)
+        files_total = sum(len(file_ids) for file_ids in results_by_agent.values())
+        files_done = 0
+        bytes_done = 0
+        report_progress(progress, 'downloads_started', files_total=files_total)
         for folder_name, file_ids in results_by_agent.items():
             # Extract agent letters from folder_name (remove trailing slash)
             agent_letters = folder_name.rstrip('/')
@@ -708,21 +809,48 @@ def run_selenium_download():
                 # Build download URL
                 download_url = f"https://cache1.phantombooster.com/URYtknGfxvU/{agent_letters}/{file_id}/result.csv"
                 logs.write(f"Downloading: {download_url}\n")
+                response = None
                 try:
-                    response = requests.get(download_url)
+                    response = http.get(download_url, timeout=60)
                     if response.status_code == 200:
                         out_path = os.path.join(download_dir, f"{agent_letters}_{file_id}_result.csv")
                         with open(out_path, "wb") as out_file:
                             out_file.write(response.content)
                         logs.write(f"Saved to {out_path}\n")
+                        index_result_file(out_path, logs)
+                        if artifact:
+                            artifact.file(agent_letters, file_id, path=out_path, size=len(response.content))
                     else:
                         logs.write(f"Failed to download {download_url}: Status {response.status_code}\n")
+                        if artifact:
+                            artifact.file(agent_letters, file_id, error=f"Status {response.status_code}")
                 except Exception as e:
                     logs.write(f"Error downloading {download_url}: {e}\n")
+                    if artifact:
+                        artifact.file(agent_letters, file_id, error=str(e))
+                files_done += 1
+                if response is not None and response.status_code == 200:
+                    bytes_done += len(response.content)
+                report_progress(progress, 'file', folder=agent_letters, file_id=file_id,
+                                files_done=files_done, files_total=files_total, bytes_done=bytes_done)
+    except Exception as e:
+        run_error = str(e)
+        raise
     finally:
-        # Create screenshot summary before closing
+        # Finish the queued Dropbox uploads, then summarize the screenshots
+        flush_dropbox_uploads(logs)
         create_screenshot_summary(logs)
         
+        if artifact:
+            artifact.run_finished(error=run_error)
+            artifact.close()
+        report_progress(progress, 'run_finished', error=run_error)
+        if progress:
+            try:
+                progress.close()
+            except OSError:
+                pass
+
         driver.quit()
         logs.write("Script completed and browser closed.\n")
     return logs.getvalue()
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+Upload Queue - durable background Dropbox uploads for the Selenium run
+put() copies the file into a spool directory and returns at once; worker threads upload
+it with the shared DropboxUploader (staged, then committed in batches) and retry
+failures with backoff. A job's spool files are only removed once Dropbox has committed
+it, so uploads that were still queued when a run ended - or when it crashed - are picked
+up again by the next run that starts a queue on the same spool directory.
+Usage: python upload_queue.py [spool_dir]   (uploads whatever a previous run left behind)
+"""
+
+import json
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+import uuid
+
+from dropbox_uploader import PERMANENT_ERRORS, DropboxUploader
+from http_client import backoff_delay
+
+# Where queued uploads wait (keep it on persistent storage to resume across runs)
+SPOOL_DIR = os.environ.get('UPLOAD_SPOOL_DIR', 'upload_spool')
+
+# Upload threads per queue
+DEFAULT_WORKERS = 2
+
+# Attempts per job in one run; a job that runs out stays spooled for the next run
+MAX_ATTEMPTS = 5
+
+# Staged uploads are committed once the queue has been idle this long
+COMMIT_IDLE_SECONDS = 2
+
+# How long close() waits for the queue to drain before leaving the rest spooled
+FLUSH_TIMEOUT_SECONDS = 60
+
+# Spooled jobs older than this are dropped instead of resumed
+MAX_AGE_SECONDS = 7 * 24 * 3600
+
+JOB_SUFFIX = '.json'
+DATA_SUFFIX = '.data'
+
+class UploadQueue:
+    def __init__(self, spool_dir=SPOOL_DIR, workers=DEFAULT_WORKERS, uploader=None, log=None):
+        """
+        Initialize the queue (call start() to resume spooled jobs and start the workers)
+
+        Args:
+            spool_dir (str): Spool directory
+            workers (int): Upload threads
+            uploader (DropboxUploader, optional): Defaults to a new uploader on the shared
+                token manager
+            log (callable, optional): Called with a message for every notable event
+        """
+        self.spool_dir = spool_dir
+        self.workers = max(1, workers)
+        self.uploader = uploader or DropboxUploader()
+        self.uploader.on_commit = self._committed
+        self.log = log or (lambda message: None)
+        self.stats = {'queued': 0, 'resumed': 0, 'uploaded': 0, 'retries': 0, 'failed': 0}
+        self._queue = queue.Queue()
+        self._threads = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        # Dropbox path -> jobs staged to it, oldest first, waiting for a commit
+        self._staged = {}
+        os.makedirs(spool_dir, exist_ok=True)
+
+    def _path(self, job_id, suffix):
+        return os.path.join(self.spool_dir, job_id + suffix)
+
+    def _write_job(self, job):
+        temp_path = self._path(job['id'], JOB_SUFFIX + '.tmp')
+        with open(temp_path, 'w') as f:
+            json.dump(job, f)
+        os.replace(temp_path, self._path(job['id'], JOB_SUFFIX))
+
+    def _remove_job(self, job):
+        for suffix in (DATA_SUFFIX, JOB_SUFFIX):
+            try:
+                os.remove(self._path(job['id'], suffix))
+            except FileNotFoundError:
+                pass
+
+    def put(self, file_path, name=None):
+        """
+        Spool a file for upload; returns as soon as it is on local disk
+
+        The file is copied, so the caller may overwrite or delete it right away.
+
+        Args:
+            file_path (str): Local file
+            name (str, optional): Dropbox file name or full path. Defaults to the local name.
+
+        Returns:
+            str: Job ID
+        """
+        job = {
+            'id': f"{int(time.time() * 1000)}_{uuid.uuid4().hex[:8]}",
+            'name': name or os.path.basename(file_path),
+            'source': os.path.abspath(file_path),
+            'attempts': 0,
+            'created_at': time.time()
+        }
+        # Data first: a job file is only ever written next to complete data
+        shutil.copyfile(file_path, self._path(job['id'], DATA_SUFFIX))
+        self._write_job(job)
+        self.stats['queued'] += 1
+        self._queue.put(job)
+        return job['id']
+
+    def resume(self):
+        """
+        Queue the jobs a previous run left in the spool directory
+
+        Returns:
+            int: Jobs resumed
+        """
+        resumed = 0
+        now = time.time()
+        for entry in sorted(os.listdir(self.spool_dir)):
+            if not entry.endswith(JOB_SUFFIX):
+                continue
+            try:
+                with open(os.path.join(self.spool_dir, entry), 'r') as f:
+                    job = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if not os.path.exists(self._path(job['id'], DATA_SUFFIX)) or now - job.get('created_at', 0) > MAX_AGE_SECONDS:
+                self.log(f"Dropping spooled upload {job.get('name')} (missing data or older than {MAX_AGE_SECONDS // 86400} days)")
+                self._remove_job(job)
+                continue
+            # Fresh attempts for this run
+            job['attempts'] = 0
+            self._queue.put(job)
+            resumed += 1
+
+        # Data without a job file: put() was interrupted between the two writes
+        for entry in os.listdir(self.spool_dir):
+            if not entry.endswith(DATA_SUFFIX):
+                continue
+            path = os.path.join(self.spool_dir, entry)
+            if not os.path.exists(self._path(entry[:-len(DATA_SUFFIX)], JOB_SUFFIX)) and now - os.path.getmtime(path) > 3600:
+                os.remove(path)
+
+        self.stats['resumed'] += resumed
+        if resumed:
+            self.log(f"Resuming {resumed} Dropbox uploads left over from a previous run")
+        return resumed
+
+    def start(self):
+        """Resume spooled jobs and start the worker threads"""
+        self.resume()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"upload-queue-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def _work(self):
+        while not self._stop.is_set():
+            try:
+                job = self._queue.get(timeout=COMMIT_IDLE_SECONDS)
+            except queue.Empty:
+                # Idle: make what has been staged durable on Dropbox
+                if self.uploader.pending:
+                    self.commit()
+                continue
+            try:
+                if job is not None:
+                    self._upload(job)
+            finally:
+                self._queue.task_done()
+            if job is None:
+                return
+
+    def _upload(self, job):
+        """
+        Stage one job, retrying with backoff; a job that runs out of attempts stays spooled
+
+        A missing or rejected token will not fix itself between attempts (or runs), so the
+        job is dropped from the spool instead.
+        """
+        path = self.uploader.dropbox_path(job['name'])
+        while not self._stop.is_set():
+            job['attempts'] += 1
+            # Registered before staging: a full batch is committed inside stage()
+            with self._lock:
+                self._staged.setdefault(path, []).append(job)
+            try:
+                self.uploader.stage(self._path(job['id'], DATA_SUFFIX), job['name'])
+                return
+            except Exception as e:
+                with self._lock:
+                    self._staged[path].remove(job)
+                if isinstance(e, PERMANENT_ERRORS):
+                    self.stats['failed'] += 1
+                    self.log(f"Dropping {job['name']}: Dropbox cannot take uploads ({e})")
+                    self._remove_job(job)
+                    return
+                if job['attempts'] >= MAX_ATTEMPTS:
+                    self.stats['failed'] += 1
+                    self.log(f"Giving up on {job['name']} for this run after {job['attempts']} attempts "
+                             f"(kept in {self.spool_dir}): {e}")
+                    return
+                delay = backoff_delay(job['attempts'])
+                self.stats['retries'] += 1
+                self.log(f"Upload of {job['name']} failed (attempt {job['attempts']}/{MAX_ATTEMPTS}), "
+                         f"retrying in {delay:.1f}s: {e}")
+                self._stop.wait(delay)
+
+    def commit(self):
+        """Commit everything staged so far (results are handled by _committed)"""
+        try:
+            self.uploader.commit()
+        except Exception as e:
+            self.log(f"Error committing Dropbox uploads: {e}")
+
+    def _committed(self, result):
+        """Remove committed jobs from the spool; queue failed ones again"""
+        retry = []
+        with self._lock:
+            for path in result['committed']:
+                jobs = self._staged.get(path)
+                if jobs:
+                    self._remove_job(jobs.pop(0))
+                    self.stats['uploaded'] += 1
+            for path, error in result['failed']:
+                jobs = self._staged.get(path)
+                if jobs:
+                    job = jobs.pop(0)
+                    self.log(f"Dropbox did not commit {job['name']}: {error}")
+                    retry.append(job)
+        for job in retry:
+            if job['attempts'] < MAX_ATTEMPTS and not self._stop.is_set():
+                self._queue.put(job)
+            else:
+                self.stats['failed'] += 1
+
+    @property
+    def backlog(self):
+        """Jobs queued or being staged, plus staged jobs not yet committed"""
+        with self._lock:
+            staged = sum(len(jobs) for jobs in self._staged.values())
+        return self._queue.unfinished_tasks + staged
+
+    def close(self, timeout=FLUSH_TIMEOUT_SECONDS):
+        """
+        Upload what is queued, commit it and stop the workers, waiting at most timeout
+
+        Whatever is not committed by then stays in the spool for the next run.
+
+        Returns:
+            dict: uploaded (this run), remaining (left in the spool) and the other stats
+        """
+        deadline = time.time() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks and time.time() < deadline:
+                self._queue.all_tasks_done.wait(deadline - time.time())
+
+        # Stop taking jobs (and cut retry waits short), then commit what was staged
+        self._stop.set()
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(max(0, deadline - time.time()))
+        self._threads = []
+        self.commit()
+
+        remaining = len([entry for entry in os.listdir(self.spool_dir) if entry.endswith(JOB_SUFFIX)])
+        return dict(self.stats, remaining=remaining)
+
+# Global instance
+_upload_queue = None
+_upload_queue_lock = threading.Lock()
+
+def get_upload_queue(log=None):
+    """Get the global upload queue, starting it (and resuming spooled jobs) on first use"""
+    global _upload_queue
+    with _upload_queue_lock:
+        if _upload_queue is None:
+            _upload_queue = UploadQueue(log=log).start()
+        return _upload_queue
+
+def close_upload_queue(timeout=FLUSH_TIMEOUT_SECONDS):
+    """
+    Flush and stop the global upload queue, if one was started
+
+    Returns:
+        dict | None: close() result, or None if no queue was running
+    """
+    global _upload_queue
+    with _upload_queue_lock:
+        upload_queue, _upload_queue = _upload_queue, None
+    return upload_queue.close(timeout) if upload_queue else None
+
+def main():
+    spool_dir = sys.argv[1] if len(sys.argv) > 1 else SPOOL_DIR
+    if not os.path.isdir(spool_dir):
+        print(f"✓ Nothing to upload ({spool_dir} does not exist)")
+        return
+
+    upload_queue = UploadQueue(spool_dir, log=print).start()
+    result = upload_queue.close()
+    print(f"✓ Uploaded {result['uploaded']} of {result['resumed']} spooled files "
+          f"({result['remaining']} still in {spool_dir})")
+    if result['remaining']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Result Validator - checks every result CSV in parallel and writes a manifest
+Each file is parsed exactly once in a worker process to collect its row count, error
+rows (the optional `error` column), schema fingerprint and any malformed rows.
+Usage: python validate_results.py [result_dir] [--workers N] [--output manifest.json]
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+# Columns every Google Maps result export is expected to carry
+REQUIRED_COLUMNS = ('placeUrl', 'title', 'rating', 'reviewCount', 'category', 'address', 'query', 'timestamp')
+
+# Written next to the results directory, not into it: the manifest changes on every run
+# and would otherwise show up as a new file to everything that syncs the directory
+MANIFEST_FILENAME = "validation_manifest.json"
+
+# Keep manifests readable when a file is badly broken
+MAX_BAD_ROWS_REPORTED = 100
+
+csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+
+def schema_fingerprint(header):
+    """
+    Fingerprint of a header's column set
+
+    Column order differs between Phantombuster exports, so the fingerprint is taken
+    over the sorted names: files with the same columns share a fingerprint.
+    """
+    joined = ','.join(sorted(header)).encode('utf-8')
+    return hashlib.sha1(joined).hexdigest()[:16]
+
+def _line_offsets(data):
+    """Byte offset of the start of every line in data"""
+    offsets = [0]
+    pos = data.find(b'\n')
+    while pos != -1:
+        offsets.append(pos + 1)
+        pos = data.find(b'\n', pos + 1)
+    return offsets
+
+def validate_file(path):
+    """
+    Validate a single result CSV
+
+    Args:
+        path (str): Path to the CSV
+
+    Returns:
+        dict: Per-file stats (rows, error_rows, schema_fingerprint, bad_rows, ...)
+    """
+    stats = {
+        'file': os.path.basename(path),
+        'size': 0,
+        'rows': 0,
+        'error_rows': 0,
+        'columns': 0,
+        'schema_fingerprint': None,
+        'missing_columns': [],
+        'bad_row_count': 0,
+        'bad_rows': [],
+        'valid': False,
+        'problem': None
+    }
+
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        stats['problem'] = f"Could not read file: {e}"
+        return stats
+
+    stats['size'] = len(data)
+    reader = csv.reader(io.StringIO(data.decode('utf-8', errors='replace'), newline=''))
+    header = next(reader, None)
+    if not header:
+        stats['problem'] = "Empty file or missing header"
+        return stats
+
+    width = len(header)
+    stats['columns'] = width
+    stats['schema_fingerprint'] = schema_fingerprint(header)
+    stats['missing_columns'] = [column for column in REQUIRED_COLUMNS if column not in header]
+
+    error_index = header.index('error') if 'error' in header else None
+    url_index = header.index('placeUrl') if 'placeUrl' in header else None
+
+    bad_lines = []
+    start_line = reader.line_num + 1
+    for fields in reader:
+        if not fields:
+            start_line = reader.line_num + 1
+            continue
+        stats['rows'] += 1
+        is_error_row = error_index is not None and error_index < len(fields) and bool(fields[error_index].strip())
+        if is_error_row:
+            # Phantombuster's own "No new results found" style rows carry no place data
+            stats['error_rows'] += 1
+
+        reason = None
+        if len(fields) != width:
+            reason = f"expected {width} fields, got {len(fields)}"
+        elif url_index is not None and not fields[url_index] and not is_error_row:
+            reason = "missing placeUrl"
+        if reason:
+            bad_lines.append((stats['rows'], start_line, reason))
+        start_line = reader.line_num + 1
+
+    if bad_lines:
+        # Byte offsets are only worked out when there is something to report
+        line_offsets = _line_offsets(data)
+        for row, line, reason in bad_lines[:MAX_BAD_ROWS_REPORTED]:
+            stats['bad_rows'].append({
+                'row': row,
+                'line': line,
+                'offset': line_offsets[line - 1] if line <= len(line_offsets) else len(data),
+                'reason': reason
+            })
+    stats['bad_row_count'] = len(bad_lines)
+
+    if stats['missing_columns']:
+        stats['problem'] = f"Missing columns: {', '.join(stats['missing_columns'])}"
+    elif bad_lines:
+        stats['problem'] = f"{len(bad_lines)} malformed rows"
+    stats['valid'] = stats['problem'] is None
+    return stats
+
+def validate_files(paths, workers=None):
+    """
+    Validate many files across a process pool
+
+    Args:
+        paths (list[str]): CSV paths
+        workers (int, optional): Process count. Defaults to one per CPU.
+
+    Returns:
+        list[dict]: Per-file stats, in the same order as paths
+    """
+    paths = list(paths)
+    if not paths:
+        return []
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+    if workers == 1:
+        return [validate_file(path) for path in paths]
+
+    # Larger chunks keep per-task IPC overhead low for the many small files
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(validate_file, paths, chunksize=chunksize))
+
+def build_manifest(directory, results, workers=None, duration=None):
+    """
+    Summarize per-file stats into a manifest dict
+
+    Args:
+        directory (str): Directory that was validated
+        results (list[dict]): Output of validate_files()
+        workers (int, optional): Worker count used
+        duration (float, optional): Seconds taken
+
+    Returns:
+        dict: Manifest ready to be written as JSON
+    """
+    schemas = {}
+    for stats in results:
+        if stats['schema_fingerprint']:
+            schemas[stats['schema_fingerprint']] = schemas.get(stats['schema_fingerprint'], 0) + 1
+
+    return {
+        'generated_at': datetime.now().isoformat(),
+        'directory': os.path.abspath(directory),
+        'workers': workers,
+        'duration_seconds': round(duration, 3) if duration is not None else None,
+        'total_files': len(results),
+        'valid_files': sum(1 for stats in results if stats['valid']),
+        'invalid_files': sum(1 for stats in results if not stats['valid']),
+        'total_rows': sum(stats['rows'] for stats in results),
+        'total_error_rows': sum(stats['error_rows'] for stats in results),
+        'total_bad_rows': sum(stats['bad_row_count'] for stats in results),
+        'schemas': schemas,
+        'files': {stats['file']: stats for stats in results}
+    }
+
+def default_manifest_path(directory):
+    """Manifest path for a results directory: <parent of directory>/validation_manifest.json"""
+    return os.path.join(os.path.dirname(os.path.abspath(directory)), MANIFEST_FILENAME)
+
+def validate_directory(directory="result_files", workers=None, manifest_path=None):
+    """
+    Validate every CSV in a directory and write the manifest
+
+    Args:
+        directory (str): Directory of result CSVs
+        workers (int, optional): Process count. Defaults to one per CPU.
+        manifest_path (str, optional): Output path. Defaults to validation_manifest.json
+            next to the directory
+
+    Returns:
+        dict: The manifest
+    """
+    paths = sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if name.endswith('_result.csv')
+    )
+    workers = workers or os.cpu_count() or 1
+
+    start = datetime.now()
+    results = validate_files(paths, workers)
+    duration = (datetime.now() - start).total_seconds()
+
+    manifest = build_manifest(directory, results, workers, duration)
+    write_manifest(manifest, manifest_path or default_manifest_path(directory))
+    return manifest
+
+def write_manifest(manifest, path):
+    """Write a manifest atomically so readers never see a partial file"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def main():
+    parser = argparse.ArgumentParser(description='Validate Phantombuster result CSVs')
+    parser.add_argument('directory', nargs='?', default='result_files',
+                       help='Directory of result CSVs (default: result_files)')
+    parser.add_argument('--workers', '-w', type=int, default=None,
+                       help='Worker processes (default: one per CPU)')
+    parser.add_argument('--output', '-o', default=None,
+                       help=f'Manifest path (default: {MANIFEST_FILENAME} next to the directory)')
+    parser.add_argument('--strict', action='store_true',
+                       help='Exit with status 1 if any file is invalid')
+
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"❌ Directory not found: {args.directory}")
+        sys.exit(1)
+
+    manifest = validate_directory(args.directory, args.workers, args.output)
+
+    print(f"✅ Validated {manifest['total_files']} files ({manifest['total_rows']} rows) "
+          f"with {manifest['workers']} workers in {manifest['duration_seconds']}s")
+    print(f"   Error rows: {manifest['total_error_rows']} | Malformed rows: {manifest['total_bad_rows']} "
+          f"| Schemas: {len(manifest['schemas'])}")
+    for name, stats in manifest['files'].items():
+        if not stats['valid']:
+            print(f"   ❌ {name}: {stats['problem']}")
+
+    if args.strict and manifest['invalid_files']:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,21 @@
-from flask import Flask, jsonify, request
+from flask import Flask, jsonify, request, Response
+import hashlib
+import heapq
 import json
 import os
+import threading
 from datetime import datetime
 
 app = Flask(__name__)
 
+# Optional JSON file ({folder: [file_ids]}) that overrides the built-in results; the
+# cached responses are rebuilt whenever its mtime or size changes
+RESULTS_FILE = os.environ.get('WEBHOOK_RESULTS_FILE')
+
+# Rendered responses for the current results, rebuilt only when the results change
+_cache = {'signature': None, 'entry': None}
+_cache_lock = threading.Lock()
+
 def get_latest_results():
     """
     Extract the latest results from the selenium script execution
@@ -66,36 +77,96 @@ def get_latest_results():
         'HaRj88fFDQql8W10JnGp5Q/': ['000000063', '000000062', '000000061', '000000060']
     }
 
-@app.route('/')
-def home():
-    return """
-    <h1>Phantombuster Results Webhook</h1>
-    <p>Available endpoints:</p>
-    <ul>
-        <li><a href="/results">/results</a> - Get results as JSON</li>
-        <li><a href="/results/table">/results/table</a> - Get results as HTML table</li>
-        <li><a href="/results/summary">/results/summary</a> - Get summary statistics</li>
-    </ul>
+def load_results():
     """
+    Current results: RESULTS_FILE if it exists, otherwise get_latest_results()
 
-@app.route('/results')
-def get_results():
-    """Return results as JSON"""
-    results = get_latest_results()
-    return jsonify({
+    Returns:
+        tuple[dict, tuple]: (results, signature) - the signature changes whenever the results may have changed
+    """
+    if RESULTS_FILE:
+        try:
+            st = os.stat(RESULTS_FILE)
+            with open(RESULTS_FILE) as f:
+                return json.load(f), ('file', RESULTS_FILE, st.st_mtime_ns, st.st_size)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Could not read {RESULTS_FILE}, using built-in results: {e}")
+    return get_latest_results(), ('builtin',)
+
+def _results_signature():
+    """Cheap check for changed results: a stat() of RESULTS_FILE, no parsing"""
+    if RESULTS_FILE:
+        try:
+            st = os.stat(RESULTS_FILE)
+            return ('file', RESULTS_FILE, st.st_mtime_ns, st.st_size)
+        except OSError:
+            pass
+    return ('builtin',)
+
+def build_cache_entry(results):
+    """
+    Precompute every results response body
+
+    Args:
+        results (dict): Folder -> list of file IDs
+
+    Returns:
+        dict: etag, generated_at and the rendered results_json, summary_json and table_html
+    """
+    generated_at = datetime.now()
+    canonical = json.dumps(results, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    etag = hashlib.sha1(canonical).hexdigest()[:16]
+
+    file_counts = {folder: len(files) for folder, files in results.items()}
+    total_folders = len(results)
+    total_files = sum(file_counts.values())
+    folders_with_files = sum(1 for count in file_counts.values() if count)
+
+    results_json = app.json.dumps({
         'status': 'success',
-        'timestamp': datetime.now().isoformat(),
-        'total_folders': len(results),
-        'total_files': sum(len(files) for files in results.values()),
+        'timestamp': generated_at.isoformat(),
+        'total_folders': total_folders,
+        'total_files': total_files,
         'results': results
     })
 
-@app.route('/results/table')
-def get_results_table():
-    """Return results as HTML table"""
-    results = get_latest_results()
-    
-    html = f"""
+    summary_json = app.json.dumps({
+        'status': 'success',
+        'timestamp': generated_at.isoformat(),
+        'summary': {
+            'total_folders': total_folders,
+            'total_files': total_files,
+            'folders_with_files': folders_with_files,
+            'empty_folders': total_folders - folders_with_files,
+            'max_files_per_folder': max(file_counts.values()) if file_counts else 0,
+            'min_files_per_folder': min(file_counts.values()) if file_counts else 0,
+            'avg_files_per_folder': round(total_files / total_folders, 2) if total_folders > 0 else 0
+        },
+        # nlargest keeps sorted()'s tie order without sorting every folder
+        'top_folders_by_file_count': heapq.nlargest(10, file_counts.items(), key=lambda x: x[1])
+    })
+
+    return {
+        'etag': etag,
+        'generated_at': generated_at.isoformat(),
+        'results_json': results_json,
+        'summary_json': summary_json,
+        'table_html': render_results_table(results, generated_at, total_folders, total_files)
+    }
+
+def render_results_table(results, generated_at, total_folders, total_files):
+    """Render the /results/table page in one pass (rows are joined, not concatenated)"""
+    rows = []
+    for folder, files in sorted(results.items()):
+        rows.append(f"""
+            <tr>
+                <td class="folder-name">{folder}</td>
+                <td class="file-count">{len(files)}</td>
+                <td class="{'empty' if not files else ''}">{', '.join(files) if files else 'No files'}</td>
+            </tr>
+        """)
+
+    return f"""
     <!DOCTYPE html>
     <html>
     <head>
@@ -112,8 +183,8 @@ def get_results_table():
     </head>
     <body>
         <h1>Phantombuster Results</h1>
-        <p>Last updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-        <p>Total folders: {len(results)} | Total files: {sum(len(files) for files in results.values())}</p>
+        <p>Last updated: {generated_at.strftime('%Y-%m-%d %H:%M:%S')}</p>
+        <p>Total folders: {total_folders} | Total files: {total_files}</p>
         
         <table>
             <tr>
@@ -121,70 +192,68 @@ def get_results_table():
                 <th>File Count</th>
                 <th>File IDs</th>
             </tr>
-    """
-    
-    for folder, files in sorted(results.items()):
-        file_count = len(files)
-        files_str = ', '.join(files) if files else 'No files'
-        empty_class = 'empty' if not files else ''
-        
-        html += f"""
-            <tr>
-                <td class="folder-name">{folder}</td>
-                <td class="file-count">{file_count}</td>
-                <td class="{empty_class}">{files_str}</td>
-            </tr>
-        """
-    
-    html += """
+    {''.join(rows)}
         </table>
     </body>
     </html>
     """
-    
-    return html
+
+def get_cache_entry():
+    """Cached responses for the current results, rebuilding them if the results changed"""
+    signature = _results_signature()
+    entry = _cache['entry']
+    if entry is not None and _cache['signature'] == signature:
+        return entry
+
+    with _cache_lock:
+        if _cache['entry'] is None or _cache['signature'] != signature:
+            results, signature = load_results()
+            _cache['entry'] = build_cache_entry(results)
+            _cache['signature'] = signature
+        return _cache['entry']
+
+def _cached_response(name, mimetype):
+    """Serve a precomputed body with its ETag, answering 304 when the client is current"""
+    entry = get_cache_entry()
+    response = Response(entry[name], mimetype=mimetype)
+    response.set_etag(entry['etag'])
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/')
+def home():
+    return """
+    <h1>Phantombuster Results Webhook</h1>
+    <p>Available endpoints:</p>
+    <ul>
+        <li><a href="/results">/results</a> - Get results as JSON</li>
+        <li><a href="/results/table">/results/table</a> - Get results as HTML table</li>
+        <li><a href="/results/summary">/results/summary</a> - Get summary statistics</li>
+    </ul>
+    """
+
+@app.route('/results')
+def get_results():
+    """Return results as JSON"""
+    return _cached_response('results_json', 'application/json')
+
+@app.route('/results/table')
+def get_results_table():
+    """Return results as HTML table"""
+    return _cached_response('table_html', 'text/html')
 
 @app.route('/results/summary')
 def get_results_summary():
     """Return summary statistics"""
-    results = get_latest_results()
-    
-    total_folders = len(results)
-    total_files = sum(len(files) for files in results.values())
-    folders_with_files = sum(1 for files in results.values() if files)
-    empty_folders = total_folders - folders_with_files
-    
-    # Calculate file count distribution
-    file_counts = [len(files) for files in results.values()]
-    max_files = max(file_counts) if file_counts else 0
-    min_files = min(file_counts) if file_counts else 0
-    avg_files = total_files / total_folders if total_folders > 0 else 0
-    
-    return jsonify({
-        'status': 'success',
-        'timestamp': datetime.now().isoformat(),
-        'summary': {
-            'total_folders': total_folders,
-            'total_files': total_files,
-            'folders_with_files': folders_with_files,
-            'empty_folders': empty_folders,
-            'max_files_per_folder': max_files,
-            'min_files_per_folder': min_files,
-            'avg_files_per_folder': round(avg_files, 2)
-        },
-        'top_folders_by_file_count': sorted(
-            [(folder, len(files)) for folder, files in results.items()],
-            key=lambda x: x[1],
-            reverse=True
-        )[:10]
-    })
+    return _cached_response('summary_json', 'application/json')
 
 @app.route('/health')
 def health_check():
     """Health check endpoint"""
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'results_etag': get_cache_entry()['etag']
     })
 
 if __name__ == '__main__':
@@ -7,22 +7,65 @@ This script fetches results from the webhook API and downloads the corresponding
 import requests
 import os
 import json
-import time
+import shutil
+import tempfile
 from datetime import datetime
 from urllib.parse import urljoin
 
+import dir_sync
+import results_bundle
+from http_client import HttpClient
+from resumable_download import download_resumable
+
+try:
+    import places_index
+    PLACES_INDEX_AVAILABLE = True
+except ImportError:
+    PLACES_INDEX_AVAILABLE = False
+
+try:
+    import validate_results
+    VALIDATOR_AVAILABLE = True
+except ImportError:
+    VALIDATOR_AVAILABLE = False
+
+try:
+    import delta_export
+    DELTA_EXPORT_AVAILABLE = True
+except ImportError:
+    DELTA_EXPORT_AVAILABLE = False
+
+def is_csv_content(content_type, head):
+    """Whether a response looks like a result CSV (by Content-Type or its first bytes)"""
+    return content_type.startswith('text/csv') or b'csv' in head[:100].lower()
+
+# Where Phantombuster serves result CSVs (same pattern as the selenium script)
+DOWNLOAD_BASE_URL = "https://cache1.phantombooster.com/URYtknGfxvU"
+
+# Results bundle published by the workflow (override to point at another server)
+RESULTS_BUNDLE_URL = os.getenv("RESULTS_BUNDLE_URL")
+
 class WebhookDownloader:
-    def __init__(self, webhook_url, download_dir="downloaded_files"):
+    def __init__(self, webhook_url, download_dir="downloaded_files", index_places=True, delta_format=None,
+                 download_base_url=None):
         """
         Initialize the webhook downloader
         
         Args:
             webhook_url (str): Base URL of the webhook API
             download_dir (str): Directory to save downloaded files
+            index_places (bool): Add downloaded CSVs to the local places index
+            delta_format (str, optional): 'csv' or 'jsonl' to write a per-folder delta
+                (inserted/updated/removed rows) next to each downloaded file
+            download_base_url (str, optional): Base URL of the result CSVs. Defaults to DOWNLOAD_BASE_URL.
         """
         self.webhook_url = webhook_url.rstrip('/')
+        self.download_base_url = (download_base_url or DOWNLOAD_BASE_URL).rstrip('/')
         self.download_dir = download_dir
+        self.index_places = index_places and PLACES_INDEX_AVAILABLE
+        self.delta_format = delta_format if DELTA_EXPORT_AVAILABLE else None
         self.session = requests.Session()
+        self.http = HttpClient(self.session)
         
         # Create download directory
         os.makedirs(download_dir, exist_ok=True)
@@ -42,7 +85,7 @@ class WebhookDownloader:
         """
         try:
             print(f"Fetching results from {self.webhook_url}/results...")
-            response = self.session.get(f"{self.webhook_url}/results", timeout=30)
+            response = self.http.get(f"{self.webhook_url}/results", timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -65,7 +108,7 @@ class WebhookDownloader:
         """
         try:
             print(f"Fetching summary from {self.webhook_url}/results/summary...")
-            response = self.session.get(f"{self.webhook_url}/results/summary", timeout=30)
+            response = self.http.get(f"{self.webhook_url}/results/summary", timeout=30)
             response.raise_for_status()
             
             data = response.json()
@@ -84,7 +127,7 @@ class WebhookDownloader:
             bool: True if healthy, False otherwise
         """
         try:
-            response = self.session.get(f"{self.webhook_url}/health", timeout=10)
+            response = self.http.get(f"{self.webhook_url}/health", timeout=10)
             response.raise_for_status()
             
             data = response.json()
@@ -114,13 +157,16 @@ class WebhookDownloader:
         folder_name = folder_name.rstrip('/')
         
         # Build the download URL using the same pattern as the selenium script
-        download_url = f"https://cache1.phantombooster.com/URYtknGfxvU/{folder_name}/{file_id}/result.csv"
+        download_url = f"{self.download_base_url}/{folder_name}/{file_id}/result.csv"
         return download_url
     
     def download_file(self, folder_name, file_id, retries=3):
         """
         Download a single CSV file
         
+        An interrupted transfer leaves a .part file; retries and later runs request only
+        the missing bytes.
+        
         Args:
             folder_name (str): Folder name
             file_id (str): File ID
@@ -133,32 +179,55 @@ class WebhookDownloader:
         filename = f"{folder_name}_{file_id}_result.csv"
         filepath = os.path.join(self.download_dir, filename)
         
-        for attempt in range(retries):
-            try:
-                print(f"  Downloading {filename} (attempt {attempt + 1}/{retries})...")
-                response = self.session.get(download_url, timeout=30)
-                response.raise_for_status()
-                
-                # Check if we got actual CSV content
-                if response.headers.get('content-type', '').startswith('text/csv') or 'csv' in response.text[:100].lower():
-                    with open(filepath, 'wb') as f:
-                        f.write(response.content)
-                    
-                    file_size = os.path.getsize(filepath)
-                    print(f"  ✓ Downloaded {filename} ({file_size} bytes)")
-                    return True
-                else:
-                    print(f"  ✗ Invalid content type for {filename}")
-                    return False
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"  ✗ Download failed for {filename}: {e}")
-                if attempt < retries - 1:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-                else:
-                    return False
+        print(f"  Downloading {filename}...")
+        result = download_resumable(self.http, download_url, filepath, retries=retries, accept=is_csv_content)
+        if not result['ok']:
+            print(f"  ✗ Download failed for {filename}: {result['error']}")
+            return False
         
-        return False
+        resumed = f", resumed at {result['resumed_from']} bytes" if result['resumed_from'] else ""
+        print(f"  ✓ Downloaded {filename} ({result['size']} bytes{resumed})")
+        self.index_file(filepath)
+        return True
+    
+    def index_file(self, filepath):
+        """
+        Add a downloaded CSV to the local places index
+        
+        Args:
+            filepath (str): Path to the downloaded result CSV
+        """
+        if not self.index_places:
+            return
+        
+        try:
+            rows = places_index.ingest_file(filepath)
+            print(f"  ✓ Indexed {rows} places")
+        except Exception as e:
+            print(f"  ⚠ Could not index {os.path.basename(filepath)}: {e}")
+    
+    def export_delta(self, filepath):
+        """
+        Write the rows that changed since the folder's previous download
+        
+        Args:
+            filepath (str): Path to the downloaded result CSV
+            
+        Returns:
+            dict: Delta summary, or None if deltas are disabled or the file was skipped
+        """
+        if not self.delta_format:
+            return None
+        
+        try:
+            delta = delta_export.export_delta(filepath, self.delta_format)
+        except Exception as e:
+            print(f"  ⚠ Could not export delta for {os.path.basename(filepath)}: {e}")
+            return None
+        
+        if delta:
+            print(f"  ✓ Delta {delta['delta_file']}: +{delta['inserted']} ~{delta['updated']} -{delta['removed']}")
+        return delta
     
     def download_all_files(self, results_data=None):
         """
@@ -182,15 +251,8 @@ class WebhookDownloader:
         
         print(f"\nStarting download of {len(results)} folders...")
         
-        stats = {
-            'total_folders': len(results),
-            'total_files': 0,
-            'successful_downloads': 0,
-            'failed_downloads': 0,
-            'skipped_files': 0,
-            'start_time': datetime.now(),
-            'folder_stats': {}
-        }
+        stats = self.new_stats(results)
+        downloaded_paths = []
         
         for folder_name, file_ids in results.items():
             if not file_ids:
@@ -215,15 +277,150 @@ class WebhookDownloader:
                 if self.download_file(folder_name, file_id):
                     stats['successful_downloads'] += 1
                     stats['folder_stats'][folder_name]['successful'] += 1
+                    downloaded_paths.append(filepath)
+                    delta = self.export_delta(filepath)
+                    if delta:
+                        stats['deltas'].append(delta)
                 else:
                     stats['failed_downloads'] += 1
                     stats['folder_stats'][folder_name]['failed'] += 1
         
+        return self.finish_stats(stats, downloaded_paths)
+    
+    def download_bundle(self, bundle_url):
+        """
+        Download every result CSV from a results bundle in one request
+        
+        The bundle is verified against its manifest before any file lands in the download
+        directory; files already there with the same size and mtime are skipped.
+        
+        Args:
+            bundle_url (str): Bundle URL (see results_bundle.release_bundle_url)
+            
+        Returns:
+            dict: Download statistics (same structure as download_all_files), or None
+        """
+        print(f"Fetching results bundle from {bundle_url}...")
+        staging_dir = tempfile.mkdtemp(prefix='.bundle_', dir=self.download_dir)
+        try:
+            result = results_bundle.fetch_bundle(bundle_url, staging_dir)
+            if not result['ok']:
+                print(f"✗ Results bundle rejected: {result['error']}")
+                return None
+            
+            manifest = result['manifest']
+            print(f"✓ Bundle for run {manifest.get('run_id') or 'unknown'} verified: "
+                  f"{manifest['file_count']} files ({result['size']} bytes compressed)")
+            
+            stats = self.new_stats(manifest.get('results') or {})
+            # Staged files are removed afterwards, so linking them into place is as good as a copy
+            summary = dir_sync.sync_tree(staging_dir, self.download_dir, link=True)
+        finally:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+        
+        csv_files = {entry['path'] for entry in manifest['files'] if entry['path'].endswith('_result.csv')}
+        changed = csv_files & set(summary['added'] + summary['updated'])
+        stats['total_files'] = len(csv_files)
+        stats['successful_downloads'] = len(changed)
+        stats['skipped_files'] = len(csv_files) - len(changed)
+        
+        for folder_name, file_ids in (manifest.get('results') or {}).items():
+            # Result keys may end in '/', the downloaded file names never do
+            expected = {f"{folder_name.rstrip('/')}_{file_id}_result.csv" for file_id in file_ids}
+            stats['folder_stats'][folder_name] = {
+                'total': len(file_ids),
+                'successful': len(expected & changed),
+                # Listed in the run's results but never downloaded by it
+                'failed': len(expected - csv_files)
+            }
+            stats['failed_downloads'] += len(expected - csv_files)
+        
+        downloaded_paths = []
+        for filename in sorted(changed):
+            filepath = os.path.join(self.download_dir, filename)
+            print(f"  ✓ {filename}")
+            self.index_file(filepath)
+            downloaded_paths.append(filepath)
+            delta = self.export_delta(filepath)
+            if delta:
+                stats['deltas'].append(delta)
+        
+        return self.finish_stats(stats, downloaded_paths)
+    
+    def new_stats(self, results):
+        """
+        Empty download statistics for a results mapping
+        
+        Args:
+            results (dict): Folder name -> file IDs
+            
+        Returns:
+            dict: Statistics with the counters at zero and start_time set
+        """
+        return {
+            'total_folders': len(results),
+            'total_files': 0,
+            'successful_downloads': 0,
+            'failed_downloads': 0,
+            'skipped_files': 0,
+            'start_time': datetime.now(),
+            'folder_stats': {},
+            'deltas': []
+        }
+    
+    def finish_stats(self, stats, downloaded_paths):
+        """
+        Validate the downloaded files and close out the statistics
+        
+        Args:
+            stats (dict): Statistics from new_stats()
+            downloaded_paths (list[str]): Files downloaded in this run
+            
+        Returns:
+            dict: The same statistics with validation, end_time and duration
+        """
+        stats['validation'] = self.validate_downloads(downloaded_paths)
+        
         stats['end_time'] = datetime.now()
         stats['duration'] = (stats['end_time'] - stats['start_time']).total_seconds()
         
         return stats
     
+    def validate_downloads(self, paths):
+        """
+        Validate downloaded CSVs in parallel and write a manifest
+        
+        Args:
+            paths (list[str]): Files downloaded in this run
+            
+        Returns:
+            dict: Validation summary, or None if nothing was validated
+        """
+        if not paths or not VALIDATOR_AVAILABLE:
+            return None
+        
+        print(f"\nValidating {len(paths)} downloaded files...")
+        start = datetime.now()
+        results = validate_results.validate_files(paths)
+        duration = (datetime.now() - start).total_seconds()
+        
+        manifest = validate_results.build_manifest(self.download_dir, results, duration=duration)
+        manifest_path = validate_results.default_manifest_path(self.download_dir)
+        validate_results.write_manifest(manifest, manifest_path)
+        
+        for result in results:
+            if not result['valid']:
+                print(f"  ✗ {result['file']}: {result['problem']}")
+        print(f"✓ Validation manifest saved to: {manifest_path}")
+        
+        return {
+            'manifest': manifest_path,
+            'valid_files': manifest['valid_files'],
+            'invalid_files': manifest['invalid_files'],
+            'total_rows': manifest['total_rows'],
+            'total_error_rows': manifest['total_error_rows']
+        }
+    
     def print_stats(self, stats):
         """
         Print download statistics
@@ -248,6 +445,15 @@ class WebhookDownloader:
             success_rate = (stats['successful_downloads'] / stats['total_files']) * 100
             print(f"Success rate: {success_rate:.1f}%")
         
+        if stats.get('deltas'):
+            changed = sum(d['inserted'] + d['updated'] + d['removed'] for d in stats['deltas'])
+            print(f"Delta files: {len(stats['deltas'])} ({changed} changed rows)")
+        
+        validation = stats.get('validation')
+        if validation:
+            print(f"Validated files: {validation['valid_files']} valid, {validation['invalid_files']} invalid "
+                  f"({validation['total_rows']} rows, {validation['total_error_rows']} error rows)")
+        
         print("\nFolder breakdown:")
         for folder, folder_stats in stats['folder_stats'].items():
             if folder_stats['total'] > 0:
@@ -312,9 +518,10 @@ def main():
     print("1. Download all files")
     print("2. Download specific folder")
     print("3. Show results only (no download)")
-    print("4. Exit")
+    print("4. Download results bundle (one request)")
+    print("5. Exit")
     
-    choice = input("\nEnter your choice (1-4): ").strip()
+    choice = input("\nEnter your choice (1-5): ").strip()
     
     if choice == "1":
         # Download all files
@@ -373,6 +580,18 @@ def main():
                     print(f"    Files: {', '.join(files[:5])}{'...' if len(files) > 5 else ''}")
     
     elif choice == "4":
+        # Download the bundle published by the workflow
+        bundle_url = input(f"Enter bundle URL (or press Enter for {RESULTS_BUNDLE_URL or 'the latest release'}): ").strip()
+        if not bundle_url:
+            bundle_url = RESULTS_BUNDLE_URL or results_bundle.release_bundle_url(
+                os.getenv("GITHUB_REPOSITORY", "integrusautomation/selenium-download-automation"))
+        
+        stats = downloader.download_bundle(bundle_url)
+        if stats:
+            downloader.print_stats(stats)
+            downloader.save_stats(stats)
+    
+    elif choice == "5":
         print("Exiting...")
     
     else:
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Workflow Runs - dispatch a GitHub Actions workflow and follow the run to completion
+Workflow IDs are looked up once per process. Each dispatch carries a correlation ID that
+the workflow puts in its run name (and results commit message), which is how the run
+and the commit it pushed are found again. Polling uses conditional requests: a 304
+answer does not count against the GitHub API rate limit.
+Usage: python workflow_runs.py <run_id>
+"""
+
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from http_client import HttpClient
+
+GITHUB_API = "https://api.github.com"
+
+# Seconds between polls of a run that has not completed yet
+RUN_POLL_SECONDS = 15
+
+# How long to look for the dispatched run before giving up (runs show up within seconds)
+RUN_DISCOVERY_SECONDS = 180
+
+# Give up following a run after this long
+RUN_TIMEOUT_SECONDS = 3 * 60 * 60
+
+# Workflow name -> ID, shared by every tracker in the process
+_workflow_ids = {}
+_workflow_ids_lock = threading.Lock()
+
+# What new_correlation_id() puts in a run's name (run-name in the workflow)
+CORRELATION_ID_PATTERN = re.compile(r'\b[0-9a-f]{12}\b')
+
+def new_correlation_id():
+    """Short random ID that ties a dispatch to its run"""
+    return uuid.uuid4().hex[:12]
+
+def _parse_time(value):
+    """GitHub timestamp (2024-01-01T00:00:00Z) -> aware datetime"""
+    return datetime.strptime(value, '%Y-%m-%dT%H:%M:%SZ').replace(tzinfo=timezone.utc)
+
+def run_summary(run, commit_sha=None):
+    """
+    The parts of a workflow run worth reporting
+
+    Args:
+        run (dict): Run object from the GitHub API
+        commit_sha (str, optional): Commit the run pushed
+
+    Returns:
+        dict: run_id, html_url, status, conclusion, completed, head_sha, commit_sha, created_at, updated_at
+    """
+    return {
+        'run_id': run['id'],
+        'html_url': run.get('html_url'),
+        'status': run.get('status'),
+        'conclusion': run.get('conclusion'),
+        'completed': run.get('status') == 'completed',
+        'head_sha': run.get('head_sha'),
+        'commit_sha': commit_sha,
+        'created_at': run.get('created_at'),
+        'updated_at': run.get('updated_at')
+    }
+
+class WorkflowRunTracker:
+    def __init__(self, token, repo_owner, repo_name, session=None):
+        """
+        Initialize the tracker
+
+        Args:
+            token (str): GitHub token with actions:write
+            repo_owner (str): Repository owner
+            repo_name (str): Repository name
+            session (HttpClient | requests.Session, optional): Client to reuse. GETs are
+                retried with the shared policy; dispatches and cancels are sent once. The
+                token is sent with each request, never set on the shared session.
+        """
+        self.repo = f"{repo_owner}/{repo_name}"
+        self.session = session if isinstance(session, HttpClient) else HttpClient(session)
+        self.headers = {
+            'Authorization': f'token {token}',
+            'Accept': 'application/vnd.github.v3+json'
+        }
+        # URL -> (ETag, body) of the last 200 answer, for conditional requests
+        self._etags = {}
+
+    def _url(self, path):
+        return f"{GITHUB_API}/repos/{self.repo}/{path}"
+
+    def get(self, path, params=None):
+        """
+        Conditional GET: the cached body is returned when GitHub answers 304 Not Modified
+
+        Returns:
+            tuple[int, dict | None]: (status code, JSON body)
+        """
+        url = self._url(path)
+        key = (url, tuple(sorted((params or {}).items())))
+        headers = dict(self.headers)
+        cached = self._etags.get(key)
+        if cached:
+            headers['If-None-Match'] = cached[0]
+
+        response = self.session.get(url, params=params, headers=headers, timeout=30)
+        if response.status_code == 304 and cached:
+            return 200, cached[1]
+        if response.status_code != 200:
+            return response.status_code, None
+
+        body = response.json()
+        if response.headers.get('ETag'):
+            self._etags[key] = (response.headers['ETag'], body)
+        return 200, body
+
+    def workflow_id(self, name, match=None):
+        """
+        Look up a workflow's ID by name (cached for the life of the process)
+
+        Args:
+            name (str): Exact workflow name
+            match (str, optional): Also accept a workflow whose name contains this (case-insensitive)
+
+        Returns:
+            int | None: Workflow ID, or None if the listing failed or nothing matched
+        """
+        cache_key = (self.repo, name, match)
+        with _workflow_ids_lock:
+            if cache_key in _workflow_ids:
+                return _workflow_ids[cache_key]
+
+        status, body = self.get('actions/workflows', {'per_page': 100})
+        if status != 200:
+            return None
+
+        workflow_id = None
+        for workflow in body.get('workflows', []):
+            if workflow['name'] == name or (match and match in workflow['name'].lower()):
+                workflow_id = workflow['id']
+                break
+
+        if workflow_id is not None:
+            with _workflow_ids_lock:
+                _workflow_ids[cache_key] = workflow_id
+        return workflow_id
+
+    def dispatch(self, workflow, ref='main', correlation_id=None):
+        """
+        Start a workflow_dispatch run
+
+        Args:
+            workflow (int | str): Workflow ID or file name
+            ref (str): Branch to run on
+            correlation_id (str, optional): Passed as the correlation_id input
+
+        Returns:
+            requests.Response: GitHub's answer (204 on success)
+        """
+        data = {'ref': ref}
+        if correlation_id:
+            data['inputs'] = {'correlation_id': correlation_id}
+        return self.session.post(self._url(f'actions/workflows/{workflow}/dispatches'), json=data,
+                                 headers=self.headers, timeout=30)
+
+    def repository_dispatch(self, event_type, client_payload=None):
+        """
+        Send a repository_dispatch event (its runs cannot be correlated)
+
+        Returns:
+            requests.Response: GitHub's answer (204 on success)
+        """
+        data = {'event_type': event_type, 'client_payload': client_payload or {}}
+        return self.session.post(self._url('dispatches'), json=data, headers=self.headers, timeout=30)
+
+    def find_run(self, workflow, correlation_id, dispatched_at):
+        """
+        Find the run started by a dispatch
+
+        Runs are matched on the correlation ID in their name. Without a correlation ID, the
+        oldest dispatch run created after dispatched_at that carries no correlation ID is
+        taken. A run named after another ID belongs to another dispatch and is never taken.
+
+        Returns:
+            dict | None: Run object, or None if it has not shown up yet
+        """
+        status, body = self.get(f'actions/workflows/{workflow}/runs',
+                                {'event': 'workflow_dispatch', 'per_page': 20})
+        if status != 200:
+            return None
+
+        runs = body.get('workflow_runs', [])
+        if correlation_id:
+            for run in runs:
+                if correlation_id in (run.get('display_title') or run.get('name') or ''):
+                    return run
+            # Not listed yet: keep polling rather than take another dispatch's run
+            return None
+
+        # Allow for clock skew between this host and GitHub
+        cutoff = dispatched_at - timedelta(seconds=30)
+        candidates = [run for run in runs if _parse_time(run['created_at']) >= cutoff
+                      and not CORRELATION_ID_PATTERN.search(run.get('display_title') or run.get('name') or '')]
+        return min(candidates, key=lambda run: run['created_at']) if candidates else None
+
+    def get_run(self, run_id):
+        """Current state of a run (None if the request failed)"""
+        status, body = self.get(f'actions/runs/{run_id}')
+        return body if status == 200 else None
+
+    def cancel_run(self, run_id):
+        """Ask GitHub to cancel a run; True if the request was accepted"""
+        response = self.session.post(self._url(f'actions/runs/{run_id}/cancel'), headers=self.headers, timeout=30)
+        return response.status_code == 202
+
+    def find_results_commit(self, run, correlation_id, branch='main'):
+        """
+        SHA of the commit the run pushed, found by the correlation ID in its message
+
+        Returns:
+            str | None: Commit SHA, or None if the run pushed nothing
+        """
+        if not correlation_id:
+            return None
+        status, commits = self.get('commits', {'sha': branch, 'since': run['created_at'], 'per_page': 20})
+        if status != 200:
+            return None
+        for commit in commits:
+            if correlation_id in commit['commit']['message']:
+                return commit['sha']
+        return None
+
+    def release(self, tag):
+        """Release with this tag (with its assets), or None if there is none"""
+        status, body = self.get(f'releases/tags/{tag}')
+        return body if status == 200 else None
+
+    def open_asset(self, asset):
+        """
+        Stream a release asset (works for private repositories too)
+
+        GitHub redirects to the file itself; requests drops the Authorization header when
+        following a redirect to another host, so the token stays with the API.
+
+        Returns:
+            requests.Response: Streaming response; close it when done
+        """
+        headers = dict(self.headers, Accept='application/octet-stream')
+        return self.session.get(asset['url'], headers=headers, stream=True, timeout=30)
+
+    def follow(self, workflow, correlation_id, dispatched_at, on_update=None, should_cancel=None,
+               poll_seconds=RUN_POLL_SECONDS, timeout=RUN_TIMEOUT_SECONDS):
+        """
+        Follow a dispatched run until it completes
+
+        Args:
+            workflow (int | str): Workflow ID or file name that was dispatched
+            correlation_id (str): ID passed to dispatch()
+            dispatched_at (datetime): When the dispatch was sent (aware, UTC)
+            on_update (callable, optional): Called with run_summary() whenever the run changes,
+                and with None on every poll (use it as a heartbeat)
+            should_cancel (callable, optional): Checked every poll; when true the run is cancelled
+            poll_seconds (float): Seconds between polls
+            timeout (float): Seconds before giving up
+
+        Returns:
+            dict | None: Final run_summary(), or None if the run never showed up
+        """
+        started = time.time()
+        run = None
+        summary = None
+        cancel_sent = False
+
+        while time.time() - started < timeout:
+            if run is None:
+                run = self.find_run(workflow, correlation_id, dispatched_at)
+                if run is None and time.time() - started > RUN_DISCOVERY_SECONDS:
+                    return None
+            else:
+                run = self.get_run(run['id']) or run
+
+            if run is not None:
+                if should_cancel and not cancel_sent and should_cancel():
+                    cancel_sent = self.cancel_run(run['id'])
+
+                current = run_summary(run)
+                if current['completed']:
+                    current['commit_sha'] = self.find_results_commit(run, correlation_id)
+                if current != summary:
+                    summary = current
+                    if on_update:
+                        on_update(summary)
+                if summary['completed']:
+                    return summary
+
+            if on_update:
+                on_update(None)
+            time.sleep(poll_seconds)
+
+        return summary
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python workflow_runs.py <run_id>")
+        sys.exit(1)
+
+    token = os.environ.get('GITHUB_TOKEN')
+    if not token:
+        print("❌ GITHUB_TOKEN environment variable not set")
+        sys.exit(1)
+
+    tracker = WorkflowRunTracker(
+        token,
+        os.environ.get('GITHUB_REPOSITORY_OWNER', 'integrusautomation'),
+        os.environ.get('GITHUB_REPOSITORY_NAME', 'selenium-download-automation')
+    )
+    run = tracker.get_run(sys.argv[1])
+    if run is None:
+        print(f"❌ Run {sys.argv[1]} not found")
+        sys.exit(1)
+    for key, value in run_summary(run).items():
+        print(f"{key}: {value}")
+
+if __name__ == "__main__":
+    main()